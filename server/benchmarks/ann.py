@@ -0,0 +1,153 @@
+"""
+Recall/latency of HNSWVectorStore against exact search (NumpyVectorStore).
+
+    python -m benchmarks.ann --size 20000 --dimension 256 --ef 16,32,64,128
+    python -m benchmarks.ann --snapshot data/vector_snapshot   # real embeddings
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+import benchmarks.settings  # noqa: F401  (before anything imports config)
+from interfaces.vector_store import VectorRecord
+from services.hnsw_vector_store import HNSWVectorStore
+from services.numpy_vector_store import (
+    EMBEDDINGS_FILE,
+    NumpyVectorStore,
+    save_snapshot,
+)
+from services.versioned_dir import resolve
+from benchmarks.fakes import FakeEmbedder
+from benchmarks.harness import summarize
+
+
+def make_corpus(args: argparse.Namespace) -> Tuple[np.ndarray, np.ndarray]:
+    """Corpus and query vectors: a real snapshot split, or clustered noise."""
+    rng = np.random.default_rng(args.seed)
+    if args.snapshot:
+        path = resolve(args.snapshot)
+        if path is None:
+            raise SystemExit(f"No snapshot published in {args.snapshot}")
+        matrix = np.load(path / EMBEDDINGS_FILE)
+        order = rng.permutation(len(matrix))
+        queries = matrix[order[: args.queries]]
+        return np.asarray(matrix[order[args.queries :]]), np.asarray(queries)
+
+    # Embeddings of real documents cluster by topic; uniform noise would
+    # make every method look equally bad
+    centers = rng.standard_normal((args.clusters, args.dimension))
+
+    def sample(n: int) -> np.ndarray:
+        picks = centers[rng.integers(0, args.clusters, n)]
+        noise = rng.standard_normal((n, args.dimension))
+        return (picks + args.spread * noise).astype(np.float32)
+
+    return sample(args.size), sample(args.queries)
+
+
+def timed(
+    fn: Callable[[np.ndarray], List[int]], queries: np.ndarray
+) -> Tuple[List[List[int]], List[float]]:
+    """Run `fn` per query; results and per-query latencies in ms."""
+    results, samples = [], []
+    for q in queries:
+        start = time.perf_counter()
+        results.append(fn(q))
+        samples.append((time.perf_counter() - start) * 1000)
+    return results, samples
+
+
+async def run(args: argparse.Namespace) -> None:
+    corpus, queries = make_corpus(args)
+    n, dimension = corpus.shape
+    embedder = FakeEmbedder(dimension=dimension)
+    ids = [f"c{i}" for i in range(n)]
+    texts = [""] * n
+    k = args.top_k
+
+    with tempfile.TemporaryDirectory() as tmp:
+        save_snapshot(f"{tmp}/exact", ids, texts, corpus)
+        exact = NumpyVectorStore(embedder, snapshot_dir=f"{tmp}/exact")
+        truth, exact_ms = timed(lambda q: exact.search(q, k), queries)
+
+        start = time.perf_counter()
+        built = HNSWVectorStore(
+            embedder,
+            index_dir=f"{tmp}/hnsw",
+            m=args.m,
+            ef_construction=args.ef_construction,
+        )
+        await built.upsert(
+            [
+                VectorRecord(id=i, text=t, values=v)
+                for i, t, v in zip(ids, texts, corpus)
+            ]
+        )
+        await built.flush()
+        build_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        # Always walk the graph; the store would scan small corpora exactly
+        ann = HNSWVectorStore(embedder, index_dir=f"{tmp}/hnsw", exact_below=0)
+        load_ms = (time.perf_counter() - start) * 1000
+
+        print(
+            f"corpus {n} x {dimension}, {len(queries)} queries, top_k {k}, "
+            f"m {args.m}, ef_construction {args.ef_construction}"
+        )
+        print(
+            f"hnsw build {build_s:.1f} s ({build_s / n * 1000:.2f} ms/vector), "
+            f"load {load_ms:.1f} ms, index {ann.memory_bytes() / 2**20:.1f} MiB"
+        )
+        s = summarize(exact_ms)
+        print(
+            f"{'exact':>12}  recall@{k} 1.000  p50 {s.p50:8.3f} ms  p95 {s.p95:8.3f} ms"
+        )
+        for ef in args.ef:
+            found, ann_ms = timed(lambda q: ann.search(q, k, ef=ef), queries)
+            recall = np.mean(
+                [len(set(f) & set(t)) / max(1, len(t)) for f, t in zip(found, truth)]
+            )
+            s = summarize(ann_ms)
+            print(
+                f"{f'hnsw ef={ef}':>12}  recall@{k} {recall:.3f}  "
+                f"p50 {s.p50:8.3f} ms  p95 {s.p95:8.3f} ms"
+            )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Recall and latency of HNSW search against exact search."
+    )
+    parser.add_argument("--snapshot", help="NumpyVectorStore snapshot to sample from")
+    parser.add_argument("--size", type=int, default=20000, help="Synthetic corpus size")
+    parser.add_argument("--dimension", type=int, default=256)
+    parser.add_argument("--clusters", type=int, default=100)
+    parser.add_argument("--spread", type=float, default=0.5)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--m", type=int, default=16)
+    parser.add_argument("--ef-construction", type=int, default=100)
+    parser.add_argument(
+        "--ef",
+        type=lambda v: [int(x) for x in v.split(",")],
+        default=[16, 32, 64, 128],
+        help="Comma-separated query search widths to compare",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def main() -> int:
+    asyncio.run(run(parse_args()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+import asyncio
+import hashlib
+from typing import AsyncIterator, List, Optional, Sequence
+
+import numpy as np
+
+from interfaces.embedder import Embedder
+from interfaces.llm_generator import LLMGenerator
+from interfaces.vector_store import VectorStore
+from models import Message
+
+
+async def _sleep_ms(ms: float) -> None:
+    # Always yield to the loop, like a real network call would
+    await asyncio.sleep(ms / 1000.0 if ms > 0 else 0)
+
+
+class FakeEmbedder(Embedder):
+    """
+    Deterministic embedder: vectors are seeded from a hash of the text.
+
+    :param dimension: Vector size.
+    :param latency_ms: Simulated latency per request (single or batch).
+    """
+
+    def __init__(self, dimension: int = 1024, latency_ms: float = 0.0):
+        self._dimension = dimension
+        self._latency_ms = latency_ms
+        self.calls = 0
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+    def _vector(self, text: str) -> List[float]:
+        seed = int.from_bytes(
+            hashlib.sha256(text.encode("utf-8")).digest()[:8], "little"
+        )
+        return np.random.default_rng(seed).standard_normal(self._dimension).tolist()
+
+    async def embed(self, text: str) -> List[float]:
+        self.calls += 1
+        await _sleep_ms(self._latency_ms)
+        return self._vector(text)
+
+    async def embed_many(self, texts: Sequence[str]) -> List[List[float]]:
+        self.calls += 1
+        await _sleep_ms(self._latency_ms)
+        return [self._vector(t) for t in texts]
+
+
+class FakeVectorStore(VectorStore):
+    """
+    Returns a fixed set of chunks after embedding the query.
+
+    :param embedder: Embedder called per query, as real stores do.
+    :param chunks: Corpus returned (first `top_k`) for every query.
+    :param latency_ms: Simulated search latency.
+    """
+
+    def __init__(
+        self, embedder: Embedder, chunks: Sequence[str], latency_ms: float = 0.0
+    ):
+        self._embedder = embedder
+        self._chunks = list(chunks)
+        self._latency_ms = latency_ms
+
+    async def get_relevant_chunks(
+        self, query: str, top_k: int = 5, *, vector: Optional[List[float]] = None
+    ) -> List[str]:
+        if vector is None:
+            await self._embedder.embed(query)
+        await _sleep_ms(self._latency_ms)
+        return self._chunks[:top_k]
+
+    async def health_check(self) -> bool:
+        return True
+
+
+class FakeLLMGenerator(LLMGenerator):
+    """
+    Streams a canned answer at a fixed token rate.
+
+    :param ttft_ms: Delay before the first token.
+    :param tokens_per_second: Rate of subsequent tokens (0 = unthrottled).
+    :param tokens: Number of tokens per answer.
+    """
+
+    def __init__(
+        self,
+        ttft_ms: float = 0.0,
+        tokens_per_second: float = 0.0,
+        tokens: int = 40,
+    ):
+        self._ttft_ms = ttft_ms
+        self._token_interval_ms = (
+            1000.0 / tokens_per_second if tokens_per_second > 0 else 0.0
+        )
+        self._tokens = tokens
+
+    async def stream(
+        self, context_chunks: List[str], query: str, history: List[Message]
+    ) -> AsyncIterator[str]:
+        await _sleep_ms(self._ttft_ms)
+        for i in range(self._tokens):
+            if i:
+                await _sleep_ms(self._token_interval_ms)
+            yield "[[NEW_BUBBLE]]" if i and i % 15 == 0 else f"tok{i} "
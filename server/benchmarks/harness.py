@@ -0,0 +1,163 @@
+import json
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from pydantic import BaseModel
+
+# Allocation passes run separately from timing passes: tracemalloc slows
+# every allocation down and would skew latencies.
+ALLOC_ITERATIONS = 5
+
+
+class Summary(BaseModel):
+    p50: float
+    p95: float
+    mean: float
+
+
+class BenchResult(BaseModel):
+    """Measurements for one benchmark."""
+
+    name: str
+    iterations: int
+    total_ms: Summary
+    ttft_ms: Optional[Summary] = None
+    alloc_peak_kib: float
+
+
+def summarize(samples: List[float]) -> Summary:
+    ordered = sorted(samples)
+    p95_index = min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))
+    return Summary(
+        p50=round(statistics.median(ordered), 4),
+        p95=round(ordered[p95_index], 4),
+        mean=round(statistics.fmean(ordered), 4),
+    )
+
+
+def _alloc_peak_kib(run_once: Callable[[], None]) -> float:
+    peak = 0
+    tracemalloc.start()
+    try:
+        for _ in range(ALLOC_ITERATIONS):
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            run_once()
+            _, top = tracemalloc.get_traced_memory()
+            peak = max(peak, top - base)
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1024, 2)
+
+
+async def _async_alloc_peak_kib(run_once: Callable[[], Awaitable[None]]) -> float:
+    peak = 0
+    tracemalloc.start()
+    try:
+        for _ in range(ALLOC_ITERATIONS):
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            await run_once()
+            _, top = tracemalloc.get_traced_memory()
+            peak = max(peak, top - base)
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1024, 2)
+
+
+def bench_sync(name: str, fn: Callable[[], object], iterations: int) -> BenchResult:
+    """Time a synchronous callable."""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    def run_once() -> None:
+        fn()
+
+    return BenchResult(
+        name=name,
+        iterations=iterations,
+        total_ms=summarize(samples),
+        alloc_peak_kib=_alloc_peak_kib(run_once),
+    )
+
+
+async def bench_stream(
+    name: str,
+    make_stream: Callable[[], AsyncIterator[object]],
+    iterations: int,
+) -> BenchResult:
+    """Time an async stream: time-to-first-item and time-to-exhaustion."""
+    ttft, total = [], []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        first: Optional[float] = None
+        async for _item in make_stream():
+            if first is None:
+                first = time.perf_counter()
+        end = time.perf_counter()
+        ttft.append(((first or end) - start) * 1000)
+        total.append((end - start) * 1000)
+
+    async def drain() -> None:
+        async for _item in make_stream():
+            pass
+
+    return BenchResult(
+        name=name,
+        iterations=iterations,
+        total_ms=summarize(total),
+        ttft_ms=summarize(ttft),
+        alloc_peak_kib=await _async_alloc_peak_kib(drain),
+    )
+
+
+def save_results(path: str, results: List[BenchResult]) -> None:
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(
+        json.dumps({r.name: r.model_dump() for r in results}, indent=2),
+        encoding="utf-8",
+    )
+
+
+def load_results(path: str) -> Dict[str, BenchResult]:
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    return {name: BenchResult.model_validate(r) for name, r in data.items()}
+
+
+def compare(
+    results: List[BenchResult],
+    baseline: Dict[str, BenchResult],
+    *,
+    threshold: float = 0.10,
+) -> List[str]:
+    """
+    Compare results against a baseline.
+
+    :param threshold: Allowed relative slowdown/growth (0.10 = 10%).
+    :return: Human-readable regression descriptions (empty if none).
+    """
+    regressions = []
+    for r in results:
+        base = baseline.get(r.name)
+        if base is None:
+            continue
+        checks = [
+            ("total p50 ms", r.total_ms.p50, base.total_ms.p50),
+            ("alloc peak KiB", r.alloc_peak_kib, base.alloc_peak_kib),
+        ]
+        if r.ttft_ms and base.ttft_ms:
+            checks.append(("ttft p50 ms", r.ttft_ms.p50, base.ttft_ms.p50))
+        for label, now, before in checks:
+            if before > 0 and now > before * (1 + threshold):
+                regressions.append(
+                    f"{r.name}: {label} {before:.3f} -> {now:.3f} "
+                    f"(+{(now / before - 1) * 100:.1f}%)"
+                )
+    return regressions
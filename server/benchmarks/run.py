@@ -0,0 +1,324 @@
+# run.py
+import argparse
+import asyncio
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Iterator, List
+
+if sys.platform.startswith("win"):
+    asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+
+import benchmarks.settings  # noqa: F401  (before anything imports config)
+
+import httpx
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from config import config
+from models import Base, Message, Session
+from prompts.fintech import build_messages, _select_history
+from routers.chat import _encode
+from schemas.message import MessageResponse
+from services.chat import get_messages, stream_messages
+from services.message_writer import MessageWriter
+from services.rag import RAGService
+from services.rag_pipeline import RAGPipeline
+from benchmarks.fakes import FakeEmbedder, FakeLLMGenerator, FakeVectorStore
+from benchmarks.harness import (
+    BenchResult,
+    bench_stream,
+    bench_sync,
+    compare,
+    load_results,
+    save_results,
+)
+
+CHUNKS = [
+    f"Chunk {i}: To reset your password, open Settings > Security and follow the "
+    "steps. Transfers via SEPA usually settle within one business day. " * 4
+    for i in range(10)
+]
+
+
+@compiles(UUID, "sqlite")
+def _uuid_as_text(type_, compiler, **kw) -> str:
+    # SQLite gives an unknown "UUID" column NUMERIC affinity, so hex ids such
+    # as "...123e456" were stored as floats and broke the ORM read path
+    return "CHAR(32)"
+
+
+def make_ids(seed: str) -> Iterator[uuid.UUID]:
+    """Deterministic uuid4s, so every run seeds the same rows."""
+    rng = random.Random(seed)
+    while True:
+        yield uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def make_history(n: int, session_id: uuid.UUID) -> List[Message]:
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    ids = make_ids(f"history-{n}")
+    return [
+        Message(
+            id=next(ids),
+            session_id=session_id,
+            role="user" if i % 2 == 0 else "finbot",
+            content=f"message {i} " + "lorem ipsum dolor sit amet " * 8,
+            created_at=start + timedelta(minutes=i),
+        )
+        for i in range(n)
+    ]
+
+
+async def make_db(history_size: int):
+    """In-memory SQLite DB with one session seeded with `history_size` messages."""
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    session_id = next(make_ids(f"session-{history_size}"))
+    async with factory() as db:
+        db.add(Session(id=session_id))
+        await db.commit()
+        rows = [
+            {
+                c: getattr(m, c)
+                for c in ("id", "session_id", "role", "content", "created_at")
+            }
+            for m in make_history(history_size, session_id)
+        ]
+        if rows:
+            await db.execute(insert(Message.__table__).values(rows))
+            await db.commit()
+    return engine, factory, session_id
+
+
+def make_pipeline(args: argparse.Namespace) -> RAGPipeline:
+    embedder = FakeEmbedder(config.EMBED_DIM, latency_ms=args.embed_latency_ms)
+    store = FakeVectorStore(embedder, CHUNKS, latency_ms=args.search_latency_ms)
+    llm = FakeLLMGenerator(
+        ttft_ms=args.llm_ttft_ms,
+        tokens_per_second=args.tokens_per_second,
+        tokens=args.tokens,
+    )
+    return RAGPipeline(store, llm, top_k=5)
+
+
+async def run_suite(args: argparse.Namespace) -> List[BenchResult]:
+    results: List[BenchResult] = []
+    n = args.iterations
+
+    history = make_history(args.history_size, next(make_ids("prompt")))
+    results.append(
+        bench_sync(
+            "prompts.build_messages",
+            lambda: build_messages(
+                query="How do I reset my password?", chunks=CHUNKS, history=history
+            ),
+            n * 20,
+        )
+    )
+    results.append(
+        bench_sync(
+            "prompts._select_history",
+            lambda: _select_history(
+                history,
+                max_tokens=config.PROMPT_TOKEN_BUDGET,
+                max_pairs=config.HISTORY_LIMIT,
+            ),
+            n * 20,
+        )
+    )
+
+    pipeline = make_pipeline(args)
+    results.append(
+        await bench_stream(
+            "rag_pipeline.stream",
+            lambda: pipeline.stream("How do I reset my password?", history[-12:]),
+            n,
+        )
+    )
+
+    engine, factory, session_id = await make_db(args.history_size)
+    try:
+        async with factory() as db:
+            inline = RAGService(pipeline)
+            results.append(
+                await bench_stream(
+                    "rag_service.stream",
+                    lambda: inline.stream(
+                        db,
+                        session_id=session_id,
+                        user_text="How do I reset my password?",
+                    ),
+                    n,
+                )
+            )
+
+            writer = MessageWriter(factory)
+            write_behind = RAGService(pipeline, writer=writer)
+            results.append(
+                await bench_stream(
+                    "rag_service.stream[write_behind]",
+                    lambda: write_behind.stream(
+                        db,
+                        session_id=session_id,
+                        user_text="How do I reset my password?",
+                    ),
+                    n,
+                )
+            )
+            await writer.close()
+
+        results.append(await bench_route(args, pipeline, factory, session_id))
+    finally:
+        await engine.dispose()
+
+    engine, factory, session_id = await make_db(args.read_history_size)
+    try:
+        results.extend(await bench_reads(factory, session_id, n))
+    finally:
+        await engine.dispose()
+    return results
+
+
+async def bench_reads(
+    factory: async_sessionmaker[AsyncSession], session_id: uuid.UUID, iterations: int
+) -> List[BenchResult]:
+    """GET /chat/{id} body: ORM rows + Pydantic vs Core rows + fast JSON."""
+    adapter = TypeAdapter(List[MessageResponse])
+
+    async def orm() -> AsyncIterator[bytes]:
+        async with factory() as db:
+            messages = await get_messages(db, session_id)
+            yield adapter.dump_json(
+                adapter.validate_python(messages, from_attributes=True)
+            )
+
+    async def lean() -> AsyncIterator[bytes]:
+        async with factory() as db:
+            async for batch in stream_messages(
+                db, session_id, batch_size=config.CHAT_EXPORT_BATCH_SIZE
+            ):
+                yield b",".join(_encode(row) for row in batch)
+
+    # Both variants must serve the same body for the timings to be comparable
+    expected = b"".join([part async for part in orm()])
+    actual = b"[" + b",".join([part async for part in lean()]) + b"]"
+    if actual != expected:
+        raise SystemExit("read.chat_history: lean body differs from the ORM body")
+
+    return [
+        await bench_stream("read.chat_history[orm]", orm, iterations),
+        await bench_stream("read.chat_history[lean]", lean, iterations),
+    ]
+
+
+async def bench_route(
+    args: argparse.Namespace,
+    pipeline: RAGPipeline,
+    factory: async_sessionmaker[AsyncSession],
+    session_id: uuid.UUID,
+) -> BenchResult:
+    """POST /rag/query through the full ASGI stack with DB/pipeline overridden."""
+    from main import app
+    from db_manager import db_manager
+    from routers.rag import get_rag_service
+
+    async def get_session() -> AsyncIterator[AsyncSession]:
+        async with factory() as session:
+            yield session
+
+    app.dependency_overrides[db_manager.get_session] = get_session
+    app.dependency_overrides[get_rag_service] = lambda: RAGService(pipeline)
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench"
+    )
+
+    async def request() -> AsyncIterator[bytes]:
+        async with client.stream(
+            "POST",
+            f"{config.API_V1_PREFIX}/rag/query",
+            json={
+                "session_id": str(session_id),
+                "message": "How do I reset my password?",
+            },
+        ) as resp:
+            async for chunk in resp.aiter_raw():
+                yield chunk
+
+    try:
+        return await bench_stream("route.rag_query", request, args.iterations)
+    finally:
+        await client.aclose()
+        app.dependency_overrides.clear()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Offline benchmarks for the RAG hot path (no network, fake providers)."
+    )
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument(
+        "--history-size",
+        type=int,
+        default=500,
+        help="Messages seeded in the benchmark session",
+    )
+    parser.add_argument(
+        "--read-history-size",
+        type=int,
+        default=5000,
+        help="Messages in the session used for the read-path benchmarks",
+    )
+    parser.add_argument("--embed-latency-ms", type=float, default=0.0)
+    parser.add_argument("--search-latency-ms", type=float, default=0.0)
+    parser.add_argument("--llm-ttft-ms", type=float, default=0.0)
+    parser.add_argument(
+        "--tokens-per-second", type=float, default=0.0, help="0 = unthrottled"
+    )
+    parser.add_argument("--tokens", type=int, default=40)
+    parser.add_argument("--save", help="Write results as a JSON baseline to this path")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=0.10, help="Allowed regression (0.10 = 10%%)"
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    results = asyncio.run(run_suite(args))
+
+    for r in results:
+        ttft = f"  ttft p50 {r.ttft_ms.p50:8.3f} ms" if r.ttft_ms else ""
+        print(
+            f"{r.name:36} total p50 {r.total_ms.p50:8.3f} ms  p95 {r.total_ms.p95:8.3f} ms"
+            f"{ttft}  alloc peak {r.alloc_peak_kib:9.2f} KiB"
+        )
+
+    if args.save:
+        save_results(args.save, results)
+    if args.compare:
+        regressions = compare(
+            results, load_results(args.compare), threshold=args.threshold
+        )
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
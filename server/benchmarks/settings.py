@@ -0,0 +1,33 @@
+"""
+Offline settings for the benchmarks.
+
+`config` requires every production credential at import time, but the
+benchmarks only talk to fakes and an in-memory SQLite DB. Import this module
+before anything that imports `config`; values from the environment or
+`.env.local` still win.
+"""
+
+import os
+
+from dotenv import load_dotenv
+
+DEFAULTS = {
+    "REACT_APP_URL": "http://localhost:3000",
+    # File-backed so the app engine gets a sized pool; it is never connected
+    "POSTGRES_DSN": "sqlite+aiosqlite:///bench.db",
+    "SUPABASE_URL": "http://localhost:54321",
+    "SUPABASE_ANON_KEY": "bench",
+    "SUPABASE_SERVICE_KEY": "bench",
+    "PINECONE_API_KEY": "bench",
+    "PINECONE_ENV": "bench",
+    "PINECONE_INDEX_HOST": "http://localhost",
+    "OPEN_AI_API_KEY": "bench",
+    "EMBED_MODEL": "text-embedding-3-small",
+    "CHAT_MODEL": "gpt-4o-mini",
+    "HISTORY_LIMIT": "5",
+}
+
+# Same file `Config.load_from_env` reads, so it is not shadowed by DEFAULTS
+load_dotenv(".env.local")
+for name, value in DEFAULTS.items():
+    os.environ.setdefault(name, value)
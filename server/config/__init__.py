@@ -1,5 +1,5 @@
 import os
-from typing import Literal, List
+from typing import Dict, Literal, List, Optional
 from dotenv import load_dotenv
 from pydantic import BaseModel, field_validator
 
@@ -7,6 +7,13 @@ from pydantic import BaseModel, field_validator
 class Config(BaseModel):
     APP_NAME: str = "Eloquent AI"
     COMPANY_NAME: str = "Eloquent"
+
+    # Tenancy: white-label companies served by one deployment
+    TENANTS: Dict[str, str] = {}  # tenant id -> company name, e.g. "acme=Acme Pay"
+    TENANT_HOSTS: Dict[str, str] = {}  # host -> tenant id, e.g. "chat.acme.com=acme"
+    TENANT_HEADER: str = "X-Tenant"
+    TENANT_MAX_LOADED: int = 32  # tenant retrievers kept in memory
+    TENANT_MEMORY_BUDGET_MB: int = 512
     ENV: Literal["dev", "prod", "test"] = "dev"
     REACT_APP_URL: str
 
@@ -15,36 +22,140 @@ class Config(BaseModel):
     DEBUG: bool = False
     CORS_ORIGINS: List[str] = []
 
+    # Streaming
+    STREAM_FRAME_MAX_CHARS: int = 512
+    STREAM_FRAME_MAX_MS: float = 40.0
+    STREAM_DISCONNECT_POLL_MS: float = 250.0
+
+    # Telemetry
+    OTEL_ENABLED: bool = False
+
+    # Logging
+    LOG_FORMAT: Literal["text", "json"] = "text"
+    LOG_LEVEL: Optional[str] = None  # defaults to DEBUG/INFO from DEBUG
+    LOG_LEVELS: Dict[str, str] = {}  # e.g. "sqlalchemy.engine=INFO,httpx=WARNING"
+    LOG_SAMPLE_RATE: float = 1.0  # fraction of hot-path info lines kept
+    LOG_QUEUE_SIZE: int = 10_000
+
     # Session
     HTTPS: bool = True
 
     # Database
     POSTGRES_DSN: str
+    POSTGRES_REPLICA_DSN: Optional[str] = None  # read-only queries go here if set
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 10.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: Optional[int] = None  # SET LOCAL per transaction
+    DB_PREPARED_STATEMENTS: bool = (
+        True  # False behind PgBouncer/Supavisor transaction mode
+    )
+    CHAT_EXPORT_BATCH_SIZE: int = 500  # rows per cursor fetch on GET /chat/{id}
+    MESSAGE_WRITE_BEHIND: bool = False  # batch message INSERTs off the request path
+    MESSAGE_WRITER_BATCH_SIZE: int = 100
+    MESSAGE_WRITER_FLUSH_MS: float = 50.0
+    MESSAGE_WRITER_QUEUE_SIZE: int = 10_000
+
+    # Shared cache (Redis); unset = per-process caches only
+    REDIS_URL: Optional[str] = None
+    SHARED_CACHE_PREFIX: str = "ragbot:"
+    SHARED_CACHE_TIMEOUT_SECONDS: float = 0.25
+    SHARED_CACHE_RETRY_SECONDS: float = 30.0  # local fallback after a Redis error
+    SHARED_CACHE_LOCAL_SIZE: int = 10_000
+    HISTORY_CACHE_TTL_SECONDS: int = 300
+    EMBED_SHARED_TTL_SECONDS: int = 7 * 24 * 3600
 
     # Supabase
     SUPABASE_URL: str
     SUPABASE_ANON_KEY: str
     SUPABASE_SERVICE_KEY: str
+    SUPABASE_JWT_SECRET: Optional[str] = None  # HS256 projects; else JWKS is used
+    SUPABASE_JWT_AUDIENCE: str = "authenticated"
+    # Asymmetric algorithms accepted for JWKS-verified tokens; never taken from the token
+    SUPABASE_JWT_ALGORITHMS: List[str] = ["RS256", "ES256"]
+    AUTH_JWKS_REFRESH_SECONDS: int = 3600
+    AUTH_TOKEN_CACHE_TTL_SECONDS: int = 60
+    AUTH_TOKEN_CACHE_SIZE: int = 1024
 
     # Pinecone
     PINECONE_API_KEY: str
     PINECONE_ENV: str
     PINECONE_INDEX_HOST: str
+    PINECONE_MAX_CONCURRENCY: int = 8
+    PINECONE_TIMEOUT_SECONDS: float = 5.0
+
+    # Vector store
+    VECTOR_STORE_BACKEND: Literal["pinecone", "numpy", "hnsw"] = "pinecone"
+    VECTOR_STORE_SNAPSHOT_DIR: str = "data/vector_snapshot"
+    HNSW_INDEX_DIR: str = "data/hnsw"
+    HNSW_M: int = 16  # links per node; more = better recall, more memory
+    HNSW_EF_CONSTRUCTION: int = 100
+    HNSW_EF_SEARCH: int = 64  # query search width; more = better recall, slower
+    HNSW_EXACT_BELOW: int = 5000  # scan every vector below this size; 0 = always HNSW
+    RETRIEVAL_HYBRID_ENABLED: bool = True  # BM25 + dense, fused with RRF
+    BM25_INDEX_DIR: str = "data/bm25"
+    HYBRID_RRF_K: int = 60
+    HYBRID_CANDIDATES: int = 20
+    HYBRID_LEXICAL_SKIP_MARGIN: float = 2.0  # 0 = always run dense search
+    RETRIEVAL_DEADLINE_SECONDS: float = 1.5  # Pinecone queries, hedge included
+    RETRIEVAL_HEDGE_ENABLED: bool = True
+    RETRIEVAL_HEDGE_DELAY_MS: float = 300.0  # until enough latencies for a p95
+    RETRIEVAL_HEDGE_MIN_DELAY_MS: float = 50.0
+    RETRIEVAL_BREAKER_FAILURES: int = 5
+    RETRIEVAL_BREAKER_RESET_SECONDS: float = 30.0
+    RETRIEVAL_FALLBACK_CACHE_SIZE: int = 2048
+    RETRIEVAL_FALLBACK_CACHE_TTL_SECONDS: int = 3600
+
+    # Ingestion
+    INGEST_CHUNK_SIZE: int = 1000  # characters
+    INGEST_CHUNK_OVERLAP: int = 150
+    INGEST_BATCH_SIZE: int = 64
+    INGEST_CONCURRENCY: int = 4
+    INGEST_MANIFEST_PATH: str = "data/ingest_manifest.json"
 
     # Cookies
     SESSION_COOKIE_NAME: str = "sid"
     SESSION_COOKIE_EXP_MINUTES: int = 7 * 24 * 60  # 7 days
+    SESSION_CACHE_TTL_SECONDS: int = 60  # known users / session owners, per process
+    SESSION_CACHE_SIZE: int = 10_000
 
     # LLM
     OPEN_AI_API_KEY: str
+    OPENAI_CHAT_MAX_CONCURRENCY: int = 32  # streams in flight per worker
+    OPENAI_CHAT_RPM: int = 0  # 0 = unpaced
+    OPENAI_CHAT_TPM: int = 0
+    OPENAI_CHAT_COMPLETION_TOKENS: int = 500  # reserved per completion for TPM pacing
+    OPENAI_EMBED_MAX_CONCURRENCY: int = 16
+    OPENAI_EMBED_RPM: int = 0
+    OPENAI_EMBED_TPM: int = 0
+    OPENAI_ADMISSION_QUEUE_SIZE: int = 64  # waiters per provider before shedding (429 + Retry-After)
+    OPENAI_ADMISSION_TIMEOUT_SECONDS: float = 5.0
     EMBED_MODEL: str
     CHAT_MODEL: str
     HISTORY_LIMIT: int
+    PROMPT_TOKEN_BUDGET: int = 6000  # input tokens: system + history + context + query
+    PROMPT_CONTEXT_SHARE: float = 0.6  # of the budget left after system + query
+    PROMPT_QUERY_MAX_TOKENS: int = 1000
+
+    # Semantic answer cache
+    ANSWER_CACHE_ENABLED: bool = False
+    ANSWER_CACHE_THRESHOLD: float = 0.95
+    ANSWER_CACHE_TTL_SECONDS: int = 3600
+    ANSWER_CACHE_SIZE: int = 2048
 
     # Embedding
     EMBED_DIM: int = 1024
-
-    @field_validator("CORS_ORIGINS", mode="before")
+    EMBED_CACHE_ENABLED: bool = True
+    EMBED_CACHE_SIZE: int = 10_000
+    EMBED_CACHE_DTYPE: Literal["float32", "float16"] = "float16"
+    EMBED_CACHE_PATH: Optional[str] = None  # e.g. "cache/embeddings.sqlite3"
+    EMBED_BATCH_ENABLED: bool = True
+    EMBED_BATCH_MAX_SIZE: int = 64
+    EMBED_BATCH_MAX_WAIT_MS: float = 5.0
+
+    @field_validator("CORS_ORIGINS", "SUPABASE_JWT_ALGORITHMS", mode="before")
     @classmethod
     def _split_csv(cls, v):
         if not v:
@@ -53,6 +164,22 @@ class Config(BaseModel):
             return v
         return [s.strip() for s in str(v).split(",") if s.strip()]
 
+    @field_validator("LOG_LEVELS", "TENANTS", "TENANT_HOSTS", mode="before")
+    @classmethod
+    def _split_levels(cls, v):
+        if not v:
+            return {}
+        if isinstance(v, dict):
+            return v
+        pairs = (s.split("=", 1) for s in str(v).split(",") if "=" in s)
+        return {name.strip(): level.strip() for name, level in pairs}
+
+    @field_validator("TENANT_HOSTS")
+    @classmethod
+    def _normalize_hosts(cls, v):
+        # Matched against the request's Host header, lowercased and without port
+        return {host.split(":", 1)[0].lower(): tenant for host, tenant in v.items()}
+
     @classmethod
     def load_from_env(cls, env_file: str = ".env.local") -> "Config":
         load_dotenv(env_file)
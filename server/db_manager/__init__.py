@@ -2,7 +2,18 @@ from .db_manager import DBManager, DatabaseConfig
 from config import config
 
 db_manager = DBManager(
-    db_config=DatabaseConfig(kind="supabase", dsn=config.POSTGRES_DSN),
+    db_config=DatabaseConfig(
+        kind="supabase",
+        dsn=config.POSTGRES_DSN,
+        replica_dsn=config.POSTGRES_REPLICA_DSN,
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        pool_timeout=config.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=config.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=config.DB_POOL_PRE_PING,
+        statement_timeout_ms=config.DB_STATEMENT_TIMEOUT_MS,
+        prepared_statements=config.DB_PREPARED_STATEMENTS,
+    ),
 )
 
 __all__ = ["db_manager", "DBManager", "DatabaseConfig"]
@@ -1,32 +1,154 @@
-from typing import Literal
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Literal, Optional
 from collections.abc import AsyncGenerator
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from sqlalchemy import text
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio.engine import AsyncEngine
 
 from config import config
 from local_logs.logger import logger
 from models import Base
+from telemetry import observe_stage, registry
 
 
 class DatabaseConfig(BaseModel):
+    """
+    Engine and pool settings.
+
+    :param kind: Backend flavour.
+    :param dsn: Primary (read-write) DSN.
+    :param replica_dsn: Optional read replica; read-only queries go there.
+    :param pool_size: Persistent connections per engine and process.
+    :param max_overflow: Extra connections allowed during bursts.
+    :param pool_timeout: Seconds to wait for a free connection.
+    :param pool_recycle: Recycle connections older than this (seconds).
+    :param pool_pre_ping: Test connections on checkout (survives pooler restarts).
+    :param statement_timeout_ms: Server-side statement timeout, applied with
+        `SET LOCAL` in each transaction; None = server default (no extra
+        round trip).
+    :param prepared_statements: Disable behind PgBouncer / Supabase pooler in
+        transaction mode, where server-side prepared statements break.
+    """
+
     kind: Literal["postgres", "supabase"]
     dsn: str
+    replica_dsn: Optional[str] = None
+    pool_size: int = 10
+    max_overflow: int = 20
+    pool_timeout: float = 10.0
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    statement_timeout_ms: Optional[int] = None
+    prepared_statements: bool = True
 
 
 class DBManager:
     def __init__(self, db_config: DatabaseConfig):
         # Async engine using psycopg3
-        self.engine: AsyncEngine = create_async_engine(db_config.dsn, echo=config.DEBUG)
+        self.engine: AsyncEngine = self._create_engine(db_config.dsn, db_config)
         self.session_factory = async_sessionmaker(
             bind=self.engine, expire_on_commit=False
         )
+        self._instrument(self.engine)
+
+        # Reads fall back to the primary when no replica is configured
+        self.read_engine: AsyncEngine = self.engine
+        self.read_session_factory = self.session_factory
+        if db_config.replica_dsn:
+            self.read_engine = self._create_engine(db_config.replica_dsn, db_config)
+            self.read_session_factory = async_sessionmaker(
+                bind=self.read_engine, expire_on_commit=False
+            )
+            self._instrument(self.read_engine)
+
+        registry.gauge(
+            "ragbot_db_pool",
+            "SQLAlchemy connection pool usage",
+            self._pool_stats,
+            label_names=("engine", "stat"),
+        )
+
+    @property
+    def has_replica(self) -> bool:
+        return self.read_engine is not self.engine
+
+    @staticmethod
+    def _create_engine(dsn: str, db_config: DatabaseConfig) -> AsyncEngine:
+        connect_args: Dict[str, Any] = {}
+        if dsn.startswith("postgresql+psycopg"):
+            if not db_config.prepared_statements:
+                # psycopg: never switch to server-side prepared statements
+                connect_args["prepare_threshold"] = None
+        engine = create_async_engine(
+            dsn,
+            echo=config.DEBUG,
+            pool_size=db_config.pool_size,
+            max_overflow=db_config.max_overflow,
+            pool_timeout=db_config.pool_timeout,
+            pool_recycle=db_config.pool_recycle,
+            pool_pre_ping=db_config.pool_pre_ping,
+            connect_args=connect_args,
+        )
+        if db_config.statement_timeout_ms and dsn.startswith("postgresql"):
+            # Per transaction rather than a startup `options` parameter, which
+            # PgBouncer / Supabase poolers in transaction mode reject
+            timeout = int(db_config.statement_timeout_ms)
+
+            def set_timeout(conn) -> None:
+                conn.exec_driver_sql(f"SET LOCAL statement_timeout = {timeout}")
+
+            event.listen(engine.sync_engine, "begin", set_timeout)
+        return engine
+
+    def _pool_stats(self) -> Dict[tuple, int]:
+        stats: Dict[tuple, int] = {}
+        for name, engine in (("primary", self.engine), ("replica", self.read_engine)):
+            if name == "replica" and not self.has_replica:
+                continue
+            pool = engine.sync_engine.pool
+            stats[(name, "size")] = pool.size()
+            stats[(name, "checked_out")] = pool.checkedout()
+            stats[(name, "checked_in")] = pool.checkedin()
+            stats[(name, "overflow")] = max(0, pool.overflow())
+        return stats
+
+    @staticmethod
+    def _instrument(engine: AsyncEngine) -> None:
+        """Record every statement's execution time as the `db.query` stage."""
+
+        def before(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+        def after(conn, cursor, statement, parameters, context, executemany):
+            started = conn.info["query_start"].pop()
+            observe_stage("db.query", time.perf_counter() - started)
+
+        def on_error(exception_context):
+            conn = exception_context.connection
+            if conn is not None and conn.info.get("query_start"):
+                conn.info["query_start"].pop()
+
+        event.listen(engine.sync_engine, "before_cursor_execute", before)
+        event.listen(engine.sync_engine, "after_cursor_execute", after)
+        event.listen(engine.sync_engine, "handle_error", on_error)
 
     async def get_session(self) -> AsyncGenerator[AsyncSession, None]:
         async with self.session_factory() as session:
             yield session
 
+    async def get_read_session(self) -> AsyncGenerator[AsyncSession, None]:
+        """Session on the read replica (or the primary if none) for read-only routes."""
+        async with self.read_session_factory() as session:
+            yield session
+
+    @asynccontextmanager
+    async def read_session(self) -> AsyncGenerator[AsyncSession, None]:
+        """`async with` form of `get_read_session` for use inside services."""
+        async with self.read_session_factory() as session:
+            yield session
+
     async def test_postgres(self) -> bool:
         try:
             async with self.engine.connect() as conn:
@@ -39,3 +161,11 @@ class DBManager:
     async def init_db(self):
         async with self.engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+            # create_all only builds indexes together with new tables
+            await conn.run_sync(self._create_missing_indexes)
+
+    @staticmethod
+    def _create_missing_indexes(sync_conn) -> None:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(sync_conn, checkfirst=True)
@@ -0,0 +1,4 @@
+from .chunker import Chunk, chunk_documents, split_text
+from .pipeline import IngestReport, ingest
+
+__all__ = ["Chunk", "chunk_documents", "split_text", "IngestReport", "ingest"]
@@ -0,0 +1,84 @@
+import hashlib
+from pathlib import Path
+from typing import Iterable, Iterator, List
+
+from pydantic import BaseModel
+
+SUPPORTED_SUFFIXES = (".md", ".markdown", ".txt")
+
+
+class Chunk(BaseModel):
+    """A piece of a source document, identified by its content hash."""
+
+    id: str
+    source: str
+    text: str
+
+
+def chunk_id(source: str, text: str) -> str:
+    """Stable id: unchanged chunks keep their id across runs."""
+    return hashlib.sha256(f"{source}\0{text}".encode("utf-8")).hexdigest()[:32]
+
+
+def split_text(text: str, chunk_size: int, overlap: int) -> List[str]:
+    """
+    Split text into chunks of at most `chunk_size` characters.
+
+    Paragraphs are packed greedily; a paragraph longer than `chunk_size` is
+    cut into windows. Consecutive chunks share `overlap` trailing characters
+    so an answer spanning a boundary is still retrievable.
+    """
+    if overlap >= chunk_size:
+        raise ValueError("overlap must be smaller than chunk_size")
+
+    paragraphs = [p.strip() for p in text.split("\n\n") if p.strip()]
+    pieces: List[str] = []
+    for para in paragraphs:
+        if len(para) <= chunk_size:
+            pieces.append(para)
+            continue
+        step = chunk_size - overlap
+        pieces.extend(para[i : i + chunk_size] for i in range(0, len(para), step))
+
+    chunks: List[str] = []
+    current = ""
+    for piece in pieces:
+        candidate = f"{current}\n\n{piece}" if current else piece
+        if len(candidate) <= chunk_size:
+            current = candidate
+            continue
+        if current:
+            chunks.append(current)
+        tail = current[-overlap:] if overlap and current else ""
+        current = f"{tail}\n\n{piece}" if tail else piece
+        if len(current) > chunk_size:
+            current = piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def iter_documents(roots: Iterable[str]) -> Iterator[Path]:
+    """Yield supported files under the given files/directories, sorted."""
+    for root in roots:
+        path = Path(root)
+        if path.is_file():
+            if path.suffix.lower() in SUPPORTED_SUFFIXES:
+                yield path
+            continue
+        for file in sorted(path.rglob("*")):
+            if file.is_file() and file.suffix.lower() in SUPPORTED_SUFFIXES:
+                yield file
+
+
+def chunk_documents(
+    roots: Iterable[str], *, chunk_size: int, overlap: int
+) -> List[Chunk]:
+    """Read and chunk every supported document under `roots`."""
+    chunks: List[Chunk] = []
+    for path in iter_documents(roots):
+        source = path.as_posix()
+        text = path.read_text(encoding="utf-8")
+        for piece in split_text(text, chunk_size, overlap):
+            chunks.append(Chunk(id=chunk_id(source, piece), source=source, text=piece))
+    return chunks
@@ -0,0 +1,133 @@
+import asyncio
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from pydantic import BaseModel
+
+from config import config
+from local_logs.logger import logger
+from interfaces.embedder import Embedder
+from interfaces.vector_store import VectorStore, VectorRecord
+from ingestion.chunker import Chunk, chunk_documents
+
+
+class IngestReport(BaseModel):
+    """Summary of an ingestion run."""
+
+    total_chunks: int
+    embedded: int
+    unchanged: int
+    deleted: int
+
+
+def load_manifest(path: str, target: Optional[str] = None) -> Set[str]:
+    """
+    Chunk ids written by the previous run into `target` (empty if none).
+
+    :param path: Manifest file.
+    :param target: Index the ids must have been written to; a manifest of
+        another index (e.g. after switching `VECTOR_STORE_BACKEND`) counts
+        as empty, so everything is embedded again.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return set()
+    if manifest.get("target") != target:
+        logger.warning(
+            f"[ingest] Manifest {path} is for {manifest.get('target')!r}, "
+            f"not {target!r}; re-ingesting everything"
+        )
+        return set()
+    return set(manifest.get("ids", []))
+
+
+def save_manifest(path: str, ids: Iterable[str], target: Optional[str] = None) -> None:
+    manifest = Path(path)
+    manifest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = manifest.with_name(f".{manifest.name}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"target": target, "ids": sorted(ids)}, f)
+    os.replace(tmp, manifest)
+
+
+async def embed_chunks(
+    chunks: List[Chunk],
+    embedder: Embedder,
+    *,
+    batch_size: int,
+    concurrency: int,
+) -> List[VectorRecord]:
+    """
+    Embed chunks in batches, at most `concurrency` requests in flight.
+
+    :return: Records in the same order as `chunks`.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def embed_batch(batch: List[Chunk]) -> List[VectorRecord]:
+        async with semaphore:
+            vectors = await embedder.embed_many([c.text for c in batch])
+        return [
+            VectorRecord(id=c.id, text=c.text, values=v, metadata={"source": c.source})
+            for c, v in zip(batch, vectors)
+        ]
+
+    batches = [chunks[i : i + batch_size] for i in range(0, len(chunks), batch_size)]
+    results = await asyncio.gather(*(embed_batch(b) for b in batches))
+    return [record for batch in results for record in batch]
+
+
+async def ingest(
+    roots: Iterable[str],
+    *,
+    store: VectorStore,
+    embedder: Embedder,
+    manifest_path: str = config.INGEST_MANIFEST_PATH,
+    target: Optional[str] = None,
+    chunk_size: int = config.INGEST_CHUNK_SIZE,
+    overlap: int = config.INGEST_CHUNK_OVERLAP,
+    batch_size: int = config.INGEST_BATCH_SIZE,
+    concurrency: int = config.INGEST_CONCURRENCY,
+    prune: bool = True,
+) -> IngestReport:
+    """
+    Incrementally sync the documents under `roots` into `store`.
+
+    Chunk ids are content hashes, so only chunks that are new or changed since
+    the last run (per the manifest) are embedded and upserted. With `prune`,
+    ids from the previous run that no longer exist are deleted; `roots` must
+    then cover the whole corpus. `target` names the index behind `store`;
+    the manifest only applies to the index it was written for.
+    """
+    chunks = chunk_documents(roots, chunk_size=chunk_size, overlap=overlap)
+    unique: Dict[str, Chunk] = {c.id: c for c in chunks}
+    previous = load_manifest(manifest_path, target)
+
+    fresh = [c for id_, c in unique.items() if id_ not in previous]
+    stale = sorted(previous - unique.keys()) if prune else []
+    logger.info(
+        f"[ingest] {len(unique)} chunk(s): {len(fresh)} to embed, "
+        f"{len(unique) - len(fresh)} unchanged, {len(stale)} stale"
+    )
+
+    if fresh:
+        records = await embed_chunks(
+            fresh, embedder, batch_size=batch_size, concurrency=concurrency
+        )
+        await store.upsert(records)
+    if stale:
+        await store.delete(stale)
+    await store.flush()
+
+    kept = unique.keys() if prune else unique.keys() | previous
+    save_manifest(manifest_path, kept, target)
+    return IngestReport(
+        total_chunks=len(unique),
+        embedded=len(fresh),
+        unchanged=len(unique) - len(fresh),
+        deleted=len(stale),
+    )
@@ -0,0 +1,86 @@
+# run.py
+import argparse
+import asyncio
+import os
+import sys
+
+if sys.platform.startswith("win"):
+    asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+
+from config import config
+from ingestion import ingest
+from services.container import get_vector_store
+from services.open_ai_embedder import OpenAIEmbedder
+from services.tenancy import DEFAULT_TENANT, tenant_path, use_tenant
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Sync markdown/text documents into the configured vector store."
+    )
+    parser.add_argument("paths", nargs="+", help="Files or directories to ingest")
+    parser.add_argument("--chunk-size", type=int, default=config.INGEST_CHUNK_SIZE)
+    parser.add_argument("--overlap", type=int, default=config.INGEST_CHUNK_OVERLAP)
+    parser.add_argument("--batch-size", type=int, default=config.INGEST_BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=config.INGEST_CONCURRENCY)
+    parser.add_argument(
+        "--tenant",
+        default=DEFAULT_TENANT,
+        choices=[DEFAULT_TENANT, *config.TENANTS],
+        help="Tenant whose index receives the documents (default: the default tenant)",
+    )
+    parser.add_argument(
+        "--manifest",
+        help="Manifest of ingested chunk ids (default: per tenant, next to INGEST_MANIFEST_PATH)",
+    )
+    parser.add_argument(
+        "--no-prune",
+        action="store_true",
+        help="Keep chunks from previous runs that are not in PATHS",
+    )
+    return parser.parse_args()
+
+
+def default_manifest(tenant: str) -> str:
+    """INGEST_MANIFEST_PATH, moved into the tenant's subdirectory."""
+    base, name = os.path.split(config.INGEST_MANIFEST_PATH)
+    return os.path.join(tenant_path(base or ".", tenant), name)
+
+
+def index_target(tenant: str) -> str:
+    """The indexes `get_vector_store()` writes to for `tenant`, as one string."""
+
+    def local(kind: str, base: str) -> str:
+        return f"{kind}:{os.path.abspath(tenant_path(base, tenant))}"
+
+    if config.VECTOR_STORE_BACKEND == "numpy":
+        target = local("numpy", config.VECTOR_STORE_SNAPSHOT_DIR)
+    elif config.VECTOR_STORE_BACKEND == "hnsw":
+        target = local("hnsw", config.HNSW_INDEX_DIR)
+    else:
+        target = f"pinecone:{config.PINECONE_INDEX_HOST}#{tenant}"
+    if config.RETRIEVAL_HYBRID_ENABLED:
+        target += " " + local("bm25", config.BM25_INDEX_DIR)
+    return target
+
+
+async def main(args: argparse.Namespace) -> None:
+    with use_tenant(args.tenant):
+        report = await ingest(
+            args.paths,
+            store=get_vector_store(),
+            embedder=OpenAIEmbedder(),
+            manifest_path=args.manifest or default_manifest(args.tenant),
+            target=index_target(args.tenant),
+            chunk_size=args.chunk_size,
+            overlap=args.overlap,
+            batch_size=args.batch_size,
+            concurrency=args.concurrency,
+            prune=not args.no_prune,
+        )
+    print(report.model_dump_json())
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
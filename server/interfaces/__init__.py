@@ -1,7 +1,14 @@
 from interfaces.embedder import Embedder
 from interfaces.llm_generator import LLMGenerator
 from interfaces.rag import RAG
-from interfaces.vector_store import VectorStore
+from interfaces.vector_store import RetrievalUnavailable, VectorStore, VectorRecord
 from config import config
 
-__all__ = ["Embedder", "LLMGenerator", "RAG", "VectorStore"]
+__all__ = [
+    "Embedder",
+    "LLMGenerator",
+    "RAG",
+    "RetrievalUnavailable",
+    "VectorStore",
+    "VectorRecord",
+]
@@ -1,6 +1,7 @@
 # interfaces/embedder.py
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Sequence
 
 
 class Embedder(ABC):
@@ -19,6 +20,18 @@ class Embedder(ABC):
         """
         raise NotImplementedError
 
+    async def embed_many(self, texts: Sequence[str]) -> List[List[float]]:
+        """
+        Generate embedding vectors for several texts.
+
+        Providers with a native batch endpoint should override this; the
+        default simply embeds each text concurrently.
+
+        :param texts: Input texts to embed.
+        :return: One embedding vector per input, in input order.
+        """
+        return list(await asyncio.gather(*(self.embed(t) for t in texts)))
+
     @property
     @abstractmethod
     def dimension(self) -> int:
@@ -1,12 +1,68 @@
-from typing import List
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
 from abc import ABC, abstractmethod
 
 
+class RetrievalUnavailable(Exception):
+    """
+    A store could not answer in time and had nothing to fall back on.
+
+    Raised for transient conditions (circuit breaker open, deadline missed),
+    never for real errors; callers may answer without the store's results.
+
+    :param reason: "breaker_open" or "deadline".
+    """
+
+    def __init__(self, reason: str):
+        super().__init__(f"Retrieval unavailable: {reason}")
+        self.reason = reason
+
+
+@dataclass
+class VectorRecord:
+    """A chunk ready to be written to a vector store."""
+
+    id: str
+    text: str
+    values: List[float]
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
 class VectorStore(ABC):
     @abstractmethod
-    async def get_relevant_chunks(self, query: str, top_k: int) -> List[str]:
+    async def get_relevant_chunks(
+        self, query: str, top_k: int, *, vector: Optional[List[float]] = None
+    ) -> List[str]:
+        """
+        Chunks most relevant to `query`.
+
+        `vector`, when given, is the caller's embedding of `query` (e.g. the
+        one already computed for the answer cache); stores use it instead
+        of embedding again.
+        """
         pass
 
     @abstractmethod
     async def health_check(self) -> bool:
         pass
+
+    async def upsert(self, records: Sequence[VectorRecord]) -> None:
+        """Insert or replace records by id."""
+        raise NotImplementedError(f"{type(self).__name__} is read-only")
+
+    async def delete(self, ids: Sequence[str]) -> None:
+        """Remove records by id; unknown ids are ignored."""
+        raise NotImplementedError(f"{type(self).__name__} is read-only")
+
+    async def flush(self) -> None:
+        """
+        Persist writes that `upsert`/`delete` buffered.
+
+        Local indexes defer their rebuild until a bulk load is done; callers
+        that write (e.g. ingestion) call this once at the end. A no-op for
+        stores that write through.
+        """
+
+    def memory_bytes(self) -> int:
+        """Approximate in-process footprint; 0 for remote stores."""
+        return 0
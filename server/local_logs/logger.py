@@ -1,11 +1,78 @@
+import atexit
+import copy
+import json
 import logging
+import queue
+import random
 import sys
+from collections import OrderedDict
+from datetime import datetime, timezone
 from pathlib import Path
-from logging.handlers import TimedRotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 from typing import Any, Optional, Tuple
 
 from config import config
 
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RECORD_ATTRS = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", None, None)).keys()
+) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; `extra=` fields are included as keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                payload[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler that never blocks the caller.
+
+    Records are rendered (message + traceback text) on the calling thread so
+    nothing mutable crosses threads; when the queue is full they are dropped
+    and counted instead of stalling the event loop.
+    """
+
+    def __init__(self, q: "queue.Queue[logging.LogRecord]"):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _level(name: str) -> int:
+    level = logging.getLevelName(name.strip().upper())
+    return level if isinstance(level, int) else logging.INFO
+
 
 class AppLogger:
     """
@@ -14,26 +81,43 @@ class AppLogger:
     - Use error(..., basic=True) for short one-line errors (no stack).
     - Use error(..., exc=e, once=config.DEBUG) exactly ONCE at the boundary to log full traceback.
     - Any later calls with the same exception info will be downshifted to a basic line.
+    - Use info(msg, *args, sample=rate) on hot paths: args are formatted lazily
+      and only a `rate` fraction of lines is emitted.
+
+    File and console I/O happen on a background QueueListener thread, so a
+    slow disk or stdout pipe never stalls the caller.
     """
 
+    # Max remembered exception fingerprints (LRU)
+    MAX_FINGERPRINTS = 1024
+
     def __init__(self, name: str = "eloquent", log_dir: str = "local_logs/logs"):
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(parents=True, exist_ok=True)
 
+        default_level = (
+            _level(config.LOG_LEVEL)
+            if config.LOG_LEVEL
+            else (logging.DEBUG if config.DEBUG else logging.INFO)
+        )
+
         self._logger = logging.getLogger(name)
-        self._logger.setLevel(logging.DEBUG if config.DEBUG else logging.INFO)
+        self._logger.setLevel(default_level)
         self._logger.propagate = False
 
         if self._logger.handlers:
             for h in list(self._logger.handlers):
                 self._logger.removeHandler(h)
 
-        fmt = logging.Formatter(
-            fmt="[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S",
-        )
+        if config.LOG_FORMAT == "json":
+            fmt: logging.Formatter = JsonFormatter()
+        else:
+            fmt = logging.Formatter(
+                fmt="[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s",
+                datefmt="%Y-%m-%d %H:%M:%S",
+            )
 
-        # File: app.log (INFO+)
+        # File: app.log; levels are enforced per logger, see LOG_LEVELS below
         app_handler = TimedRotatingFileHandler(
             filename=str(self.log_dir / "app.log"),
             when="D",
@@ -41,9 +125,7 @@ class AppLogger:
             backupCount=7,
             encoding="utf-8",
         )
-        app_handler.setLevel(logging.DEBUG if config.DEBUG else logging.INFO)
         app_handler.setFormatter(fmt)
-        self._logger.addHandler(app_handler)
 
         # File: error.log (ERROR+)
         err_handler = TimedRotatingFileHandler(
@@ -55,23 +137,70 @@ class AppLogger:
         )
         err_handler.setLevel(logging.ERROR)
         err_handler.setFormatter(fmt)
-        self._logger.addHandler(err_handler)
 
         # Stdout
         console = logging.StreamHandler(sys.stdout)
-        console.setLevel(logging.DEBUG if config.DEBUG else logging.INFO)
         console.setFormatter(fmt)
-        self._logger.addHandler(console)
 
-        # very small, process-lifetime cache of already-logged exceptions
-        self._seen_exc_fingerprints: set[Tuple[str, str]] = set()
+        log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(
+            maxsize=config.LOG_QUEUE_SIZE
+        )
+        self._queue_handler = _NonBlockingQueueHandler(log_queue)
+        self._logger.addHandler(self._queue_handler)
+
+        # Per-logger overrides, e.g. LOG_LEVELS="eloquent=WARNING,sqlalchemy.engine=INFO".
+        # Each configured library logger gets the queue handler too, otherwise
+        # its records would only reach the (usually unconfigured) root logger.
+        for logger_name, level in config.LOG_LEVELS.items():
+            configured = logging.getLogger(logger_name)
+            configured.setLevel(_level(level))
+            if configured is not self._logger:
+                configured.addHandler(self._queue_handler)
+                configured.propagate = False
+
+        self._listener: Optional[QueueListener] = QueueListener(
+            log_queue, app_handler, err_handler, console, respect_handler_level=True
+        )
+        self._listener.start()
+        atexit.register(self.stop)
+
+        # small, bounded cache of already-logged exceptions
+        self._seen_exc_fingerprints: "OrderedDict[Tuple[str, str], None]" = (
+            OrderedDict()
+        )
+
+    @property
+    def dropped(self) -> int:
+        """Records dropped because the log queue was full."""
+        return self._queue_handler.dropped
+
+    def stop(self) -> None:
+        """Flush queued records and stop the writer thread."""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+    def _seen(self, fp: Tuple[str, str]) -> bool:
+        if fp in self._seen_exc_fingerprints:
+            self._seen_exc_fingerprints.move_to_end(fp)
+            return True
+        self._seen_exc_fingerprints[fp] = None
+        if len(self._seen_exc_fingerprints) > self.MAX_FINGERPRINTS:
+            self._seen_exc_fingerprints.popitem(last=False)
+        return False
 
     # ---- Public convenience methods ----
-    def info(self, msg: Any, **kwargs) -> None:
-        self._logger.info(msg, extra=kwargs or None)
+    def info(
+        self, msg: Any, *args: Any, sample: Optional[float] = None, **kwargs
+    ) -> None:
+        if not self._logger.isEnabledFor(logging.INFO):
+            return
+        if sample is not None and sample < 1.0 and random.random() >= sample:
+            return
+        self._logger.info(msg, *args, extra=kwargs or None)
 
-    def warning(self, msg: str, **kwargs) -> None:
-        self._logger.warning(msg, extra=kwargs or None)
+    def warning(self, msg: str, *args: Any, **kwargs) -> None:
+        self._logger.warning(msg, *args, extra=kwargs or None)
 
     def error(
         self,
@@ -99,13 +228,12 @@ class AppLogger:
         fp = (type(exc).__name__, str(exc)[:500])
 
         if once:
-            if fp in self._seen_exc_fingerprints:
+            if self._seen(fp):
                 # already logged with stack; keep it short now
                 self._logger.error(msg, exc_info=False, extra=kwargs or None)
             else:
-                self._seen_exc_fingerprints.add(fp)
                 # full traceback exactly once
-                self._logger.exception(msg, exc_info=True, extra=kwargs or None)
+                self._logger.error(msg, exc_info=exc, extra=kwargs or None)
         else:
             # inner layer: short line, no traceback; boundary logs stack
             self._logger.error(msg, exc_info=False, extra=kwargs or None)
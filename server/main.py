@@ -1,19 +1,35 @@
-from fastapi import FastAPI, Request, Response
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from uuid import uuid4
 from db_manager import db_manager
 from config import config
 from routers import system, chat, sessions, rag, auth
+from services import container
+from services.fast_json import FastJSONResponse
+from services.tenancy import bind_tenant
+from telemetry import setup_tracing
 
 # routes
 from routers.sessions import router as sessions_router
 
 SESSION_COOKIE_NAME = "sid"
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    setup_tracing()
+    yield
+    await container.shutdown()
+
+
 app = FastAPI(
     title=config.APP_NAME,
     version="0.1.0",
     debug=config.DEBUG,
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+    dependencies=[Depends(bind_tenant)],
 )
 
 app.add_middleware(
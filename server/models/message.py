@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, DateTime, ForeignKey, String, Text, func
+from sqlalchemy import Column, DateTime, ForeignKey, Index, String, Text, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from .base import Base
@@ -9,6 +9,10 @@ class Message(Base):
     """Represents a chat message sent by a user or finbot."""
 
     __tablename__ = "messages"
+    __table_args__ = (
+        # Serves "last N messages of a session" with an index range scan
+        Index("ix_messages_session_id_created_at", "session_id", "created_at"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     session_id = Column(
@@ -1,10 +1,13 @@
-from typing import Iterable, Tuple, List
+from functools import lru_cache
+from typing import Iterable, Tuple, List, Optional
 from openai.types.chat import ChatCompletionMessageParam
 from models import Message
 from config import config
+from prompts.tokens import MESSAGE_OVERHEAD_TOKENS, count_tokens, truncate_tokens
+from services.tenancy import company_name
 
-SYSTEM_PROMPT = f"""
-You are FinBot, an AI assistant for {config.COMPANY_NAME}, a fintech company.
+_SYSTEM_TEMPLATE = """
+You are FinBot, an AI assistant for {company}, a fintech company.
 You help users with account, payments, security, regulations, and support questions.
 
 ## Core Behavior
@@ -22,7 +25,7 @@ You help users with account, payments, security, regulations, and support questi
 5. Technical Support - login issues, app errors, troubleshooting
 
 ## Guidelines
-- Base answers on {config.COMPANY_NAME}'s docs when possible
+- Base answers on {company}'s docs when possible
 - If unsure, say: "I don't have specific info in our knowledge base"
 - For account-specific issues: always direct to customer support
 - Never invent policies, fees, or legal rules
@@ -43,69 +46,130 @@ Always direct to customer support if user mentions:
 """
 
 
-def _format_context(chunks: Iterable[str], max_chars: int = 4000) -> str:
-    """Concatenate retrieved chunks into a bounded context block."""
-    chunk_list, total_chars = [], 0
+@lru_cache(maxsize=64)
+def system_prompt(company: str) -> str:
+    """System prompt branded for `company` (one per tenant)."""
+    return _SYSTEM_TEMPLATE.format(company=company)
+
+
+SYSTEM_PROMPT = system_prompt(config.COMPANY_NAME)
+
+
+_CONTEXT_SEPARATOR = "\n\n---\n\n"
+# Don't bother squeezing in a truncated chunk smaller than this
+_MIN_PARTIAL_CHUNK_TOKENS = 64
+
+USER_TEMPLATE = """
+\"\"\"
+CONTEXT:
+{context}
+\"\"\"
+
+---
+User Query:
+{query}
+"""
+
+
+def _format_context(chunks: Iterable[str], max_tokens: int) -> Tuple[str, int]:
+    """
+    Concatenate retrieved chunks (in rank order) into a token-bounded block.
+
+    :return: The context block and its token count.
+    """
+    separator = count_tokens(_CONTEXT_SEPARATOR)
+    chunk_list, used = [], 0
     for chunk in chunks:
         chunk = (chunk or "").strip()
         if not chunk:
             continue
-        if total_chars + len(chunk) > max_chars:
+        joint = separator if chunk_list else 0
+        cost = count_tokens(chunk) + joint
+        if used + cost > max_tokens:
+            room = max_tokens - used - joint
+            if room >= _MIN_PARTIAL_CHUNK_TOKENS:
+                chunk_list.append(truncate_tokens(chunk, room))
+                used += room + joint
             break
         chunk_list.append(chunk)
-        total_chars += len(chunk)
-    return "\n\n---\n\n".join(chunk_list) if chunk_list else ""
+        used += cost
+    return _CONTEXT_SEPARATOR.join(chunk_list), used
 
 
-def _format_history(history: List[Message], max_pairs: int = 6) -> str:
+def _select_history(
+    history: List[Message], max_tokens: int, max_pairs: int = 6
+) -> List[Message]:
     """
-    Format chat history as lines: 'user: ...' / 'finbot: ...'
-    Only last `max_pairs` will be included
-    `history` is an iterable of (role, content) with role in {'user', 'finbot'}.
+    Most recent messages that fit in `max_tokens`, oldest first.
+
+    At most `max_pairs` user/finbot pairs are kept; selection stops at the
+    first message that doesn't fit so the kept turns stay contiguous.
     """
-    buffer = []
-    count = 0
+    selected: List[Message] = []
+    used = 0
     for hist in reversed(history):
-        if count >= max_pairs * 2:
+        if len(selected) >= max_pairs * 2:
             break
-        buffer.append(f"{hist.role}: {hist.content.strip()}")
-        count += 1
-    buffer.reverse()
-    return "\n".join(buffer)
+        cost = count_tokens(hist.content.strip()) + MESSAGE_OVERHEAD_TOKENS
+        if used + cost > max_tokens:
+            break
+        selected.append(hist)
+        used += cost
+    selected.reverse()
+    return selected
 
 
 def build_messages(
-    *, query: str, chunks: Iterable[str], history: List[Message] = []
+    *,
+    query: str,
+    chunks: Iterable[str],
+    history: List[Message] = [],
+    max_tokens: Optional[int] = None,
 ) -> List[ChatCompletionMessageParam]:
     """
-    Render the final prompt with system rules, bounded context, short history, and the user query.
-    """
+    Render the prompt within a token budget (`PROMPT_TOKEN_BUDGET` by default).
 
-    context_block = _format_context(chunks=chunks)
-    history_block = (
-        _format_history(history=history, max_pairs=config.HISTORY_LIMIT)
-        if len(history) > 1
-        else []
-    )
-    user_content = f"""
-\"\"\"
-CONTEXT:
-{context_block if context_block else '[no relevant context retrieved]'}
-\"\"\"
-
----
+    The system prompt and query are always included (the query capped at
+    `PROMPT_QUERY_MAX_TOKENS`). Of what remains, `PROMPT_CONTEXT_SHARE` goes
+    to retrieved context and the rest, plus any unused context share, to
+    recent history.
 
-\"\"\"
-CHAT HISTORY (recent):
-{history_block  if history_block  else '[none]'}
-\"\"\"
+    Messages are ordered from most to least stable - system prompt, prior
+    turns as native chat messages, then context + query - so consecutive
+    turns of a session share a long prefix for provider-side prompt caching.
+    """
+    budget = max_tokens if max_tokens is not None else config.PROMPT_TOKEN_BUDGET
+    system = system_prompt(company_name())
+    query_text = truncate_tokens(query.strip(), config.PROMPT_QUERY_MAX_TOKENS)
+    available = max(
+        0,
+        budget
+        - count_tokens(system)
+        - count_tokens(USER_TEMPLATE)
+        - count_tokens(query_text)
+        - 2 * MESSAGE_OVERHEAD_TOKENS,
+    )
 
----
-User Query:
-{query.strip()}
-"""
+    context_block, context_tokens = _format_context(
+        chunks, max_tokens=int(available * config.PROMPT_CONTEXT_SHARE)
+    )
+    turns = _select_history(
+        history, max_tokens=available - context_tokens, max_pairs=config.HISTORY_LIMIT
+    )
 
-    return [
-        {"role": "system", "content": SYSTEM_PROMPT},
-        {"role": "user", "content": user_content},
-    ]
+    messages: List[ChatCompletionMessageParam] = [{"role": "system", "content": system}]
+    for m in turns:
+        if m.role == "user":
+            messages.append({"role": "user", "content": m.content.strip()})
+        else:
+            messages.append({"role": "assistant", "content": m.content.strip()})
+    messages.append(
+        {
+            "role": "user",
+            "content": USER_TEMPLATE.format(
+                context=context_block or "[no relevant context retrieved]",
+                query=query_text,
+            ),
+        }
+    )
+    return messages
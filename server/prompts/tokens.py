@@ -0,0 +1,70 @@
+from functools import lru_cache
+from typing import Any, Optional
+
+from config import config
+from local_logs.logger import logger
+
+# Rough per-message framing cost of the chat format (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+# Fallback estimate when no tokenizer is available
+_CHARS_PER_TOKEN = 4
+
+_encoding: Optional[Any] = None
+_encoding_loaded = False
+
+
+def _get_encoding() -> Optional[Any]:
+    """
+    tiktoken encoding for CHAT_MODEL, loaded once.
+
+    tiktoken is optional (and downloads its BPE files on first use); if it is
+    missing or cannot load, counts fall back to a chars/4 estimate.
+    """
+    global _encoding, _encoding_loaded
+    if _encoding_loaded:
+        return _encoding
+    _encoding_loaded = True
+    try:
+        import tiktoken
+
+        try:
+            _encoding = tiktoken.encoding_for_model(config.CHAT_MODEL)
+        except KeyError:
+            _encoding = tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning(
+            "[prompts] tiktoken unavailable (%s); estimating tokens from length", e
+        )
+        _encoding = None
+    return _encoding
+
+
+@lru_cache(maxsize=8192)
+def count_tokens(text: str) -> int:
+    """
+    Token count of `text`, memoized (static prompts and stored messages are
+    counted once).
+
+    :param text: Text to count.
+    """
+    encoding = _get_encoding()
+    if encoding is None:
+        return -(-len(text) // _CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cut `text` to at most `max_tokens` tokens.
+
+    :param text: Text to truncate.
+    :param max_tokens: Token limit.
+    """
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    encoding = _get_encoding()
+    if encoding is None:
+        return text[: max_tokens * _CHARS_PER_TOKEN]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
@@ -1,9 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
-from typing import List
+from typing import AsyncIterator, List, Optional, Sequence
 from db_manager import db_manager
-from services.chat import get_messages, add_message, clear_session
+from services.container import get_message_writer, get_shared_cache
+from services.chat import stream_messages, add_message, clear_session
+from services.streaming import NDJSON
+from services.fast_json import dumps
 from schemas.message import MessageResponse
 
 
@@ -13,14 +18,99 @@ from local_logs.logger import logger
 router = APIRouter(prefix="/chat", tags=["Chat"])
 
 
+def _encode(row: Row) -> bytes:
+    """One message as JSON, shaped like MessageResponse (no model per row)."""
+    id_, session_id, role, content, created_at = row
+    return dumps(
+        {
+            "id": id_,
+            "session_id": session_id,
+            "role": role,
+            "content": content,
+            "created_at": created_at,
+        }
+    )
+
+
+async def _export(
+    session_id: UUID, limit: Optional[int], before: Optional[UUID]
+) -> AsyncIterator[Sequence[Row]]:
+    # Messages still queued by the write-behind writer are newer than every
+    # committed row, so they end the newest page
+    writer = get_message_writer()
+    pending = writer.pending(session_id) if writer and before is None else []
+    if limit is not None:
+        pending = pending[-limit:]
+        limit -= len(pending)
+    queued = {m.id for m in pending}
+
+    if limit != 0:
+        # Owns its session: the cursor must outlive the request handler
+        async with db_manager.read_session() as session:
+            async for batch in stream_messages(
+                session,
+                session_id,
+                limit=limit,
+                before=before,
+                batch_size=config.CHAT_EXPORT_BATCH_SIZE,
+            ):
+                # A queued message may have been committed meanwhile
+                rows = [row for row in batch if row[0] not in queued]
+                if rows:
+                    yield rows
+    if pending:
+        yield [
+            (m.id, m.session_id, m.role, m.content, m.created_at)  # type: ignore[misc]
+            for m in pending
+        ]
+
+
 @router.get("/{session_id}", response_model=List[MessageResponse])
 async def get_chat_history(
-    session_id: UUID, session: AsyncSession = Depends(db_manager.get_session)
+    session_id: UUID,
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, description="Newest N messages only"),
+    before: Optional[UUID] = Query(
+        None, description="Message id; only older messages are returned"
+    ),
 ):
     """
-    Fetch all messages in given chat session, ordered by time
+    Fetch messages in given chat session, ordered by time.
+
+    The body is streamed from a server-side cursor, batch by batch, as a JSON
+    array, or as one message per line when the client accepts
+    `application/x-ndjson`. `limit`/`before` page backwards: pass the id of
+    the first (oldest) message received as `before` to get the page before it.
+    Messages still queued by the write-behind writer are included.
     """
-    return await get_messages(session, session_id)
+    ndjson = NDJSON.media_type in (request.headers.get("accept") or "").lower()
+    batches = _export(session_id, limit, before)
+    # Pull the first batch here so query errors still become a 500 response
+    first = await anext(batches, None)
+
+    async def body() -> AsyncIterator[bytes]:
+        try:
+            batch = first
+            sep = b"" if ndjson else b"["
+            while batch is not None:
+                if ndjson:
+                    yield b"".join(_encode(row) + b"\n" for row in batch)
+                else:
+                    yield sep + b",".join(_encode(row) for row in batch)
+                    sep = b","
+                batch = await anext(batches, None)
+            if not ndjson:
+                yield b"]" if sep == b"," else b"[]"
+        except HTTPException:
+            pass  # already logged; the truncated body signals the failure
+        finally:
+            await batches.aclose()
+
+    return StreamingResponse(
+        body(),
+        media_type=NDJSON.media_type if ndjson else "application/json",
+        headers={"Cache-Control": "no-store"},
+    )
 
 
 @router.delete("/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -28,6 +118,11 @@ async def delete_chat(
     session_id: UUID, session: AsyncSession = Depends(db_manager.get_session)
 ):
     """
-    Remove all messages from a session.
+    Remove all messages from a session, and its cached history.
     """
-    await clear_session(session, session_id=session_id)
+    await clear_session(
+        session,
+        session_id=session_id,
+        writer=get_message_writer(),
+        cache=get_shared_cache(),
+    )
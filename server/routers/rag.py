@@ -1,12 +1,22 @@
-from fastapi import APIRouter, status, Request, Depends
+import math
+
+from fastapi import APIRouter, HTTPException, status, Request, Depends
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from db_manager import db_manager
 from schemas.rag import RAGQuery
 
-from services.container import get_rag_pipeline
+from services.admission import AdmissionRejected
+from services.container import (
+    get_admission,
+    get_rag_pipeline,
+    get_message_writer,
+    get_shared_cache,
+)
 from services.rag import RAGService
+from services.sessions import get_session
+from services.streaming import coalesce, negotiate
 
 
 from config import config
@@ -16,7 +26,9 @@ router = APIRouter(prefix="/rag", tags=["RAG"])
 
 
 def get_rag_service() -> RAGService:
-    return RAGService(get_rag_pipeline())
+    return RAGService(
+        get_rag_pipeline(), writer=get_message_writer(), cache=get_shared_cache()
+    )
 
 
 @router.post("/query", status_code=status.HTTP_202_ACCEPTED)
@@ -29,8 +41,14 @@ async def rag_stream(
     """Stream a retrieval-augmented response for the given user query.
 
     Persists the user message, threads recent chat history into the prompt,
-    streams the assistant response chunk-by-chunk, and finally persists the
-    full assistant message (best effort) even if the client disconnects.
+    streams the assistant response in coalesced frames, and finally persists
+    the full assistant message (best effort) even if the client disconnects.
+
+    The wire format follows the Accept header: `text/event-stream` (SSE with
+    `delta`/`bubble`/`done` events), `application/x-ndjson` (one JSON object
+    per line, same event types), otherwise raw UTF-8 text with inline
+    `[[NEW_BUBBLE]]` delimiters. On disconnect the upstream LLM stream is
+    closed immediately.
 
     Args:
         query (RAGQuery): Pydantic payload containing session_id and message.
@@ -39,23 +57,48 @@ async def rag_stream(
         svc (RAGService): Orchestrator that encapsulates RAG business logic.
 
     Returns:
-        StreamingResponse: UTF-8 text stream containing assistant chunks.
+        StreamingResponse: Assistant frames in the negotiated format.
 
     Raises:
-        HTTPException: 400 on invalid input, 5xx on unexpected errors.
+        HTTPException: 400 on invalid input, 404 for an unknown session,
+            429 (with Retry-After) when OpenAI chat or embeddings are at
+            their rate or concurrency limit, 5xx on unexpected errors.
     """
+    # The session id comes from the client; messages must never be queued
+    # for a session that doesn't exist (see MessageWriter)
+    await get_session(db, query.session_id)
+
+    # Shed load before the stream starts; once it has, errors can only
+    # surface as the in-band fallback message.
+    try:
+        get_admission("embeddings").check()
+        get_admission("chat").check()
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+        ) from None
+    fmt = negotiate(request.headers.get("accept"))
 
     async def gen():
-        async for chunk in rag_service.stream(
-            db,
-            session_id=query.session_id,
-            user_text=query.message,
+        frames = coalesce(
+            rag_service.stream(
+                db, session_id=query.session_id, user_text=query.message
+            ),
+            max_chars=config.STREAM_FRAME_MAX_CHARS,
+            max_delay_ms=config.STREAM_FRAME_MAX_MS,
+            split_bubbles=fmt.split_bubbles,
             is_disconnected=request.is_disconnected,
-        ):
-            yield chunk
+            poll_interval_ms=config.STREAM_DISCONNECT_POLL_MS,
+        )
+        async for frame in frames:
+            yield fmt.encode(frame)
+        if fmt.done:
+            yield fmt.done
 
     return StreamingResponse(
         gen(),
-        media_type="text/plain; charset=utf-8",
-        headers={"Cache-Control": "no-store"},
+        media_type=fmt.media_type,
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"},
     )
@@ -1,10 +1,11 @@
 from typing import Optional
-from fastapi import APIRouter, Depends, status, Request, Response
+from fastapi import APIRouter, Depends, status, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from db_manager import db_manager
 from schemas.message import IntroMessage
 from schemas.session import SessionOut
+from services.fast_json import FastJSONResponse
 
 from services.auth import Auth, get_auth_optional
 from services.sessions import (
@@ -19,10 +20,16 @@ from config import config
 router = APIRouter(prefix="/session", tags=["Session"])
 
 
+def _session_out(session, status_code: int = status.HTTP_200_OK) -> FastJSONResponse:
+    # Columns straight to JSON; skips from_attributes validation of SessionOut
+    return FastJSONResponse(
+        {"id": session.id, "created_at": session.created_at}, status_code=status_code
+    )
+
+
 @router.post("/", response_model=SessionOut, status_code=status.HTTP_201_CREATED)
 async def create_or_resume_session(
     request: Request,
-    response: Response,
     db: AsyncSession = Depends(db_manager.get_session),
     auth: Optional[Auth] = Depends(get_auth_optional),
 ):
@@ -31,9 +38,10 @@ async def create_or_resume_session(
     """
     cookie = request.cookies.get(config.SESSION_COOKIE_NAME)
     session, should_set_cookie = await create_or_resolve_session(db, auth, cookie)
+    response = _session_out(session, status.HTTP_201_CREATED)
     if should_set_cookie:
         set_cookie(str(session.id), response)
-    return session
+    return response
 
 
 @router.get("/{session_id}", response_model=SessionOut)
@@ -53,7 +61,8 @@ async def get_session_by_id(
     Raises:
         HTTPException: 500 on failure to get.
     """
-    return await svc_get_session(db, session_id)
+    # Replica first; the primary answers for a session created moments ago
+    return _session_out(await svc_get_session(db, session_id, prefer_replica=True))
 
 
 @router.get("/{session_id}/intro", response_model=IntroMessage)
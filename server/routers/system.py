@@ -1,12 +1,14 @@
 from typing import Optional
 from fastapi import APIRouter, Request, Response, Depends
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from services.sessions import set_cookie, create_or_resolve_session
 from services.auth import Auth, get_auth_optional
-from services.container import get_vector_store
+from services.container import get_vector_store, get_message_writer
 
 from db_manager import db_manager
+from telemetry import registry
 
 from config import config
 
@@ -18,7 +20,21 @@ async def health():
 
     pg_ok = await db_manager.test_postgres()
     pc_ok = await get_vector_store().health_check()
-    return {"status": "ok", "postgres": pg_ok, "pinecone": pc_ok}
+    writer = get_message_writer()
+    return {
+        "status": "ok",
+        "postgres": pg_ok,
+        "pinecone": pc_ok,
+        "message_queue_depth": writer.depth if writer else 0,
+    }
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text-format metrics for this worker."""
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
 
 
 # Redundant route - Could be refactored later
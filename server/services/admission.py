@@ -0,0 +1,225 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, Literal, Optional
+
+from telemetry import observe_stage
+
+
+class AdmissionRejected(Exception):
+    """
+    An upstream call was not admitted.
+
+    :param provider: Name of the rejecting controller, e.g. "chat".
+    :param reason: "overloaded" (no slot in time, queue full) or "rate_limited".
+    :param retry_after: Seconds after which a retry may be admitted.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        reason: Literal["overloaded", "rate_limited"],
+        retry_after: float,
+    ):
+        detail = (
+            "capacity exhausted, retry shortly"
+            if reason == "overloaded"
+            else "rate limit reached"
+        )
+        super().__init__(f"Upstream {provider} {detail}")
+        self.provider = provider
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at `per_minute` units per minute.
+
+    Reservations are taken up front and may drive the balance negative; the
+    deficit is the time later callers must wait, so concurrent reservations
+    queue in arrival order without a background refill task.
+
+    :param per_minute: Sustained rate (requests or tokens per minute).
+    :param burst: Bucket capacity; defaults to one minute's worth.
+    """
+
+    def __init__(self, per_minute: float, burst: Optional[float] = None):
+        self._rate = per_minute / 60.0
+        self._capacity = burst or float(per_minute)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self._capacity, self._tokens + (now - self._updated) * self._rate
+        )
+        self._updated = now
+
+    @property
+    def available(self) -> float:
+        self._refill()
+        return self._tokens
+
+    def delay(self, amount: float) -> float:
+        """Seconds until `amount` units could be taken."""
+        self._refill()
+        deficit = min(amount, self._capacity) - self._tokens
+        return max(0.0, deficit / self._rate)
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self._tokens -= min(amount, self._capacity)
+
+    def refund(self, amount: float) -> None:
+        """Return a reservation that was never used."""
+        self._refill()
+        self._tokens = min(self._capacity, self._tokens + min(amount, self._capacity))
+
+
+class AdmissionController:
+    """
+    Admission control for one upstream provider.
+
+    Bounds in-flight calls with a semaphore and paces them with optional
+    request- and token-per-minute buckets. Callers beyond `max_concurrency`
+    wait in a queue of at most `max_queue`; anything that would exceed the
+    queue, or not be admitted within `timeout`, is rejected immediately with
+    `AdmissionRejected` (overloaded or rate limited, with a retry delay), so
+    bursts shed load instead of piling up provider retries.
+
+    Pacing happens before a slot is taken, so a caller sleeping off a rate
+    deficit never holds capacity another caller could use.
+
+    Not thread-safe; intended for use from the event loop only.
+
+    :param name: Provider label used in metrics, e.g. "chat".
+    :param max_concurrency: Max calls in flight at once.
+    :param max_queue: Max callers waiting for a slot.
+    :param rpm: Requests per minute; 0 disables request pacing.
+    :param tpm: Tokens per minute; 0 disables token pacing.
+    :param timeout: Max seconds a caller may wait to be admitted.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_concurrency: int,
+        max_queue: int,
+        rpm: int = 0,
+        tpm: int = 0,
+        timeout: float = 10.0,
+    ):
+        self.name = name
+        self._capacity = max(1, max_concurrency)
+        self._slots = asyncio.Semaphore(self._capacity)
+        self._max_queue = max(0, max_queue)
+        self._requests = TokenBucket(rpm) if rpm > 0 else None
+        self._tokens = TokenBucket(tpm) if tpm > 0 else None
+        self._timeout = timeout
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected_overloaded = 0
+        self.rejected_rate_limited = 0
+
+    def _overloaded(self, retry_after: float) -> AdmissionRejected:
+        self.rejected_overloaded += 1
+        return AdmissionRejected(self.name, "overloaded", retry_after)
+
+    def _rate_limited(self, retry_after: float) -> AdmissionRejected:
+        self.rejected_rate_limited += 1
+        return AdmissionRejected(self.name, "rate_limited", retry_after)
+
+    def _pacing_delay(self, tokens: int) -> float:
+        delay = 0.0
+        if self._requests is not None:
+            delay = self._requests.delay(1)
+        if self._tokens is not None:
+            delay = max(delay, self._tokens.delay(tokens))
+        return delay
+
+    def check(self, tokens: int = 1) -> None:
+        """
+        Fail fast if a call made now would certainly be rejected.
+
+        Meant for request handlers, before a streaming response is started.
+
+        :raises AdmissionRejected: When the queue is full, or pacing alone
+            would exceed the admission timeout.
+        """
+        if self._slots.locked() and self.queued >= self._max_queue:
+            raise self._overloaded(1)
+        delay = self._pacing_delay(tokens)
+        if delay > self._timeout:
+            raise self._rate_limited(delay)
+
+    @asynccontextmanager
+    async def admit(self, tokens: int = 1) -> AsyncIterator[None]:
+        """
+        Hold a slot (and paced budget) for the duration of the block.
+
+        :param tokens: Estimated tokens the call consumes (prompt + completion).
+        :raises AdmissionRejected: As described on the class.
+        """
+        started = time.monotonic()
+        self.check(tokens)
+        delay = self._pacing_delay(tokens)
+        self._buckets(tokens, TokenBucket.take)
+        try:
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self._acquire(self._timeout - (time.monotonic() - started))
+        except BaseException:
+            self._buckets(tokens, TokenBucket.refund)
+            raise
+        observe_stage(f"admission.{self.name}", time.monotonic() - started)
+
+        try:
+            self.in_flight += 1
+            self.admitted += 1
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+        finally:
+            self._slots.release()
+
+    def _buckets(self, tokens: int, op: Callable[[TokenBucket, float], None]) -> None:
+        """Apply `take`/`refund` for one call to each configured bucket."""
+        if self._requests is not None:
+            op(self._requests, 1)
+        if self._tokens is not None:
+            op(self._tokens, tokens)
+
+    async def _acquire(self, timeout: float) -> None:
+        if not self._slots.locked():
+            await self._slots.acquire()
+            return
+        if self.queued >= self._max_queue:
+            raise self._overloaded(1)
+        self.queued += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), max(0.0, timeout))
+        except asyncio.TimeoutError:
+            raise self._overloaded(self._timeout) from None
+        finally:
+            self.queued -= 1
+
+    def stats(self) -> Dict[str, float]:
+        """Snapshot of queue depth, occupancy and rejection counters."""
+        stats: Dict[str, float] = {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "capacity": self._capacity,
+            "admitted": self.admitted,
+            "rejected_overloaded": self.rejected_overloaded,
+            "rejected_rate_limited": self.rejected_rate_limited,
+        }
+        if self._requests is not None:
+            stats["requests_available"] = self._requests.available
+        if self._tokens is not None:
+            stats["tokens_available"] = self._tokens.available
+        return stats
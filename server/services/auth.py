@@ -1,9 +1,10 @@
+import asyncio
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Header
-from services.container import get_supabase_client
+from services.container import get_supabase_client, get_jwt_verifier
 from services.user import get_or_create_user
-from jose import jwt, JWTError
+from jose import JWTError
 from uuid import UUID
 from config import config
 from local_logs.logger import logger
@@ -21,20 +22,37 @@ async def get_auth_optional(
 ) -> Optional[Auth]:
     """
     Resolve identity from 'Authorization: Bearer <jwt>'.
+
+    Tokens are verified locally (signature, expiry, audience) against the
+    cached project secret/JWKS. Only when no key material is available at all
+    do we fall back to asking Supabase, off the event loop.
+
     :param authorization: Optional bearer token header
     :return: Identity(user_id) or None if anonymous/invalid
     """
     if not authorization or not authorization.lower().startswith("bearer "):
         return None
     token = authorization.split(" ", 1)[1].strip()
+    verifier = get_jwt_verifier()
+    try:
+        claims = await verifier.verify(token)
+        return Auth(UUID(claims["sub"]))
+    except (KeyError, ValueError) as e:
+        logger.warning("[auth] JWT has no usable subject", exc=e, basic=True)
+        return None
+    except JWTError as e:
+        if verifier.has_local_keys:
+            logger.warning("[auth] JWT verification failed", exc=e, basic=True)
+            return None
+
     try:
         supabase = get_supabase_client()
-        res = supabase.auth.get_user(token)
+        res = await asyncio.to_thread(supabase.auth.get_user, token)
         if not res or not res.user or not res.user.id:
             return None
         return Auth(UUID(res.user.id))
-    except JWTError as e:
-        logger.warning("[auth] JWT verification failed", exc=e, basic=True)
+    except Exception as e:
+        logger.warning("[auth] Remote JWT verification failed", exc=e, basic=True)
         return None
 
 
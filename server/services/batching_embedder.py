@@ -0,0 +1,86 @@
+import asyncio
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from local_logs.logger import logger
+from interfaces.embedder import Embedder
+
+
+class BatchingEmbedder(Embedder):
+    """
+    Embedder decorator that coalesces concurrent `embed()` calls.
+
+    Calls arriving within `max_wait_ms` of each other (or until
+    `max_batch_size` is reached) are sent as a single `embed_many` request and
+    the results are routed back to each caller. Identical texts within a batch
+    are embedded once.
+
+    :param inner: Embedder with an efficient `embed_many`.
+    :param max_batch_size: Flush as soon as this many calls are queued.
+    :param max_wait_ms: Max time the first queued call waits for company.
+    """
+
+    def __init__(
+        self,
+        inner: Embedder,
+        *,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+    ):
+        self._inner = inner
+        self._max_batch_size = max(1, max_batch_size)
+        self._max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._inflight: Set[asyncio.Task] = set()
+
+    @property
+    def dimension(self) -> int:
+        return self._inner.dimension
+
+    async def embed(self, text: str) -> List[float]:
+        stripped_text = (text or "").strip()
+        if not stripped_text:
+            raise ValueError("No text to embed")
+
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        self._pending.append((stripped_text, future))
+
+        if len(self._pending) >= self._max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._max_wait, self._flush)
+        return await future
+
+    async def embed_many(self, texts: Sequence[str]) -> List[List[float]]:
+        # Already a batch; don't delay it behind the coalescing window
+        return await self._inner.embed_many(texts)
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.create_task(self._run_batch(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        unique: Dict[str, int] = {}
+        for text, _ in batch:
+            unique.setdefault(text, len(unique))
+
+        try:
+            vectors = await self._inner.embed_many(list(unique))
+        except Exception as e:
+            logger.error(f"[BatchingEmbedder] Batch of {len(unique)} failed", exc=e)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for text, future in batch:
+            if not future.done():
+                future.set_result(vectors[unique[text]])
@@ -0,0 +1,219 @@
+import json
+import os
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+INDEX_FILE = "bm25.npz"
+
+# Keeps codes like "e-1023", "sepa_ct" and "3ds2" as single terms
+_TOKEN = re.compile(r"[a-z0-9]+(?:[-_.][a-z0-9]+)*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i if in is it my of on "
+    "or our so that the this to was we what when where which who why will with "
+    "you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word/code tokens with stopwords removed."""
+    return [t for t in _TOKEN.findall(text.casefold()) if t not in _STOPWORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over an in-memory inverted index.
+
+    Postings are stored CSR-style in flat NumPy arrays: the postings of term
+    `t` are `doc_ids[offsets[t]:offsets[t+1]]` with matching term frequencies
+    in `tfs`. A query touches only its own terms' slices and accumulates
+    scores into one float32 vector, so memory is ~8 bytes per posting and
+    there are no per-document Python objects on the query path.
+
+    Build with `BM25Index.build(ids, texts)`; persist with `save`/`load`.
+    `version` identifies the saved file, so readers can notice a rebuild.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(
+        self,
+        ids: List[str],
+        texts: List[str],
+        vocab: Dict[str, int],
+        offsets: np.ndarray,
+        doc_ids: np.ndarray,
+        tfs: np.ndarray,
+        doc_len: np.ndarray,
+    ):
+        self.ids = ids
+        self.texts = texts
+        self._vocab = vocab
+        self._offsets = offsets
+        self._doc_ids = doc_ids
+        self._tfs = tfs
+        n = len(ids)
+        df = np.diff(offsets).astype(np.float32)
+        self._idf = np.log1p((n - df + 0.5) / (df + 0.5)).astype(np.float32)
+        avg = float(doc_len.mean()) if n else 1.0
+        # Per-document length normalization, precomputed once
+        self._norm = (
+            self.K1 * (1 - self.B + self.B * doc_len / max(avg, 1e-9))
+        ).astype(np.float32)
+        self._doc_len = doc_len
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def memory_bytes(self) -> int:
+        """Approximate footprint: postings arrays plus chunk texts."""
+        arrays = (
+            self._offsets,
+            self._doc_ids,
+            self._tfs,
+            self._idf,
+            self._norm,
+            self._doc_len,
+        )
+        return sum(a.nbytes for a in arrays) + sum(len(t) for t in self.texts)
+
+    @classmethod
+    def build(cls, ids: Sequence[str], texts: Sequence[str]) -> "BM25Index":
+        """
+        Index `texts` (one document per id).
+
+        :param ids: Document ids.
+        :param texts: Document texts.
+        """
+        if len(ids) != len(texts):
+            raise ValueError("ids and texts must have the same length")
+        vocab: Dict[str, int] = {}
+        per_term: List[List[Tuple[int, int]]] = []
+        doc_len = np.zeros(len(texts), dtype=np.float32)
+        for doc, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            doc_len[doc] = sum(counts.values())
+            for term, tf in counts.items():
+                tid = vocab.setdefault(term, len(vocab))
+                if tid == len(per_term):
+                    per_term.append([])
+                per_term[tid].append((doc, tf))
+
+        offsets = np.zeros(len(per_term) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(p) for p in per_term])
+        doc_ids = np.empty(int(offsets[-1]), dtype=np.int32)
+        tfs = np.empty(int(offsets[-1]), dtype=np.float32)
+        for tid, postings in enumerate(per_term):
+            start = offsets[tid]
+            for j, (doc, tf) in enumerate(postings):
+                doc_ids[start + j] = doc
+                tfs[start + j] = tf
+        return cls(list(ids), list(texts), vocab, offsets, doc_ids, tfs, doc_len)
+
+    def search(self, query: str, top_k: int) -> List[Tuple[int, float]]:
+        """
+        Top-k documents by BM25 score.
+
+        :param query: Raw query text.
+        :param top_k: Number of results.
+        :return: (row, score) pairs, best first; only rows with score > 0.
+        """
+        n = len(self.ids)
+        terms = [self._vocab[t] for t in set(tokenize(query)) if t in self._vocab]
+        if not n or not terms or top_k <= 0:
+            return []
+        scores = np.zeros(n, dtype=np.float32)
+        for tid in terms:
+            lo, hi = self._offsets[tid], self._offsets[tid + 1]
+            docs = self._doc_ids[lo:hi]
+            tf = self._tfs[lo:hi]
+            # doc ids are unique within a posting list, so += is safe
+            scores[docs] += (
+                self._idf[tid] * tf * (self.K1 + 1) / (tf + self._norm[docs])
+            )
+
+        k = min(top_k, n)
+        top = np.argpartition(scores, -k)[-k:] if k < n else np.arange(n)
+        top = top[np.argsort(scores[top])[::-1]]
+        return [(int(i), float(scores[i])) for i in top if scores[i] > 0]
+
+    def coverage(self, query: str, row: int) -> float:
+        """
+        Fraction of the query's distinct terms that occur in document `row`.
+
+        :param query: Raw query text.
+        :param row: Document row.
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return 0.0
+        matched = 0
+        for term in terms:
+            tid = self._vocab.get(term)
+            if tid is None:
+                continue
+            # Postings are in document order, so a binary search suffices
+            docs = self._doc_ids[self._offsets[tid] : self._offsets[tid + 1]]
+            i = int(np.searchsorted(docs, row))
+            matched += i < len(docs) and docs[i] == row
+        return matched / len(terms)
+
+    def save(self, index_dir: str) -> None:
+        """
+        Write the index atomically.
+
+        Postings and lexicon go into one file, written under a temporary
+        name and swapped in with a single rename, so a reader sees either
+        the old index or the new one, never a mix.
+        """
+        path = Path(index_dir)
+        path.mkdir(parents=True, exist_ok=True)
+        terms = [""] * len(self._vocab)
+        for term, tid in self._vocab.items():
+            terms[tid] = term
+        lexicon = json.dumps(
+            {"ids": self.ids, "texts": self.texts, "terms": terms}
+        ).encode("utf-8")
+        tmp = path / f".{INDEX_FILE}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                offsets=self._offsets,
+                doc_ids=self._doc_ids,
+                tfs=self._tfs,
+                doc_len=self._doc_len,
+                lexicon=np.frombuffer(lexicon, dtype=np.uint8),
+            )
+        os.replace(tmp, path / INDEX_FILE)
+
+    @staticmethod
+    def version(index_dir: str) -> Optional[Tuple[int, int, int]]:
+        """
+        Identity of the index saved in `index_dir` (None if there is none).
+
+        Changes whenever `save` swaps in a new file.
+        """
+        try:
+            st = os.stat(Path(index_dir) / INDEX_FILE)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    @classmethod
+    def load(cls, index_dir: str) -> "BM25Index":
+        """Read an index written by `save`; an empty index if none exists."""
+        path = Path(index_dir) / INDEX_FILE
+        if not path.exists():
+            return cls.build([], [])
+        with np.load(path) as arrays:
+            offsets, doc_ids = arrays["offsets"], arrays["doc_ids"]
+            tfs, doc_len = arrays["tfs"], arrays["doc_len"]
+            lexicon = json.loads(arrays["lexicon"].tobytes().decode("utf-8"))
+        vocab = {term: tid for tid, term in enumerate(lexicon["terms"])}
+        return cls(
+            lexicon["ids"], lexicon["texts"], vocab, offsets, doc_ids, tfs, doc_len
+        )
@@ -0,0 +1,238 @@
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Literal, Optional, Sequence
+
+import numpy as np
+
+from config import config
+from local_logs.logger import logger
+from interfaces.embedder import Embedder
+from services.shared_cache import SharedCache, pack_vector, unpack_vector
+
+
+class _DiskTier:
+    """
+    Persistent embedding store backed by a single SQLite file.
+
+    Vectors are stored as raw bytes of the configured dtype. All calls are
+    blocking and meant to be run through `asyncio.to_thread`.
+    """
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vec BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT vec FROM embeddings WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, blob: bytes) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO embeddings (key, vec) VALUES (?, ?)",
+                (key, blob),
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CachingEmbedder(Embedder):
+    """
+    Embedder decorator that memoizes query embeddings.
+
+    Vectors are keyed by normalized text + model + dimension, kept in a bounded
+    in-memory LRU as compact NumPy arrays, optionally shared between workers
+    through a SharedCache (Redis), and optionally persisted to disk so the
+    cache survives restarts. Lookups go memory -> shared -> disk -> `inner`.
+
+    :param inner: Embedder that produces vectors on a miss.
+    :param maxsize: Max number of vectors kept in memory.
+    :param dtype: Storage precision of cached vectors.
+    :param disk_path: SQLite file for the persistent tier (disabled if None).
+    :param shared: Cross-worker cache tier (disabled if None).
+    :param shared_ttl: Lifetime of shared entries in seconds.
+    """
+
+    def __init__(
+        self,
+        inner: Embedder,
+        *,
+        maxsize: int = 10_000,
+        dtype: Literal["float32", "float16"] = "float16",
+        disk_path: Optional[str] = None,
+        shared: Optional[SharedCache] = None,
+        shared_ttl: float = 7 * 24 * 3600,
+    ):
+        self._inner = inner
+        self._shared = shared
+        self._shared_ttl = shared_ttl
+        self._maxsize = max(1, maxsize)
+        self._dtype = np.dtype(dtype)
+        self._lru: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._disk: Optional[_DiskTier] = None
+        if disk_path:
+            try:
+                self._disk = _DiskTier(disk_path)
+            except Exception as e:
+                logger.error(
+                    "[CachingEmbedder] Disk tier unavailable; memory only", exc=e
+                )
+
+        self.hits = 0
+        self.shared_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def dimension(self) -> int:
+        return self._inner.dimension
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Collapse whitespace and case so trivial variants share an entry."""
+        return " ".join((text or "").split()).casefold()
+
+    def _key(self, text: str) -> str:
+        # The dtype is part of the key: disk blobs are raw bytes of that dtype,
+        # so entries written under another EMBED_CACHE_DTYPE must never match
+        raw = (
+            f"{config.EMBED_MODEL}|{config.EMBED_DIM}|{self._dtype.name}|"
+            f"{self.normalize(text)}"
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, vec: np.ndarray) -> None:
+        self._lru[key] = vec
+        self._lru.move_to_end(key)
+        while len(self._lru) > self._maxsize:
+            self._lru.popitem(last=False)
+            self.evictions += 1
+
+    async def _lookup(self, key: str) -> Optional[np.ndarray]:
+        return (await self._lookup_many([key]))[0]
+
+    async def _lookup_many(self, keys: Sequence[str]) -> List[Optional[np.ndarray]]:
+        found: List[Optional[np.ndarray]] = [None] * len(keys)
+        pending: List[int] = []
+        for i, key in enumerate(keys):
+            vec = self._lru.get(key)
+            if vec is not None:
+                self._lru.move_to_end(key)
+                self.hits += 1
+                found[i] = vec
+            else:
+                pending.append(i)
+
+        if pending and self._shared is not None:
+            # One MGET for every memory miss
+            blobs = await self._shared.get_many([keys[i] for i in pending])
+            still_missing = []
+            for i, blob in zip(pending, blobs):
+                if blob is None:
+                    still_missing.append(i)
+                    continue
+                vec = unpack_vector(blob).astype(self._dtype, copy=False)
+                self._remember(keys[i], vec)
+                self.hits += 1
+                self.shared_hits += 1
+                found[i] = vec
+            pending = still_missing
+
+        if self._disk is not None:
+            for i in pending:
+                try:
+                    blob = await asyncio.to_thread(self._disk.get, keys[i])
+                except Exception as e:
+                    logger.error("[CachingEmbedder] Disk read failed", exc=e)
+                    blob = None
+                if blob is not None:
+                    vec = np.frombuffer(blob, dtype=self._dtype)
+                    self._remember(keys[i], vec)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    found[i] = vec
+        return found
+
+    async def _store(self, key: str, embedding: List[float]) -> None:
+        await self._store_many({key: embedding})
+
+    async def _store_many(self, embeddings: Dict[str, List[float]]) -> None:
+        vectors = {
+            key: np.asarray(embedding, dtype=self._dtype)
+            for key, embedding in embeddings.items()
+        }
+        for key, vec in vectors.items():
+            self._remember(key, vec)
+        if self._shared is not None:
+            await self._shared.set_many(
+                {key: pack_vector(vec) for key, vec in vectors.items()},
+                self._shared_ttl,
+            )
+        if self._disk is not None:
+            for key, vec in vectors.items():
+                try:
+                    await asyncio.to_thread(self._disk.put, key, vec.tobytes())
+                except Exception as e:
+                    logger.error("[CachingEmbedder] Disk write failed", exc=e)
+
+    async def embed(self, text: str) -> List[float]:
+        key = self._key(text)
+        vec = await self._lookup(key)
+        if vec is not None:
+            return vec.astype(np.float32).tolist()
+
+        self.misses += 1
+        embedding = await self._inner.embed(text)
+        await self._store(key, embedding)
+        return embedding
+
+    async def embed_many(self, texts: Sequence[str]) -> List[List[float]]:
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+        text_keys = [self._key(text) for text in texts]
+        cached = await self._lookup_many(text_keys)
+        for i, (key, vec) in enumerate(zip(text_keys, cached)):
+            if vec is not None:
+                results[i] = vec.astype(np.float32).tolist()
+            else:
+                missing.setdefault(key, []).append(i)
+
+        if missing:
+            self.misses += len(missing)
+            keys = list(missing)
+            embeddings = await self._inner.embed_many(
+                [texts[missing[k][0]] for k in keys]
+            )
+            await self._store_many(dict(zip(keys, embeddings)))
+            for key, embedding in zip(keys, embeddings):
+                for i in missing[key]:
+                    results[i] = embedding
+        return results  # type: ignore[return-value]
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of cache counters."""
+        return {
+            "size": len(self._lru),
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
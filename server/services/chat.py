@@ -1,10 +1,14 @@
-from typing import Sequence
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
+from sqlalchemy import Row, literal, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.exc import SQLAlchemyError
 from fastapi import HTTPException
 from models import Message
 from schemas.message import MessageCreate, IntroMessage
+from services.message_writer import MessageWriter
+from services.shared_cache import SharedCache
 from uuid import UUID, uuid4
 
 
@@ -29,7 +33,10 @@ async def get_messages(session: AsyncSession, session_id: UUID) -> Sequence[Mess
         )
         messages = result.scalars().all()
         logger.info(
-            f"[service:chat] Fetched {len(messages)} messages for session {session_id}"
+            "[service:chat] Fetched %d messages for session %s",
+            len(messages),
+            session_id,
+            sample=config.LOG_SAMPLE_RATE,
         )
         return messages
     except SQLAlchemyError as e:
@@ -39,6 +46,110 @@ async def get_messages(session: AsyncSession, session_id: UUID) -> Sequence[Mess
         raise HTTPException(status_code=500, detail="Could not fetch messages")
 
 
+async def stream_messages(
+    session: AsyncSession,
+    session_id: UUID,
+    *,
+    limit: Optional[int] = None,
+    before: Optional[UUID] = None,
+    batch_size: int = 500,
+) -> AsyncIterator[Sequence[Row]]:
+    """
+    Stream a session's messages oldest → newest, in batches, from a
+    server-side cursor.
+
+    Rows are plain (id, session_id, role, content, created_at) tuples, not
+    ORM objects, and only `batch_size` of them are held at a time, so memory
+    stays flat however long the session is. With `limit`, only the newest
+    `limit` messages (older than `before`, if given) are returned; pass the
+    first id of a page as `before` to fetch the page preceding it.
+
+    :param session: Active async DB session.
+    :param session_id: Chat session UUID.
+    :param limit: Max number of messages; None streams them all.
+    :param before: Message id cursor; only older messages are returned.
+    :param batch_size: Rows fetched per round-trip.
+    :return: Async iterator of row batches.
+    :raises HTTPException: 500 if the query fails.
+    """
+    cols = (
+        Message.id,
+        Message.session_id,
+        Message.role,
+        Message.content,
+        Message.created_at,
+    )
+    conditions = [Message.session_id == session_id]
+    if before is not None:
+        cursor_ts = select(Message.created_at).where(Message.id == before)
+        conditions.append(
+            tuple_(Message.created_at, Message.id)
+            < tuple_(cursor_ts.scalar_subquery(), literal(before, Message.id.type))
+        )
+    if limit is not None:
+        # Pick the newest `limit` rows by index, then stream them in order
+        page = (
+            select(Message.id)
+            .where(*conditions)
+            .order_by(Message.created_at.desc(), Message.id.desc())
+            .limit(limit)
+        )
+        conditions = [Message.id.in_(page)]
+    query = (
+        select(*cols)
+        .where(*conditions)
+        .order_by(Message.created_at, Message.id)
+        .execution_options(yield_per=batch_size)
+    )
+    try:
+        result = await session.stream(query)
+        async for batch in result.partitions():
+            yield batch
+    except SQLAlchemyError as e:
+        logger.error(
+            "[service:chat] Failed to stream messages:", exc=e, once=config.DEBUG
+        )
+        raise HTTPException(status_code=500, detail="Could not fetch messages")
+
+
+async def get_recent_messages(
+    session: AsyncSession,
+    session_id: UUID,
+    *,
+    limit: int,
+    before: Optional[Tuple[datetime, UUID]] = None,
+) -> List[Message]:
+    """
+    Retrieve the last `limit` messages of a session, oldest → newest.
+
+    Uses keyset pagination on (created_at, id) backed by the
+    (session_id, created_at) index, so the cost does not grow with the
+    length of the session.
+
+    :param session: Active async DB session.
+    :param session_id: Chat session UUID.
+    :param limit: Max number of messages to return.
+    :param before: Optional (created_at, id) cursor; only older messages are returned.
+    :return: List of Message ORM rows ordered oldest → newest.
+    :raises HTTPException: 500 if the query fails.
+    """
+    try:
+        query = select(Message).where(Message.session_id == session_id)
+        if before is not None:
+            query = query.where(tuple_(Message.created_at, Message.id) < before)
+        result = await session.execute(
+            query.order_by(Message.created_at.desc(), Message.id.desc()).limit(limit)
+        )
+        messages = list(result.scalars().all())
+        messages.reverse()
+        return messages
+    except SQLAlchemyError as e:
+        logger.error(
+            "[service:chat] Failed to fetch recent messages:", exc=e, once=config.DEBUG
+        )
+        raise HTTPException(status_code=500, detail="Could not fetch messages")
+
+
 async def add_message(
     session: AsyncSession, session_id: UUID, msg: MessageCreate
 ) -> Message:
@@ -61,7 +172,11 @@ async def add_message(
         session.add(message)
         await session.commit()
         await session.refresh(message)
-        logger.info(f"[service:chat] Added new message to session: {session_id}")
+        logger.info(
+            "[service:chat] Added new message to session: %s",
+            session_id,
+            sample=config.LOG_SAMPLE_RATE,
+        )
         return message
     except SQLAlchemyError as e:
         logger.error("[service:chat] Failed to save message:", exc=e, once=config.DEBUG)
@@ -69,14 +184,31 @@ async def add_message(
         raise HTTPException(status_code=500, detail="Could not save message.")
 
 
-async def clear_session(session: AsyncSession, session_id: UUID) -> None:
+def history_cache_key(session_id: UUID) -> str:
+    """Shared-cache key of a session's recent history (see `RAGService`)."""
+    return f"hist:{session_id}"
+
+
+async def clear_session(
+    session: AsyncSession,
+    session_id: UUID,
+    *,
+    writer: Optional[MessageWriter] = None,
+    cache: Optional[SharedCache] = None,
+) -> None:
     """
     Delete all messages in a session.
 
     :param session: Active async DB session.
     :param session_id: Chat session UUID.
+    :param writer: Write-behind writer; the session's queued messages are
+        dropped first so they are not inserted after the DELETE.
+    :param cache: Shared cache holding the session's recent history; its
+        entry is dropped so the next turn does not see the deleted messages.
     :raises HTTPException: 500 on failure to delete.
     """
+    if writer is not None:
+        await writer.discard(session_id)
     try:
         await session.execute(
             Message.__table__.delete().where(Message.session_id == session_id)
@@ -89,3 +221,5 @@ async def clear_session(session: AsyncSession, session_id: UUID) -> None:
         )
         await session.rollback()
         raise HTTPException(status_code=500, detail="Could not clear message")
+    if cache is not None:
+        await cache.delete(history_cache_key(session_id))
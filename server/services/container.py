@@ -1,50 +1,278 @@
-from typing import Optional
+from typing import Dict, Literal, Optional
+from weakref import WeakValueDictionary
 from interfaces import LLMGenerator, Embedder, VectorStore
 from services.open_ai_embedder import OpenAIEmbedder
+from services.caching_embedder import CachingEmbedder
+from services.batching_embedder import BatchingEmbedder
 from services.pinecone_vector_store import PineconeVectorStore
+from services.numpy_vector_store import NumpyVectorStore
+from services.hnsw_vector_store import HNSWVectorStore
+from services.hybrid_vector_store import HybridVectorStore
+from services.resilient_vector_store import ResilientVectorStore
+from services.tenant_vector_store import TenantVectorStore
+from services.tenancy import tenant_path
 from services.open_ai_llm_generator import OpenAIChatGenerator
 from services.rag_pipeline import RAGPipeline
+from services.semantic_cache import SemanticCache
+from services.jwt_verifier import JWTVerifier
+from services.message_writer import MessageWriter
+from services.shared_cache import SharedCache
+from services.admission import AdmissionController
+from db_manager import db_manager
 from supabase import create_client, Client
 from config import config
+from telemetry import registry
 
 # Singleton-ish provider with lazy construction; replace with real DI anytime.
 _embedder: Optional[Embedder] = None
 _vector_store: Optional[VectorStore] = None
+_pinecone: Optional[PineconeVectorStore] = None
+# Tenant -> its Pinecone guard, for metrics; entries go with evicted tenants
+_resilient: "WeakValueDictionary[str, ResilientVectorStore]" = WeakValueDictionary()
 _llm: Optional[LLMGenerator] = None
 _pipeline: Optional[RAGPipeline] = None
+_answer_cache: Optional[SemanticCache] = None
 _supabase: Optional[Client] = None
+_jwt_verifier: Optional[JWTVerifier] = None
+_message_writer: Optional[MessageWriter] = None
+_shared_cache: Optional[SharedCache] = None
+_admission: Optional[Dict[str, AdmissionController]] = None
 
 
 def get_embedder() -> Embedder:
     global _embedder
     if _embedder is None:
-        _embedder = OpenAIEmbedder()
+        embedder: Embedder = OpenAIEmbedder(admission=get_admission("embeddings"))
+        if config.EMBED_BATCH_ENABLED:
+            embedder = BatchingEmbedder(
+                embedder,
+                max_batch_size=config.EMBED_BATCH_MAX_SIZE,
+                max_wait_ms=config.EMBED_BATCH_MAX_WAIT_MS,
+            )
+        if config.EMBED_CACHE_ENABLED:
+            embedder = CachingEmbedder(
+                embedder,
+                maxsize=config.EMBED_CACHE_SIZE,
+                dtype=config.EMBED_CACHE_DTYPE,
+                disk_path=config.EMBED_CACHE_PATH,
+                shared=get_shared_cache(),
+                shared_ttl=config.EMBED_SHARED_TTL_SECONDS,
+            )
+            registry.gauge(
+                "ragbot_embedding_cache",
+                "Embedding cache counters",
+                lambda cache=embedder: {(k,): v for k, v in cache.stats().items()},
+                label_names=("stat",),
+            )
+        _embedder = embedder
     return _embedder
 
 
+def _build_vector_store(tenant: str) -> VectorStore:
+    """Retrieval stack of one tenant: its namespace or snapshot, plus its BM25 index."""
+    store: VectorStore
+    if config.VECTOR_STORE_BACKEND == "numpy":
+        store = NumpyVectorStore(
+            embedder=get_embedder(),
+            snapshot_dir=tenant_path(config.VECTOR_STORE_SNAPSHOT_DIR, tenant),
+        )
+    elif config.VECTOR_STORE_BACKEND == "hnsw":
+        store = HNSWVectorStore(
+            embedder=get_embedder(),
+            index_dir=tenant_path(config.HNSW_INDEX_DIR, tenant),
+            m=config.HNSW_M,
+            ef_construction=config.HNSW_EF_CONSTRUCTION,
+            ef_search=config.HNSW_EF_SEARCH,
+            exact_below=config.HNSW_EXACT_BELOW,
+        )
+    else:
+        resilient = ResilientVectorStore(
+            _pinecone.for_namespace(tenant),  # type: ignore[union-attr]
+            embedder=get_embedder(),
+            deadline=config.RETRIEVAL_DEADLINE_SECONDS,
+            hedge=config.RETRIEVAL_HEDGE_ENABLED,
+            hedge_delay=config.RETRIEVAL_HEDGE_DELAY_MS / 1000.0,
+            min_hedge_delay=config.RETRIEVAL_HEDGE_MIN_DELAY_MS / 1000.0,
+            failure_threshold=config.RETRIEVAL_BREAKER_FAILURES,
+            reset_after=config.RETRIEVAL_BREAKER_RESET_SECONDS,
+            cache_size=config.RETRIEVAL_FALLBACK_CACHE_SIZE,
+            cache_ttl=config.RETRIEVAL_FALLBACK_CACHE_TTL_SECONDS,
+        )
+        _resilient[tenant] = resilient
+        store = resilient
+    if config.RETRIEVAL_HYBRID_ENABLED:
+        store = HybridVectorStore(
+            store,
+            index_dir=tenant_path(config.BM25_INDEX_DIR, tenant),
+            rrf_k=config.HYBRID_RRF_K,
+            candidates=config.HYBRID_CANDIDATES,
+            skip_margin=config.HYBRID_LEXICAL_SKIP_MARGIN,
+        )
+    return store
+
+
 def get_vector_store() -> VectorStore:
-    global _vector_store
+    global _vector_store, _pinecone
     if _vector_store is None:
-        _vector_store = PineconeVectorStore(embedder=get_embedder(), namespace="")
+        # Shared by every tenant; built here so tenant loads only make views
+        get_embedder()
+        if config.VECTOR_STORE_BACKEND == "pinecone":
+            _pinecone = PineconeVectorStore(embedder=get_embedder(), namespace="")
+            registry.gauge(
+                "ragbot_retrieval_resilience",
+                "Hedging, degraded-mode and circuit breaker state of retrieval",
+                lambda: {
+                    (tenant, k): v
+                    for tenant, store in list(_resilient.items())
+                    for k, v in store.stats().items()
+                },
+                label_names=("tenant", "stat"),
+            )
+        tenants = TenantVectorStore(
+            _build_vector_store,
+            max_tenants=config.TENANT_MAX_LOADED,
+            memory_budget=config.TENANT_MEMORY_BUDGET_MB * 1024 * 1024,
+        )
+        registry.gauge(
+            "ragbot_tenant_stores",
+            "Loaded tenant retrievers, their footprint and churn",
+            lambda store=tenants: {(k,): v for k, v in store.stats().items()},
+            label_names=("stat",),
+        )
+        _vector_store = tenants
     return _vector_store
 
 
 def get_llm() -> LLMGenerator:
     global _llm
     if _llm is None:
-        _llm = OpenAIChatGenerator()
+        _llm = OpenAIChatGenerator(admission=get_admission("chat"))
     return _llm
 
 
 def get_rag_pipeline() -> RAGPipeline:
     global _pipeline
     if _pipeline is None:
-        _pipeline = RAGPipeline(get_vector_store(), get_llm(), top_k=5)
+        _pipeline = RAGPipeline(
+            get_vector_store(),
+            get_llm(),
+            top_k=5,
+            embedder=get_embedder(),
+            answer_cache=get_answer_cache(),
+        )
     return _pipeline
 
 
+def get_answer_cache() -> Optional[SemanticCache]:
+    global _answer_cache
+    if _answer_cache is None and config.ANSWER_CACHE_ENABLED:
+        _answer_cache = SemanticCache(
+            get_embedder().dimension,
+            maxsize=config.ANSWER_CACHE_SIZE,
+            ttl=config.ANSWER_CACHE_TTL_SECONDS,
+            threshold=config.ANSWER_CACHE_THRESHOLD,
+        )
+        registry.gauge(
+            "ragbot_answer_cache",
+            "Semantic answer cache counters",
+            lambda cache=_answer_cache: {(k,): v for k, v in cache.stats().items()},
+            label_names=("stat",),
+        )
+    return _answer_cache
+
+
+def get_admission(provider: Literal["chat", "embeddings"]) -> AdmissionController:
+    """Per-worker admission controller for an OpenAI endpoint."""
+    global _admission
+    if _admission is None:
+        _admission = {
+            "chat": AdmissionController(
+                "chat",
+                max_concurrency=config.OPENAI_CHAT_MAX_CONCURRENCY,
+                max_queue=config.OPENAI_ADMISSION_QUEUE_SIZE,
+                rpm=config.OPENAI_CHAT_RPM,
+                tpm=config.OPENAI_CHAT_TPM,
+                timeout=config.OPENAI_ADMISSION_TIMEOUT_SECONDS,
+            ),
+            "embeddings": AdmissionController(
+                "embeddings",
+                max_concurrency=config.OPENAI_EMBED_MAX_CONCURRENCY,
+                max_queue=config.OPENAI_ADMISSION_QUEUE_SIZE,
+                rpm=config.OPENAI_EMBED_RPM,
+                tpm=config.OPENAI_EMBED_TPM,
+                timeout=config.OPENAI_ADMISSION_TIMEOUT_SECONDS,
+            ),
+        }
+        registry.gauge(
+            "ragbot_admission",
+            "OpenAI admission queue depth, occupancy and rejections",
+            lambda controllers=_admission: {
+                (name, k): v
+                for name, controller in controllers.items()
+                for k, v in controller.stats().items()
+            },
+            label_names=("provider", "stat"),
+        )
+    return _admission[provider]
+
+
 def get_supabase_client() -> Client:
     global _supabase
     if _supabase is None:
         _supabase = create_client(config.SUPABASE_URL, config.SUPABASE_ANON_KEY)
     return _supabase
+
+
+def get_jwt_verifier() -> JWTVerifier:
+    global _jwt_verifier
+    if _jwt_verifier is None:
+        _jwt_verifier = JWTVerifier(shared=get_shared_cache())
+    return _jwt_verifier
+
+
+def get_message_writer() -> Optional[MessageWriter]:
+    global _message_writer
+    if _message_writer is None and config.MESSAGE_WRITE_BEHIND:
+        _message_writer = MessageWriter(
+            db_manager.session_factory,
+            batch_size=config.MESSAGE_WRITER_BATCH_SIZE,
+            flush_interval_ms=config.MESSAGE_WRITER_FLUSH_MS,
+            max_queue=config.MESSAGE_WRITER_QUEUE_SIZE,
+        )
+        registry.gauge(
+            "ragbot_message_writer_queue_depth",
+            "Messages accepted but not yet committed",
+            lambda writer=_message_writer: writer.depth,
+        )
+    return _message_writer
+
+
+def get_shared_cache() -> Optional[SharedCache]:
+    """Cross-worker cache tier; None unless REDIS_URL is set."""
+    global _shared_cache
+    if _shared_cache is None and config.REDIS_URL:
+        _shared_cache = SharedCache(
+            config.REDIS_URL,
+            prefix=config.SHARED_CACHE_PREFIX,
+            local_maxsize=config.SHARED_CACHE_LOCAL_SIZE,
+            timeout=config.SHARED_CACHE_TIMEOUT_SECONDS,
+            retry_after=config.SHARED_CACHE_RETRY_SECONDS,
+        )
+        registry.gauge(
+            "ragbot_shared_cache",
+            "Shared cache counters",
+            lambda cache=_shared_cache: {(k,): v for k, v in cache.stats().items()},
+            label_names=("stat",),
+        )
+    return _shared_cache
+
+
+async def shutdown() -> None:
+    """Flush and release resources built by this container."""
+    if _message_writer is not None:
+        await _message_writer.close()
+    if _shared_cache is not None:
+        await _shared_cache.close()
+    if _pinecone is not None:
+        # Tenant views share this client's executor
+        _pinecone.close()
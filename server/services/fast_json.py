@@ -0,0 +1,40 @@
+import json
+from datetime import datetime, timedelta
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:  # optional: ~5-10x faster, with native UUID/datetime support
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Encode `value` as compact UTF-8 JSON.
+
+    UUIDs and datetimes are written as strings, so Core rows can be encoded
+    without building Pydantic models first. Datetimes match Pydantic's
+    output, including `Z` for UTC.
+    """
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z)
+    return json.dumps(
+        value, ensure_ascii=False, separators=(",", ":"), default=_default
+    ).encode("utf-8")
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime) and value.utcoffset() == timedelta(0):
+        return value.replace(tzinfo=None).isoformat() + "Z"
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with `dumps` (orjson when installed)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
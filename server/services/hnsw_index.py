@@ -0,0 +1,439 @@
+import heapq
+import json
+import math
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+VECTORS_FILE = "vectors.npy"
+LINKS_FILE = "links.npy"
+UPPER_LINKS_FILE = "upper_links.npy"
+LEVELS_FILE = "levels.npy"
+DELETED_FILE = "deleted.npy"
+GRAPH_FILE = "graph.json"
+
+# (similarity, node); higher similarity is closer
+_Hit = Tuple[float, int]
+
+
+class HNSWIndex:
+    """
+    Hierarchical Navigable Small World graph for cosine similarity.
+
+    Vectors are L2-normalized float32 rows. Every node has up to `2 * m`
+    links on layer 0, stored as one dense int32 matrix padded with -1. The
+    few nodes that also sit on upper layers (about 1 in `m`) have up to `m`
+    links per upper layer. A query descends greedily through the upper
+    layers and then runs a best-first search of width `ef_search` on layer
+    0. Larger `m`/`ef_*` trade memory and latency for recall.
+
+    Deletes are tombstones: deleted nodes still route searches but are never
+    returned. Callers rebuild (`compacted`) once tombstones dominate.
+
+    `save` writes plain `.npy` arrays plus a small JSON header into a fresh
+    directory (see `services.versioned_dir`). `load` opens the big arrays
+    with `mmap_mode="r"`, so loading costs about one `open()` per file and
+    workers share page-cache pages. The first insert after a load copies the
+    arrays into memory.
+
+    Not thread-safe.
+
+    :param dimension: Vector size.
+    :param m: Links per node on upper layers (twice that on layer 0).
+    :param ef_construction: Search width used while inserting.
+    :param ef_search: Default search width of queries.
+    :param seed: Seed of the level generator, for reproducible graphs.
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        *,
+        m: int = 16,
+        ef_construction: int = 100,
+        ef_search: int = 64,
+        seed: int = 0,
+    ):
+        self.dimension = dimension
+        self.m = max(2, m)
+        self.ef_construction = max(ef_construction, self.m)
+        self.ef_search = max(1, ef_search)
+        self._level_mult = 1.0 / math.log(self.m)
+        self._rng = np.random.default_rng(seed)
+
+        self._count = 0
+        self._deleted_count = 0
+        self._entry = -1
+        self._max_level = -1
+        self._vectors = np.zeros((0, dimension), dtype=np.float32)
+        self._links = np.full((0, 2 * self.m), -1, dtype=np.int32)
+        self._levels = np.zeros(0, dtype=np.int8)
+        self._deleted = np.zeros(0, dtype=bool)
+        # node -> (level, m) links on layers 1..level
+        self._upper: Dict[int, np.ndarray] = {}
+        self._mapped = False
+
+    def __len__(self) -> int:
+        """Number of live (not deleted) vectors."""
+        return self._count - self._deleted_count
+
+    @property
+    def size(self) -> int:
+        """Number of nodes, tombstones included; node ids are `range(size)`."""
+        return self._count
+
+    @property
+    def deleted_count(self) -> int:
+        return self._deleted_count
+
+    def is_deleted(self, node: int) -> bool:
+        return bool(self._deleted[node])
+
+    def vector(self, node: int) -> np.ndarray:
+        """Stored (normalized) vector of `node`."""
+        return self._vectors[node]
+
+    def memory_bytes(self) -> int:
+        """Vectors and links (memory-mapped after `load`, resident once touched)."""
+        n = self._count
+        return (
+            self._vectors[:n].nbytes
+            + self._links[:n].nbytes
+            + self._levels[:n].nbytes
+            + self._deleted[:n].nbytes
+            + sum(links.nbytes for links in self._upper.values())
+        )
+
+    # -- construction -------------------------------------------------------
+
+    def _normalize(self, vector: Sequence[float]) -> np.ndarray:
+        v = np.asarray(vector, dtype=np.float32).reshape(-1)
+        if v.shape[0] != self.dimension:
+            raise ValueError(
+                f"Expected a vector of dimension {self.dimension}, got {v.shape[0]}"
+            )
+        norm = float(np.linalg.norm(v))
+        if norm == 0:
+            raise ValueError("Cannot index a zero vector")
+        return v / norm
+
+    def _reserve(self, n: int) -> None:
+        """Grow arrays to hold `n` nodes; also detaches memory-mapped arrays."""
+        capacity = self._vectors.shape[0]
+        if n <= capacity and not self._mapped:
+            return
+        capacity = max(n, 2 * capacity, 64) if n > capacity else capacity
+        count = self._count
+
+        vectors = np.zeros((capacity, self.dimension), dtype=np.float32)
+        vectors[:count] = self._vectors[:count]
+        links = np.full((capacity, 2 * self.m), -1, dtype=np.int32)
+        links[:count] = self._links[:count]
+        levels = np.zeros(capacity, dtype=np.int8)
+        levels[:count] = self._levels[:count]
+        deleted = np.zeros(capacity, dtype=bool)
+        deleted[:count] = self._deleted[:count]
+
+        self._vectors, self._links = vectors, links
+        self._levels, self._deleted = levels, deleted
+        if self._mapped:
+            self._upper = {node: np.array(l) for node, l in self._upper.items()}
+            self._mapped = False
+
+    def _random_level(self) -> int:
+        level = int(-math.log(1.0 - self._rng.random()) * self._level_mult)
+        return min(level, 32)
+
+    def add(self, vector: Sequence[float]) -> int:
+        """
+        Insert a vector.
+
+        :param vector: Embedding; normalized before it is stored.
+        :return: Node id of the new vector.
+        :raises ValueError: On a wrong dimension or a zero vector.
+        """
+        v = self._normalize(vector)
+        node = self._count
+        self._reserve(node + 1)
+        level = self._random_level()
+        self._vectors[node] = v
+        self._levels[node] = level
+        if level > 0:
+            self._upper[node] = np.full((level, self.m), -1, dtype=np.int32)
+        self._count += 1
+
+        if self._entry < 0:
+            self._entry, self._max_level = node, level
+            return node
+
+        entry = [self._entry]
+        for layer in range(self._max_level, level, -1):
+            entry = [max(self._search_layer(v, entry, 1, layer))[1]]
+        for layer in range(min(level, self._max_level), -1, -1):
+            found = self._search_layer(v, entry, self.ef_construction, layer)
+            neighbours = self._select(found, self.m)
+            self._row(node, layer)[: len(neighbours)] = neighbours
+            for other in neighbours:
+                self._link(other, node, layer)
+            entry = [n for _, n in found]
+
+        if level > self._max_level:
+            self._entry, self._max_level = node, level
+        return node
+
+    def delete(self, node: int) -> None:
+        """Tombstone `node`; it keeps routing searches but is never returned."""
+        if not 0 <= node < self._count or self._deleted[node]:
+            return
+        self._deleted[node] = True
+        self._deleted_count += 1
+
+    def _row(self, node: int, layer: int) -> np.ndarray:
+        return self._links[node] if layer == 0 else self._upper[node][layer - 1]
+
+    def _select(self, found: List[_Hit], limit: int) -> List[int]:
+        """
+        Neighbour selection heuristic (Malkov & Yashunin, alg. 4).
+
+        `found` holds (similarity to the vector being linked, node) pairs. A
+        candidate is kept only if it is closer to that vector than to every
+        neighbour kept so far, which spreads links across directions and
+        keeps the graph navigable on clustered data.
+        """
+        selected: List[int] = []
+        for sim, node in sorted(found, reverse=True):
+            if len(selected) >= limit:
+                break
+            if (
+                selected
+                and float(np.max(self._vectors[selected] @ self._vectors[node])) >= sim
+            ):
+                continue
+            selected.append(node)
+        return selected
+
+    def _link(self, node: int, new: int, layer: int) -> None:
+        row = self._row(node, layer)
+        free = np.flatnonzero(row < 0)
+        if free.size:
+            row[free[0]] = new
+            return
+        # Full: re-select among the old links plus the new one
+        candidates = np.append(row, new)
+        sims = self._vectors[candidates] @ self._vectors[node]
+        kept = self._select(list(zip(sims.tolist(), candidates.tolist())), row.size)
+        row[:] = -1
+        row[: len(kept)] = kept
+
+    # -- search -------------------------------------------------------------
+
+    def _search_layer(
+        self,
+        q: np.ndarray,
+        entry: List[int],
+        ef: int,
+        layer: int,
+        live_only: bool = False,
+    ) -> List[_Hit]:
+        """Best-first search of one layer; returns up to `ef` closest hits."""
+        vectors, deleted = self._vectors, self._deleted
+        visited = set(entry)
+        sims = (vectors[entry] @ q).tolist()
+        candidates = [(-s, n) for s, n in zip(sims, entry)]
+        heapq.heapify(candidates)
+        results = [
+            (s, n) for s, n in zip(sims, entry) if not (live_only and deleted[n])
+        ]
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            neg, node = heapq.heappop(candidates)
+            if len(results) >= ef and -neg < results[0][0]:
+                break
+            fresh = [
+                n
+                for n in self._row(node, layer).tolist()
+                if n >= 0 and n not in visited
+            ]
+            if not fresh:
+                continue
+            visited.update(fresh)
+            for s, n in zip((vectors[fresh] @ q).tolist(), fresh):
+                if len(results) < ef or s > results[0][0]:
+                    heapq.heappush(candidates, (-s, n))
+                    if live_only and deleted[n]:
+                        continue
+                    heapq.heappush(results, (s, n))
+                    if len(results) > ef:
+                        heapq.heappop(results)
+        return results
+
+    def search(
+        self, vector: Sequence[float], top_k: int, *, ef: Optional[int] = None
+    ) -> Tuple[List[int], List[float]]:
+        """
+        Approximate top-k by cosine similarity.
+
+        :param vector: Query embedding.
+        :param top_k: Number of results.
+        :param ef: Search width for this query (default `ef_search`);
+            raised to `top_k` if smaller.
+        :return: Node ids and their similarities, most similar first.
+        """
+        if self._entry < 0 or top_k <= 0 or len(self) == 0:
+            return [], []
+        q = np.asarray(vector, dtype=np.float32).reshape(-1)
+        norm = float(np.linalg.norm(q))
+        if norm == 0:
+            return [], []
+        q = q / norm
+
+        entry = [self._entry]
+        for layer in range(self._max_level, 0, -1):
+            entry = [max(self._search_layer(q, entry, 1, layer))[1]]
+        hits = self._search_layer(
+            q, entry, max(ef or self.ef_search, top_k), 0, live_only=True
+        )
+        hits = heapq.nlargest(top_k, hits)
+        return [n for _, n in hits], [s for s, _ in hits]
+
+    def search_exact(
+        self, vector: Sequence[float], top_k: int
+    ) -> Tuple[List[int], List[float]]:
+        """
+        Exact top-k over the stored vectors, without touching the graph.
+
+        One matrix-vector product, so it beats the graph walk on small
+        indexes (see `HNSWVectorStore`).
+
+        :param vector: Query embedding.
+        :param top_k: Number of results.
+        :return: Node ids and their similarities, most similar first.
+        """
+        n = self._count
+        if len(self) == 0 or top_k <= 0:
+            return [], []
+        q = np.asarray(vector, dtype=np.float32).reshape(-1)
+        norm = float(np.linalg.norm(q))
+        if norm == 0:
+            return [], []
+        scores = self._vectors[:n] @ (q / norm)
+        if self._deleted_count:
+            scores[self._deleted[:n]] = -np.inf
+
+        k = min(top_k, len(self))
+        top = np.argpartition(scores, -k)[-k:] if k < n else np.arange(n)
+        top = top[np.argsort(scores[top])[::-1]]
+        return top.tolist(), scores[top].tolist()
+
+    # -- persistence --------------------------------------------------------
+
+    def compacted(self) -> Tuple["HNSWIndex", List[int]]:
+        """
+        Rebuild without tombstones.
+
+        :return: The new index and, per new node, the node id it replaces.
+        """
+        index = HNSWIndex(
+            self.dimension,
+            m=self.m,
+            ef_construction=self.ef_construction,
+            ef_search=self.ef_search,
+        )
+        kept = np.flatnonzero(~self._deleted[: self._count]).tolist()
+        index._reserve(len(kept))
+        for node in kept:
+            index.add(self._vectors[node])
+        return index, kept
+
+    def save(self, directory: str) -> None:
+        """
+        Write the index files into `directory`.
+
+        Files are written in place, so `directory` should be a new version
+        that is published only once complete (`versioned_dir.publish`).
+        """
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        n = self._count
+        upper_nodes = np.flatnonzero(self._levels[:n] > 0).tolist()
+        upper = (
+            np.concatenate([self._upper[node] for node in upper_nodes])
+            if upper_nodes
+            else np.zeros((0, self.m), dtype=np.int32)
+        )
+        arrays = {
+            VECTORS_FILE: self._vectors[:n],
+            LINKS_FILE: self._links[:n],
+            UPPER_LINKS_FILE: upper,
+            LEVELS_FILE: self._levels[:n],
+            DELETED_FILE: self._deleted[:n],
+        }
+        header = {
+            "dimension": self.dimension,
+            "m": self.m,
+            "ef_construction": self.ef_construction,
+            "ef_search": self.ef_search,
+            "count": n,
+            "entry": self._entry,
+            "max_level": self._max_level,
+        }
+
+        for name, array in arrays.items():
+            with open(path / name, "wb") as f:
+                np.save(f, np.ascontiguousarray(array))
+        with open(path / GRAPH_FILE, "w", encoding="utf-8") as f:
+            json.dump(header, f)
+
+    @classmethod
+    def exists(cls, directory: str) -> bool:
+        return (Path(directory) / GRAPH_FILE).exists()
+
+    @classmethod
+    def load(cls, directory: str, *, ef_search: Optional[int] = None) -> "HNSWIndex":
+        """
+        Open an index written by `save`, memory-mapping its arrays.
+
+        :param ef_search: Override the saved default search width.
+        :raises ValueError: If the files are inconsistent.
+        """
+        path = Path(directory)
+        with open(path / GRAPH_FILE, encoding="utf-8") as f:
+            header = json.load(f)
+        index = cls(
+            header["dimension"],
+            m=header["m"],
+            ef_construction=header["ef_construction"],
+            ef_search=ef_search or header["ef_search"],
+        )
+        n = header["count"]
+        vectors = np.load(path / VECTORS_FILE, mmap_mode="r")
+        links = np.load(path / LINKS_FILE, mmap_mode="r")
+        upper = np.load(path / UPPER_LINKS_FILE, mmap_mode="r")
+        levels = np.load(path / LEVELS_FILE)
+        deleted = np.load(path / DELETED_FILE)
+        if not (
+            vectors.shape == (n, index.dimension)
+            and links.shape == (n, 2 * index.m)
+            and len(levels) == len(deleted) == n
+            and upper.shape[0] == int(levels.sum(dtype=np.int64))
+        ):
+            raise ValueError(f"HNSW index at {directory} is inconsistent")
+
+        index._vectors, index._links = vectors, links
+        index._levels, index._deleted = levels, deleted
+        # Upper-layer rows are views into the mapped file, in node order
+        offset = 0
+        for node in np.flatnonzero(levels > 0).tolist():
+            level = int(levels[node])
+            index._upper[node] = upper[offset : offset + level]
+            offset += level
+        index._count = n
+        index._deleted_count = int(deleted.sum())
+        index._entry = header["entry"]
+        index._max_level = header["max_level"]
+        index._mapped = True
+        return index
@@ -0,0 +1,232 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from config import config
+from local_logs.logger import logger
+from interfaces.vector_store import VectorStore, VectorRecord
+from interfaces.embedder import Embedder
+from services.hnsw_index import HNSWIndex
+from services.numpy_vector_store import INLINE_SCAN_MAX
+from services.versioned_dir import new_version, publish, resolve
+
+METADATA_FILE = "metadata.json"
+
+
+class HNSWVectorStore(VectorStore):
+    """
+    In-process approximate-search VectorStore backed by an `HNSWIndex`.
+
+    Query cost grows roughly with log(n) instead of n, but the graph walk is
+    pure Python: below `exact_below` nodes a NumPy scan of the same vectors
+    is faster and exact, so that is used instead. On one core at 1024
+    dimensions a scan costs about 0.3 ms per 1000 vectors, while the walk
+    takes about 0.75 ms at ef 16 and 2 ms at ef 64 whatever the size. That
+    puts the crossover near 2500 vectors at ef 16 and 6000 at ef 64; it
+    moves up as the dimension goes down (about 3x at 256). Recall is tuned
+    with `m`/`ef_construction` at build time and `ef_search` per query;
+    measure both with `python -m benchmarks.ann`. Graph walks and large
+    scans run in a worker thread so they do not block the event loop.
+
+    Upserts and deletes are applied to the graph in memory and persisted
+    once, on `flush`. Deleted and replaced chunks stay as tombstones until
+    they outnumber live ones, at which point the graph is rebuilt. Each
+    flush writes a new version directory and publishes it with one rename,
+    so readers never see files from two different saves.
+
+    :param embedder: Embedder used to vectorize queries.
+    :param index_dir: Directory holding the index versions.
+    :param m: Graph degree for a new index.
+    :param ef_construction: Build-time search width for a new index.
+    :param ef_search: Query-time search width.
+    :param exact_below: Index size under which queries scan every vector
+        instead of walking the graph; 0 always uses the graph.
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        *,
+        index_dir: Optional[str] = None,
+        m: int = 16,
+        ef_construction: int = 100,
+        ef_search: int = 64,
+        exact_below: int = 5000,
+    ):
+        self._embedder = embedder
+        self._index_dir = Path(index_dir or config.HNSW_INDEX_DIR)
+        self._ef_search = ef_search
+        self._exact_below = exact_below
+        self._index = HNSWIndex(
+            embedder.dimension,
+            m=m,
+            ef_construction=ef_construction,
+            ef_search=ef_search,
+        )
+        # Per node; deleted nodes have id None and an empty text
+        self._ids: List[Optional[str]] = []
+        self._texts: List[str] = []
+        self._nodes: Dict[str, int] = {}
+        self._dirty = False
+        self.load()
+
+    def load(self) -> None:
+        """(Re)open the current index version from disk."""
+        path = resolve(str(self._index_dir))
+        meta_path = path / METADATA_FILE if path is not None else None
+        if (
+            meta_path is None
+            or not meta_path.exists()
+            or not HNSWIndex.exists(str(path))
+        ):
+            logger.warning(
+                f"[HNSWVectorStore] No index at {self._index_dir}; index is empty"
+            )
+            return
+        try:
+            index = HNSWIndex.load(str(path), ef_search=self._ef_search)
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if index.size != len(meta["ids"]):
+                raise ValueError("HNSW index and metadata are out of sync")
+            self._index = index
+            self._ids = meta["ids"]
+            self._texts = meta["texts"]
+            self._nodes = {id_: i for i, id_ in enumerate(self._ids) if id_ is not None}
+            self._dirty = False
+            logger.info(
+                f"[HNSWVectorStore] Loaded {len(index)} chunk(s) from {self._index_dir}"
+            )
+        except Exception as e:
+            logger.error("[HNSWVectorStore] Index load failed:", exc=e)
+            raise
+
+    def search(
+        self, vector: Sequence[float], top_k: int, *, ef: Optional[int] = None
+    ) -> List[int]:
+        """
+        Top-k by cosine similarity: exact below `exact_below` nodes,
+        approximate above.
+
+        :param vector: Query embedding.
+        :param top_k: Number of results.
+        :param ef: Search width for this query (default `ef_search`).
+        :return: Node indices ordered from most to least similar.
+        """
+        if self._index.size < self._exact_below:
+            nodes, _ = self._index.search_exact(vector, top_k)
+        else:
+            nodes, _ = self._index.search(vector, top_k, ef=ef)
+        return nodes
+
+    async def get_relevant_chunks(
+        self, query: str, top_k: int = 5, *, vector: Optional[List[float]] = None
+    ) -> List[str]:
+        """Retrieve the most relevant chunks for the given query.
+
+        Args:
+            query (str): Natural-language query to embed and search.
+            top_k (int): Number of results to return.
+            vector (list[float] | None): Precomputed embedding of `query`;
+                embedded here when None.
+
+        Returns:
+            list[str]: Ordered chunk texts from most to least relevant.
+        """
+        try:
+            if not (query or "").strip():
+                logger.warning("[HNSWVectorStore] Empty query provided")
+                return []
+
+            if vector is None:
+                vector = await self._embedder.embed(query)
+            if not vector:
+                logger.warning("[HNSWVectorStore] Empty embedding; skipping query.")
+                return []
+
+            if self._inline():
+                nodes = self.search(vector, top_k)
+            else:
+                nodes = await asyncio.to_thread(self.search, vector, top_k)
+            chunks = [self._texts[i] for i in nodes]
+            logger.info(
+                "[HNSWVectorStore] Retrieved %d chunk(s) for query.",
+                len(chunks),
+                sample=config.LOG_SAMPLE_RATE,
+            )
+            return chunks
+        except Exception as e:
+            logger.error(
+                "[HNSWVectorStore] Context retrieval failed:",
+                exc=e,
+                once=config.DEBUG,
+            )
+            raise
+
+    def _inline(self) -> bool:
+        """Whether a query is a scan small enough to run on the event loop."""
+        size = self._index.size
+        return (
+            size < self._exact_below and size * self._index.dimension <= INLINE_SCAN_MAX
+        )
+
+    def _remove(self, id_: str) -> None:
+        node = self._nodes.pop(id_, None)
+        if node is not None:
+            self._index.delete(node)
+            self._ids[node] = None
+            self._texts[node] = ""
+
+    async def upsert(self, records: Sequence[VectorRecord]) -> None:
+        """Insert or replace records by id; persisted on `flush`."""
+        if not records:
+            return
+        for record in records:
+            self._remove(record.id)
+            node = self._index.add(record.values)
+            self._ids.append(record.id)
+            self._texts.append(record.text)
+            self._nodes[record.id] = node
+        self._dirty = True
+
+    async def delete(self, ids: Sequence[str]) -> None:
+        if not ids:
+            return
+        for id_ in ids:
+            self._remove(id_)
+        self._dirty = True
+
+    async def flush(self) -> None:
+        """Compact if needed and save the index as a new version."""
+        if not self._dirty:
+            return
+        await asyncio.to_thread(self._persist)
+        self._dirty = False
+
+    def _persist(self) -> None:
+        if self._index.deleted_count > len(self._index):
+            index, kept = self._index.compacted()
+            self._index = index
+            self._ids = [self._ids[node] for node in kept]
+            self._texts = [self._texts[node] for node in kept]
+            self._nodes = {id_: i for i, id_ in enumerate(self._ids)}
+            logger.info(
+                f"[HNSWVectorStore] Rebuilt index without tombstones ({len(index)} live)"
+            )
+
+        version = new_version(str(self._index_dir))
+        self._index.save(str(version))
+        with open(version / METADATA_FILE, "w", encoding="utf-8") as f:
+            json.dump({"ids": self._ids, "texts": self._texts}, f)
+        publish(version)
+
+    async def health_check(self) -> bool:
+        """
+        :return: True if the index holds at least one chunk.
+        """
+        return len(self._index) > 0
+
+    def memory_bytes(self) -> int:
+        """Graph and vectors (memory-mapped after load) plus chunk texts."""
+        return self._index.memory_bytes() + sum(len(t) for t in self._texts)
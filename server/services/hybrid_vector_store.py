@@ -0,0 +1,191 @@
+import asyncio
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from config import config
+from local_logs.logger import logger
+from interfaces.vector_store import RetrievalUnavailable, VectorStore, VectorRecord
+from services.bm25_index import BM25Index
+from telemetry import registry, span
+
+LEXICAL_ONLY = registry.counter(
+    "ragbot_retrieval_lexical_only_total",
+    "Retrievals answered from BM25 alone, skipping the embedding and dense search",
+)
+
+
+class HybridVectorStore(VectorStore):
+    """
+    Fuses BM25 lexical search with a dense VectorStore.
+
+    Both result lists are merged with reciprocal rank fusion,
+    `score(d) = sum(1 / (rrf_k + rank))`, keyed by chunk text (the only
+    identity `get_relevant_chunks` exposes). Exact terms such as "KYC",
+    "SEPA" or error codes are thus found even when the embedding misses
+    them.
+
+    When the lexical result is conclusive - the best document contains every
+    query term and scores at least `skip_margin` times the runner-up - the
+    dense query, and with it the embedding call, is skipped.
+
+    Writes go to the dense store first and are collected for the lexical
+    index, which is rebuilt and saved to `index_dir` once, on `flush`. Until
+    then, lexical hits on replaced or deleted chunks are dropped. An index
+    saved by another process (the ingestion CLI) is picked up on the next
+    query after `reload_interval` seconds.
+
+    :param dense: Wrapped vector store.
+    :param index_dir: Directory of the persisted BM25 index.
+    :param rrf_k: RRF damping constant.
+    :param candidates: Results taken from each retriever before fusion.
+    :param skip_margin: Top-1/top-2 BM25 ratio that skips dense search; 0 disables.
+    :param reload_interval: Minimum seconds between checks for a newer saved index.
+    """
+
+    def __init__(
+        self,
+        dense: VectorStore,
+        *,
+        index_dir: Optional[str] = None,
+        rrf_k: int = 60,
+        candidates: int = 20,
+        skip_margin: float = 2.0,
+        reload_interval: float = 5.0,
+    ):
+        self._dense = dense
+        self._index_dir = index_dir or config.BM25_INDEX_DIR
+        self._rrf_k = rrf_k
+        self._candidates = candidates
+        self._skip_margin = skip_margin
+        self._reload_interval = reload_interval
+        self._next_reload_check = time.monotonic() + reload_interval
+        # Live documents by id while writes are waiting for `flush`
+        self._pending: Optional[Dict[str, str]] = None
+        self._version = BM25Index.version(self._index_dir)
+        self._index = BM25Index.load(self._index_dir)
+        logger.info(
+            f"[HybridVectorStore] Loaded BM25 index with {len(self._index)} chunk(s)"
+        )
+
+    async def _maybe_reload(self) -> None:
+        now = time.monotonic()
+        if now < self._next_reload_check or self._pending is not None:
+            return
+        self._next_reload_check = now + self._reload_interval
+        version = BM25Index.version(self._index_dir)
+        if version == self._version:
+            return
+        try:
+            index = await asyncio.to_thread(BM25Index.load, self._index_dir)
+        except Exception as e:
+            logger.error("[HybridVectorStore] BM25 index reload failed:", exc=e)
+            return
+        self._index, self._version = index, version
+        logger.info(
+            f"[HybridVectorStore] Reloaded BM25 index with {len(self._index)} chunk(s)"
+        )
+
+    def _live(self, row: int) -> bool:
+        if self._pending is None:
+            return True
+        return self._pending.get(self._index.ids[row]) == self._index.texts[row]
+
+    def _conclusive(self, query: str, hits: List[Tuple[int, float]]) -> bool:
+        if not hits or self._skip_margin <= 0:
+            return False
+        runner_up = hits[1][1] if len(hits) > 1 else 0.0
+        if hits[0][1] < self._skip_margin * runner_up:
+            return False
+        return self._index.coverage(query, hits[0][0]) == 1.0
+
+    async def get_relevant_chunks(
+        self, query: str, top_k: int = 5, *, vector: Optional[List[float]] = None
+    ) -> List[str]:
+        """Retrieve chunks by fused lexical + dense rank.
+
+        Args:
+            query (str): Natural-language query.
+            top_k (int): Number of results to return.
+            vector (list[float] | None): Precomputed embedding of `query`;
+                embedded here when None.
+
+        Returns:
+            list[str]: Ordered chunk texts from most to least relevant.
+        """
+        if not (query or "").strip():
+            return await self._dense.get_relevant_chunks(
+                query, top_k=top_k, vector=vector
+            )
+
+        await self._maybe_reload()
+        n_candidates = max(top_k, self._candidates)
+        with span("retrieve.bm25"):
+            hits = self._index.search(query, n_candidates)
+        hits = [hit for hit in hits if self._live(hit[0])]
+        lexical = [self._index.texts[row] for row, _ in hits]
+
+        if self._conclusive(query, hits):
+            LEXICAL_ONLY.inc()
+            return lexical[:top_k]
+
+        try:
+            dense = await self._dense.get_relevant_chunks(
+                query, top_k=n_candidates, vector=vector
+            )
+        except RetrievalUnavailable:
+            if not lexical:
+                raise
+            # Dense store degraded: BM25 answers alone
+            dense = []
+        if not lexical:
+            return dense[:top_k]
+
+        fused: Dict[str, float] = {}
+        for ranked in (lexical, dense):
+            for rank, text in enumerate(ranked):
+                fused[text] = fused.get(text, 0.0) + 1.0 / (self._rrf_k + rank + 1)
+        return sorted(fused, key=fused.__getitem__, reverse=True)[:top_k]
+
+    async def health_check(self) -> bool:
+        return await self._dense.health_check()
+
+    def memory_bytes(self) -> int:
+        return self._index.memory_bytes() + self._dense.memory_bytes()
+
+    def _docs(self) -> Dict[str, str]:
+        if self._pending is None:
+            self._pending = dict(zip(self._index.ids, self._index.texts))
+        return self._pending
+
+    async def upsert(self, records: Sequence[VectorRecord]) -> None:
+        await self._dense.upsert(records)
+        docs = self._docs()
+        for r in records:
+            docs.pop(r.id, None)
+            if (r.text or "").strip():
+                docs[r.id] = r.text
+
+    async def delete(self, ids: Sequence[str]) -> None:
+        await self._dense.delete(ids)
+        docs = self._docs()
+        for id_ in ids:
+            docs.pop(id_, None)
+
+    async def flush(self) -> None:
+        """Flush the dense store, then rebuild and save the BM25 index once."""
+        await self._dense.flush()
+        if self._pending is None:
+            return
+        docs = self._pending
+
+        def build() -> BM25Index:
+            index = BM25Index.build(list(docs), list(docs.values()))
+            index.save(self._index_dir)
+            return index
+
+        self._index = await asyncio.to_thread(build)
+        self._version = BM25Index.version(self._index_dir)
+        self._pending = None
+        logger.info(
+            f"[HybridVectorStore] Rebuilt BM25 index with {len(self._index)} chunk(s)"
+        )
@@ -0,0 +1,171 @@
+import asyncio
+import hashlib
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+from jose import jwt, JWTError
+
+from config import config
+from local_logs.logger import logger
+from services.ttl_cache import TTLCache
+from services.shared_cache import SharedCache, pack_json, unpack_json
+
+
+class JWTVerifier:
+    """
+    Verifies Supabase access tokens locally.
+
+    Signature, expiry and audience are checked against either the project's
+    HS256 secret (`SUPABASE_JWT_SECRET`) or the project JWKS, which is cached
+    and refreshed in the background. Verified claims are kept in a short TTL
+    cache so repeat requests with the same token skip the crypto entirely.
+
+    :param secret: Shared HS256 secret; when unset the JWKS endpoint is used.
+    :param jwks_url: JWKS endpoint (default: `<SUPABASE_URL>/auth/v1/.well-known/jwks.json`).
+    :param audience: Expected `aud` claim.
+    :param refresh_interval: Seconds between background JWKS refreshes.
+    :param shared: Optional cross-worker claims cache (keyed by token hash).
+    """
+
+    # Don't hammer the JWKS endpoint when clients send tokens with unknown kids
+    _MIN_FORCED_REFRESH_SECONDS = 30.0
+
+    def __init__(
+        self,
+        *,
+        secret: Optional[str] = None,
+        jwks_url: Optional[str] = None,
+        audience: Optional[str] = None,
+        refresh_interval: Optional[int] = None,
+        shared: Optional[SharedCache] = None,
+    ):
+        self._shared = shared
+        self._secret = secret if secret is not None else config.SUPABASE_JWT_SECRET
+        self._jwks_url = jwks_url or (
+            f"{config.SUPABASE_URL.rstrip('/')}/auth/v1/.well-known/jwks.json"
+        )
+        self._audience = audience or config.SUPABASE_JWT_AUDIENCE
+        self._algorithms = list(config.SUPABASE_JWT_ALGORITHMS)
+        self._refresh_interval = refresh_interval or config.AUTH_JWKS_REFRESH_SECONDS
+
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        self._keys_fetched_at = 0.0
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._claims_cache: TTLCache[str, Dict[str, Any]] = TTLCache(
+            maxsize=config.AUTH_TOKEN_CACHE_SIZE,
+            ttl=config.AUTH_TOKEN_CACHE_TTL_SECONDS,
+        )
+
+    @property
+    def has_local_keys(self) -> bool:
+        """True if tokens can be verified without a round-trip to Supabase."""
+        return bool(self._secret) or bool(self._keys)
+
+    async def verify(self, token: str) -> Dict[str, Any]:
+        """
+        Verify a JWT and return its claims.
+
+        :param token: Raw bearer token.
+        :return: Decoded claims.
+        :raises JWTError: If the token is malformed, expired, has the wrong
+            audience, or its signature does not verify.
+        """
+        cached = self._claims_cache.get(token)
+        if cached is not None:
+            return cached
+        shared_key = ""
+        if self._shared is not None:
+            shared_key = "jwt:" + hashlib.sha256(token.encode("utf-8")).hexdigest()
+            blob = await self._shared.get(shared_key)
+            if blob is not None:
+                claims = unpack_json(blob)
+                self._cache(token, claims)
+                return claims
+
+        if self._secret:
+            claims = jwt.decode(
+                token,
+                self._secret,
+                algorithms=["HS256"],
+                audience=self._audience,
+            )
+        else:
+            claims = await self._verify_with_jwks(token)
+
+        ttl = self._cache(token, claims)
+        if self._shared is not None and ttl > 0:
+            await self._shared.set(shared_key, pack_json(claims), ttl)
+        return claims
+
+    def _cache(self, token: str, claims: Dict[str, Any]) -> float:
+        """Cache claims locally until expiry (capped by the cache TTL)."""
+        ttl = min(
+            float(claims.get("exp", 0)) - time.time(),
+            config.AUTH_TOKEN_CACHE_TTL_SECONDS,
+        )
+        self._claims_cache.set(token, claims, ttl=ttl)
+        return ttl
+
+    async def _verify_with_jwks(self, token: str) -> Dict[str, Any]:
+        self._ensure_refresh_task()
+        header = jwt.get_unverified_header(token)
+        kid = header.get("kid")
+
+        key = self._keys.get(kid) if kid else None
+        if key is None:
+            # Key rotation: refetch once, then give up
+            await self.refresh_keys(force=True)
+            key = self._keys.get(kid) if kid else None
+        if key is None:
+            raise JWTError(f"Unknown signing key: {kid}")
+        if key.get("alg") and key["alg"] not in self._algorithms:
+            raise JWTError(f"Signing key {kid} uses a disallowed algorithm")
+
+        # The allowed list is pinned; the (unverified) header must not pick it
+        return jwt.decode(
+            token,
+            key,
+            algorithms=self._algorithms,
+            audience=self._audience,
+        )
+
+    async def refresh_keys(self, *, force: bool = False) -> None:
+        """
+        Fetch the JWKS and replace the cached signing keys.
+
+        Failures keep the previous key set so a flaky endpoint never logs
+        everybody out.
+        """
+        async with self._refresh_lock:
+            age = time.monotonic() - self._keys_fetched_at
+            min_age = (
+                self._MIN_FORCED_REFRESH_SECONDS
+                if force
+                else self._refresh_interval / 2
+            )
+            if age < min_age:
+                return
+            try:
+                async with httpx.AsyncClient(timeout=5.0) as client:
+                    resp = await client.get(
+                        self._jwks_url, headers={"apikey": config.SUPABASE_ANON_KEY}
+                    )
+                    resp.raise_for_status()
+                    jwks = resp.json()
+                self._keys = {k["kid"]: k for k in jwks.get("keys", []) if k.get("kid")}
+                logger.info(f"[auth] Loaded {len(self._keys)} JWKS signing key(s)")
+            except Exception as e:
+                logger.error("[auth] JWKS refresh failed", exc=e, basic=True)
+            finally:
+                self._keys_fetched_at = time.monotonic()
+
+    def _ensure_refresh_task(self) -> None:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await self.refresh_keys()
+            await asyncio.sleep(self._refresh_interval)
@@ -0,0 +1,197 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set
+from uuid import UUID, uuid4
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from models import Message
+from schemas.message import MessageCreate
+from config import config
+from local_logs.logger import logger
+
+
+class MessageWriter:
+    """
+    Write-behind persister for chat messages.
+
+    `enqueue` returns immediately with a transient Message (id and created_at
+    assigned client-side). A background task drains the queue and inserts
+    messages in multi-row INSERTs, one commit per batch. Until a message is
+    committed it is visible through `pending()`, so history reads never miss a
+    turn that is still in flight. `discard` drops a session's unwritten
+    messages, e.g. before the session is cleared.
+
+    Callers must only enqueue messages for sessions that exist. Should a row
+    still violate a constraint, the batch is retried row by row and only
+    the offending rows are dropped.
+
+    :param session_factory: Factory for the writer's own DB sessions.
+    :param batch_size: Max rows per INSERT.
+    :param flush_interval_ms: How long the writer waits to fill a batch.
+    :param max_queue: Queue bound; `enqueue` waits when it is full.
+    """
+
+    MAX_ATTEMPTS = 3
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        *,
+        batch_size: int = 100,
+        flush_interval_ms: float = 50.0,
+        max_queue: int = 10_000,
+    ):
+        self._session_factory = session_factory
+        self._batch_size = max(1, batch_size)
+        self._flush_interval = max(0.0, flush_interval_ms) / 1000.0
+        self._queue: "asyncio.Queue[Message]" = asyncio.Queue(maxsize=max_queue)
+        self._pending: Dict[UUID, List[Message]] = {}
+        # Queued messages that must not be written any more
+        self._discarded: Set[UUID] = set()
+        # Held while a batch is being written
+        self._writing = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def depth(self) -> int:
+        """Messages accepted but not yet committed."""
+        return sum(len(msgs) for msgs in self._pending.values())
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def enqueue(self, session_id: UUID, msg: MessageCreate) -> Message:
+        """
+        Schedule a message for persistence.
+
+        :param session_id: Chat session UUID.
+        :param msg: MessageCreate payload (role, content).
+        :return: Transient Message carrying its final id and created_at.
+        """
+        message = Message(
+            id=uuid4(),
+            session_id=session_id,
+            role=msg.role,
+            content=msg.content,
+            created_at=datetime.now(timezone.utc),
+        )
+        self._pending.setdefault(session_id, []).append(message)
+        self.start()
+        await self._queue.put(message)
+        return message
+
+    def pending(self, session_id: UUID) -> List[Message]:
+        """Messages of `session_id` that are queued or being written."""
+        return list(self._pending.get(session_id, ()))
+
+    async def discard(self, session_id: UUID) -> None:
+        """
+        Drop the messages of `session_id` that are not written yet.
+
+        Returns once a batch already being inserted is committed, so a
+        DELETE issued afterwards also removes its rows.
+        """
+        for m in self._pending.pop(session_id, ()):
+            self._discarded.add(m.id)  # type: ignore[arg-type]
+        async with self._writing:
+            pass
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            if self._queue.qsize() < self._batch_size - 1:
+                await asyncio.sleep(self._flush_interval)
+            while len(batch) < self._batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                async with self._writing:
+                    await self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _write(self, batch: List[Message]) -> None:
+        rows = [
+            {
+                "id": m.id,
+                "session_id": m.session_id,
+                "role": m.role,
+                "content": m.content,
+                "created_at": m.created_at,
+            }
+            for m in batch
+            if m.id not in self._discarded
+        ]
+        try:
+            if not rows:
+                return
+            for attempt in range(1, self.MAX_ATTEMPTS + 1):
+                try:
+                    await self._insert(rows)
+                    logger.info(
+                        "[MessageWriter] Persisted %d message(s)",
+                        len(rows),
+                        sample=config.LOG_SAMPLE_RATE,
+                    )
+                    return
+                except IntegrityError:
+                    # Retrying won't help, and one bad row (e.g. an unknown
+                    # session) must not take the rest of the batch with it
+                    await self._write_rows(rows)
+                    return
+                except SQLAlchemyError as e:
+                    if attempt == self.MAX_ATTEMPTS:
+                        logger.error(
+                            f"[MessageWriter] Dropping {len(rows)} message(s) after {attempt} attempts",
+                            exc=e,
+                            once=True,
+                        )
+                        return
+                    logger.warning(
+                        f"[MessageWriter] Batch insert failed (attempt {attempt})"
+                    )
+                    await asyncio.sleep(0.1 * 2**attempt)
+        finally:
+            for m in batch:
+                self._discarded.discard(m.id)  # type: ignore[arg-type]
+                msgs = self._pending.get(m.session_id)  # type: ignore[arg-type]
+                if msgs is None or m not in msgs:
+                    continue
+                msgs.remove(m)
+                if not msgs:
+                    del self._pending[m.session_id]  # type: ignore[arg-type]
+
+    async def _insert(self, rows: List[Dict[str, object]]) -> None:
+        async with self._session_factory() as db:
+            await db.execute(insert(Message.__table__).values(rows))
+            await db.commit()
+
+    async def _write_rows(self, rows: List[Dict[str, object]]) -> None:
+        """Insert rows one at a time, dropping only those that fail."""
+        for row in rows:
+            try:
+                await self._insert([row])
+            except SQLAlchemyError as e:
+                logger.error(
+                    f"[MessageWriter] Dropping message {row['id']} of session {row['session_id']}",
+                    exc=e,
+                    once=True,
+                )
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """Flush everything queued, then stop the background task."""
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.error(
+                f"[MessageWriter] Shutdown with {self.depth} unflushed message(s)",
+                basic=True,
+            )
+        self._task.cancel()
+        self._task = None
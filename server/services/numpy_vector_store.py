@@ -0,0 +1,262 @@
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from config import config
+from local_logs.logger import logger
+from interfaces.vector_store import VectorStore, VectorRecord
+from interfaces.embedder import Embedder
+from services.versioned_dir import new_version, publish, resolve
+
+EMBEDDINGS_FILE = "embeddings.npy"
+METADATA_FILE = "metadata.json"
+SNAPSHOT_FILES = (EMBEDDINGS_FILE, METADATA_FILE)
+# Scans up to this many matrix elements (~0.3 ms on one core) run on the
+# event loop; bigger ones go to a worker thread, whose hop costs ~0.05 ms
+INLINE_SCAN_MAX = 1_000_000
+
+
+def save_snapshot(
+    snapshot_dir: str,
+    ids: Sequence[str],
+    texts: Sequence[str],
+    embeddings: np.ndarray,
+) -> None:
+    """
+    Write a snapshot readable by `NumpyVectorStore`.
+
+    Embeddings are L2-normalized and stored as a contiguous float32 `.npy`;
+    ids and texts go to a JSON sidecar. Both are written to a new version
+    directory that is published with one rename, so readers never observe a
+    half-written snapshot or files from two different snapshots.
+
+    :param snapshot_dir: Target directory.
+    :param ids: Chunk ids, one per row.
+    :param texts: Chunk texts, one per row.
+    :param embeddings: (n, dim) matrix of chunk embeddings.
+    """
+    if not (len(ids) == len(texts) == len(embeddings)):
+        raise ValueError("ids, texts and embeddings must have the same length")
+
+    matrix = np.ascontiguousarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix = matrix / np.where(norms > 0, norms, 1.0)
+
+    version = new_version(snapshot_dir)
+    with open(version / EMBEDDINGS_FILE, "wb") as f:
+        np.save(f, matrix)
+    with open(version / METADATA_FILE, "w", encoding="utf-8") as f:
+        json.dump({"ids": list(ids), "texts": list(texts)}, f)
+    publish(version)
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    In-process exact-search VectorStore over a memory-mapped snapshot.
+
+    The snapshot's normalized float32 matrix is opened with `mmap_mode="r"`,
+    so every worker process shares the same page-cache pages and startup is
+    just an `open()`. Queries are a single matrix-vector product followed by
+    `argpartition` for the top-k, i.e. cosine similarity with no network hop.
+
+    Scans of large matrices run in a worker thread (NumPy releases the GIL),
+    so they neither block the event loop nor each other.
+
+    Writes are collected in memory and merged into a new snapshot once, on
+    `flush`; queries see them after that. A snapshot published by another
+    process (the ingestion CLI) is picked up on the next query after
+    `reload_interval` seconds.
+
+    :param embedder: Embedder used to vectorize queries.
+    :param snapshot_dir: Directory of the snapshot versions, each holding
+        `embeddings.npy` and `metadata.json`.
+    :param reload_interval: Minimum seconds between checks for a newer snapshot.
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        *,
+        snapshot_dir: Optional[str] = None,
+        reload_interval: float = 5.0,
+    ):
+        self._embedder = embedder
+        self._snapshot_dir = Path(snapshot_dir or config.VECTOR_STORE_SNAPSHOT_DIR)
+        self._reload_interval = reload_interval
+        self._next_reload_check = time.monotonic() + reload_interval
+        # Version directory the loaded snapshot came from
+        self._version: Optional[Path] = None
+        self._matrix: np.ndarray = np.zeros((0, embedder.dimension), dtype=np.float32)
+        self._ids: List[str] = []
+        self._texts: List[str] = []
+        # Writes waiting for `flush`; an id is in at most one of the two
+        self._upserts: Dict[str, VectorRecord] = {}
+        self._deletes: Set[str] = set()
+        self.load()
+
+    def load(self) -> None:
+        """(Re)open the current snapshot version from disk."""
+        path = resolve(str(self._snapshot_dir))
+        if path is None or not all((path / f).exists() for f in SNAPSHOT_FILES):
+            logger.warning(
+                f"[NumpyVectorStore] No snapshot at {self._snapshot_dir}; index is empty"
+            )
+            return
+        try:
+            self._matrix, self._ids, self._texts = self._read(path)
+            self._version = path
+            logger.info(
+                f"[NumpyVectorStore] Loaded {len(self._texts)} chunk(s) from {self._snapshot_dir}"
+            )
+        except Exception as e:
+            logger.error("[NumpyVectorStore] Snapshot load failed:", exc=e)
+            raise
+
+    @staticmethod
+    def _read(path: Path) -> Tuple[np.ndarray, List[str], List[str]]:
+        matrix = np.load(path / EMBEDDINGS_FILE, mmap_mode="r")
+        with open(path / METADATA_FILE, encoding="utf-8") as f:
+            meta = json.load(f)
+        if matrix.shape[0] != len(meta["texts"]):
+            raise ValueError("Snapshot embeddings and metadata are out of sync")
+        return matrix, meta["ids"], meta["texts"]
+
+    async def _maybe_reload(self) -> None:
+        now = time.monotonic()
+        if now < self._next_reload_check or self._upserts or self._deletes:
+            return
+        self._next_reload_check = now + self._reload_interval
+        path = resolve(str(self._snapshot_dir))
+        if path is None or path == self._version:
+            return
+        try:
+            snapshot = await asyncio.to_thread(self._read, path)
+        except Exception as e:
+            logger.error("[NumpyVectorStore] Snapshot reload failed:", exc=e)
+            return
+        self._matrix, self._ids, self._texts = snapshot
+        self._version = path
+        logger.info(
+            f"[NumpyVectorStore] Reloaded {len(self._texts)} chunk(s) from {self._snapshot_dir}"
+        )
+
+    def search(self, vector: Sequence[float], top_k: int) -> List[int]:
+        """
+        Exact top-k by cosine similarity.
+
+        :param vector: Query embedding.
+        :param top_k: Number of results.
+        :return: Row indices ordered from most to least similar.
+        """
+        n = self._matrix.shape[0]
+        if n == 0 or top_k <= 0:
+            return []
+        q = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(q))
+        if norm == 0:
+            return []
+        scores = self._matrix @ (q / norm)
+
+        k = min(top_k, n)
+        if k < n:
+            top = np.argpartition(scores, -k)[-k:]
+        else:
+            top = np.arange(n)
+        return top[np.argsort(scores[top])[::-1]].tolist()
+
+    async def get_relevant_chunks(
+        self, query: str, top_k: int = 5, *, vector: Optional[List[float]] = None
+    ) -> List[str]:
+        """Retrieve the most relevant chunks for the given query.
+
+        Args:
+            query (str): Natural-language query to embed and search.
+            top_k (int): Number of results to return.
+            vector (list[float] | None): Precomputed embedding of `query`;
+                embedded here when None.
+
+        Returns:
+            list[str]: Ordered chunk texts from most to least relevant.
+        """
+        try:
+            if not (query or "").strip():
+                logger.warning("[NumpyVectorStore] Empty query provided")
+                return []
+
+            if vector is None:
+                vector = await self._embedder.embed(query)
+            if not vector:
+                logger.warning("[NumpyVectorStore] Empty embedding; skipping query.")
+                return []
+
+            await self._maybe_reload()
+
+            if self._matrix.size <= INLINE_SCAN_MAX:
+                rows = self.search(vector, top_k)
+            else:
+                rows = await asyncio.to_thread(self.search, vector, top_k)
+            chunks = [self._texts[i] for i in rows]
+            logger.info(
+                "[NumpyVectorStore] Retrieved %d chunk(s) for query.",
+                len(chunks),
+                sample=config.LOG_SAMPLE_RATE,
+            )
+            return chunks
+        except Exception as e:
+            logger.error(
+                "[NumpyVectorStore] Context retrieval failed:",
+                exc=e,
+                once=config.DEBUG,
+            )
+            raise
+
+    async def upsert(self, records: Sequence[VectorRecord]) -> None:
+        """Insert or replace records by id; written on `flush`."""
+        for r in records:
+            self._deletes.discard(r.id)
+            self._upserts[r.id] = r
+
+    async def delete(self, ids: Sequence[str]) -> None:
+        for id_ in ids:
+            self._upserts.pop(id_, None)
+            self._deletes.add(id_)
+
+    async def flush(self) -> None:
+        """Merge the collected writes into a new snapshot and reload it."""
+        if not self._upserts and not self._deletes:
+            return
+        upserts, deletes = list(self._upserts.values()), self._deletes
+        self._upserts, self._deletes = {}, set()
+        await asyncio.to_thread(self._rewrite, upserts, deletes)
+        self.load()
+
+    def _rewrite(self, upserts: Sequence[VectorRecord], deletes: Set[str]) -> None:
+        dropped = deletes | {r.id for r in upserts}
+        keep = [i for i, id_ in enumerate(self._ids) if id_ not in dropped]
+
+        ids = [self._ids[i] for i in keep] + [r.id for r in upserts]
+        texts = [self._texts[i] for i in keep] + [r.text for r in upserts]
+        rows: List[np.ndarray] = [np.asarray(self._matrix[keep], dtype=np.float32)]
+        if upserts:
+            rows.append(np.asarray([r.values for r in upserts], dtype=np.float32))
+        matrix = (
+            np.concatenate(rows)
+            if ids
+            else np.zeros((0, self._embedder.dimension), dtype=np.float32)
+        )
+
+        save_snapshot(str(self._snapshot_dir), ids, texts, matrix)
+
+    async def health_check(self) -> bool:
+        """
+        :return: True if a snapshot is loaded.
+        """
+        return self._matrix.shape[0] > 0
+
+    def memory_bytes(self) -> int:
+        """Matrix (memory-mapped, so resident once touched) plus chunk texts."""
+        return self._matrix.nbytes + sum(len(t) for t in self._texts)
@@ -1,17 +1,26 @@
 # services/openai_embedder.py
-from typing import List
+from contextlib import nullcontext
+from typing import List, Optional, Sequence
 from openai import AsyncOpenAI
 from config import config
 from local_logs.logger import logger
 from interfaces.embedder import Embedder
+from prompts.tokens import count_tokens
+from services.admission import AdmissionController
+from telemetry import span
 
 
 class OpenAIEmbedder(Embedder):
     """
     OpenAI embeddings provider.
+
+    :param admission: Optional limiter each embeddings request passes through.
     """
 
-    def __init__(self) -> None:
+    # Max inputs accepted by a single embeddings request
+    MAX_BATCH_SIZE = 2048
+
+    def __init__(self, admission: Optional[AdmissionController] = None) -> None:
         if not config.OPEN_AI_API_KEY:
             raise ValueError("OPEN_AI_API_KEY is not configured.")
         if not config.EMBED_MODEL:
@@ -20,23 +29,54 @@ class OpenAIEmbedder(Embedder):
         self._client = AsyncOpenAI(api_key=config.OPEN_AI_API_KEY)
         self._model = config.EMBED_MODEL
         self._dimension = config.EMBED_DIM
+        self._admission = admission
 
     @property
     def dimension(self) -> int:
         return self._dimension
 
+    def _admit(self, texts: Sequence[str]):
+        if self._admission is None:
+            return nullcontext()
+        return self._admission.admit(sum(count_tokens(t) for t in texts))
+
     async def embed(self, text: str) -> List[float]:
         stripped_text = (text or "").strip()
         if not stripped_text:
             raise ValueError("No text to embed")
 
         try:
-            resp = await self._client.embeddings.create(
-                model=self._model,
-                input=stripped_text,
-                dimensions=self._dimension,
-            )
+            async with self._admit([stripped_text]):
+                with span("embed.openai"):
+                    resp = await self._client.embeddings.create(
+                        model=self._model,
+                        input=stripped_text,
+                        dimensions=self._dimension,
+                    )
             return resp.data[0].embedding
         except Exception as e:
             logger.error("[OpenAIEmbedder] Embedding failed", exc=e)
             raise e
+
+    async def embed_many(self, texts: Sequence[str]) -> List[List[float]]:
+        stripped_texts = [(t or "").strip() for t in texts]
+        if not all(stripped_texts):
+            raise ValueError("No text to embed")
+
+        vectors: List[List[float]] = []
+        try:
+            for start in range(0, len(stripped_texts), self.MAX_BATCH_SIZE):
+                batch = stripped_texts[start : start + self.MAX_BATCH_SIZE]
+                async with self._admit(batch):
+                    with span("embed.openai_batch"):
+                        resp = await self._client.embeddings.create(
+                            model=self._model,
+                            input=batch,
+                            dimensions=self._dimension,
+                        )
+                data = sorted(resp.data, key=lambda d: d.index)
+                vectors.extend(d.embedding for d in data)
+            return vectors
+        except Exception as e:
+            logger.error("[OpenAIEmbedder] Batch embedding failed", exc=e)
+            raise e
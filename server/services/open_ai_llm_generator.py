@@ -1,10 +1,15 @@
-from typing import List, AsyncGenerator, TYPE_CHECKING, Any
+import time
+from contextlib import nullcontext
+from typing import List, AsyncGenerator, TYPE_CHECKING, Any, Optional
 from openai import AsyncOpenAI
 from openai.types.chat import ChatCompletionMessageParam
 from config import config
 from local_logs.logger import logger
 from interfaces.llm_generator import LLMGenerator
 from prompts.fintech import build_messages
+from prompts.tokens import MESSAGE_OVERHEAD_TOKENS, count_tokens
+from services.admission import AdmissionController
+from telemetry import span, observe_stage
 
 if TYPE_CHECKING:
     from models import Message as MessageModel
@@ -18,9 +23,10 @@ class OpenAIChatGenerator(LLMGenerator):
 
     :param model: Model name from config.CHAT_MODEL.
     :param temperature: Sampling temperature.
+    :param admission: Optional limiter held for the lifetime of each stream.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, admission: Optional[AdmissionController] = None) -> None:
         if not config.OPEN_AI_API_KEY:
             raise ValueError("OPEN_AI_API_KEY is not configured.")
         if not config.CHAT_MODEL:
@@ -29,6 +35,7 @@ class OpenAIChatGenerator(LLMGenerator):
         self._client = AsyncOpenAI(api_key=config.OPEN_AI_API_KEY)
         self._model = config.CHAT_MODEL
         self._temperature = 0.3
+        self._admission = admission
 
     def _messages_from(
         self, context_chunks: List[str], query: str, history: List[MessageModel]
@@ -46,6 +53,15 @@ class OpenAIChatGenerator(LLMGenerator):
         """
         return build_messages(query=query, chunks=context_chunks, history=history or [])
 
+    @staticmethod
+    def _estimate_tokens(messages: List[ChatCompletionMessageParam]) -> int:
+        """Prompt tokens plus the completion allowance, for TPM pacing."""
+        prompt = sum(
+            count_tokens(str(m.get("content") or "")) + MESSAGE_OVERHEAD_TOKENS
+            for m in messages
+        )
+        return prompt + config.OPENAI_CHAT_COMPLETION_TOKENS
+
     async def stream(
         self, context_chunks: List[str], query: str, history: List[MessageModel]
     ) -> AsyncGenerator[str, None]:
@@ -62,24 +78,44 @@ class OpenAIChatGenerator(LLMGenerator):
             RuntimeError: Wraps lower-level SDK/network errors for the caller.
         """
         try:
-            messages = self._messages_from(context_chunks, query, history)
-            stream = await self._client.chat.completions.create(
-                model=self._model,
-                messages=messages,
-                temperature=self._temperature,
-                stream=True,
+            with span("llm.prompt_build"):
+                messages = self._messages_from(context_chunks, query, history)
+            admitted = (
+                self._admission.admit(self._estimate_tokens(messages))
+                if self._admission is not None
+                else nullcontext()
             )
-            async for part in stream:
+            async with admitted:
+                started = time.perf_counter()
+                first_token = True
+                stream = await self._client.chat.completions.create(
+                    model=self._model,
+                    messages=messages,
+                    temperature=self._temperature,
+                    stream=True,
+                )
                 try:
-                    choice = (getattr(part, "choices", None) or [None])[0]
-                    delta = getattr(choice, "delta", None)
-                    content = getattr(delta, "content", None)
-                    if content:
-                        yield content
-                except Exception as chunk_err:
-                    logger.warning(
-                        f"[OpenAIChatGenerator] Stream chunk parse error: {chunk_err}"
-                    )
+                    async for part in stream:
+                        try:
+                            choice = (getattr(part, "choices", None) or [None])[0]
+                            delta = getattr(choice, "delta", None)
+                            content = getattr(delta, "content", None)
+                            if content:
+                                if first_token:
+                                    observe_stage(
+                                        "llm.ttft", time.perf_counter() - started
+                                    )
+                                    first_token = False
+                                yield content
+                        except Exception as chunk_err:
+                            logger.warning(
+                                f"[OpenAIChatGenerator] Stream chunk parse error: {chunk_err}"
+                            )
+                finally:
+                    # Closing the HTTP response stops generation (and billing)
+                    # when the consumer stops early.
+                    await stream.close()
+                observe_stage("llm.stream", time.perf_counter() - started)
         except Exception as e:
             logger.error("[OpenAIChatGenerator] Streaming failed", exc=e)
             raise
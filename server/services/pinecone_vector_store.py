@@ -1,20 +1,51 @@
-from typing import List, Optional
-from openai import AsyncOpenAI
+import asyncio
+import copy
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, TypeVar
 from pinecone import Pinecone
 from config import config
 from local_logs.logger import logger
-from interfaces.vector_store import VectorStore
+from interfaces.vector_store import VectorStore, VectorRecord
 from interfaces.embedder import Embedder
+from telemetry import span
+
+T = TypeVar("T")
+
+# Pinecone request size limits
+UPSERT_BATCH_SIZE = 100
+DELETE_BATCH_SIZE = 1000
 
 
 class PineconeVectorStore(VectorStore):
     """
     VectorStore backed by Pinecone.
 
+    The Pinecone SDK is synchronous, so every call is dispatched to a small,
+    dedicated thread pool and awaited with a per-call timeout. The event loop
+    never blocks on a network round-trip and a slow index cannot starve the
+    default executor used by the rest of the app.
+
+    A call first takes one of `max_concurrency` slots, one per worker thread,
+    and its timeout starts only once it holds one, i.e. once it is running.
+    A call that times out keeps its slot until its thread is done, so
+    abandoned calls cannot pile up in the pool. Batched writes keep at most
+    `max_concurrency` batches in flight.
+
     :param namespace: Pinecone namespace used for queries (default: "default").
+    :param max_concurrency: Max in-flight Pinecone calls (default: config).
+    :param timeout: Per-call timeout in seconds (default: config).
     """
 
-    def __init__(self, embedder: Embedder, *, namespace: Optional[str] = None):
+    def __init__(
+        self,
+        embedder: Embedder,
+        *,
+        namespace: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ):
         try:
             if not config.PINECONE_API_KEY:
                 raise ValueError("PINECONE_API_KEY is not configured.")
@@ -25,11 +56,84 @@ class PineconeVectorStore(VectorStore):
             self._index = self._pc.Index(host=config.PINECONE_INDEX_HOST)
             self._embedder = embedder
             self._namespace = namespace if namespace is not None else ""
+            self._timeout = (
+                timeout if timeout is not None else config.PINECONE_TIMEOUT_SECONDS
+            )
+            self._max_concurrency = max(
+                1, max_concurrency or config.PINECONE_MAX_CONCURRENCY
+            )
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_concurrency, thread_name_prefix="pinecone"
+            )
+            # One per worker thread; shared by `for_namespace` views
+            self._slots = asyncio.Semaphore(self._max_concurrency)
         except Exception as e:
             logger.error("[PineconeVectorStore] Initialization failed:", exc=e)
             raise
 
-    async def get_relevant_chunks(self, query: str, top_k: int = 5) -> List[str]:
+    def for_namespace(self, namespace: str) -> "PineconeVectorStore":
+        """
+        View of the same index bound to another namespace.
+
+        Shares the client, executor and slots, so per-tenant views are cheap
+        and all of them stay within one `max_concurrency` budget.
+        """
+        view = copy.copy(self)
+        view._namespace = namespace
+        return view
+
+    async def _run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking Pinecone call on the dedicated executor.
+
+        Waits for a free slot first; the timeout covers only the call itself.
+
+        :raises asyncio.TimeoutError: If the call exceeds the configured timeout.
+        """
+        await self._slots.acquire()
+        try:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(self._release)
+        # Shielded: on timeout the thread still runs and keeps its slot
+        return await asyncio.wait_for(asyncio.shield(future), timeout=self._timeout)
+
+    def _release(self, future: "asyncio.Future[Any]") -> None:
+        self._slots.release()
+        if not future.cancelled():
+            future.exception()  # mark as retrieved once nobody awaits it
+
+    async def _run_all(
+        self, fn: Callable[..., Any], calls: Iterable[Dict[str, Any]]
+    ) -> None:
+        """
+        Run `fn(**kwargs)` for each of `calls`, at most `max_concurrency` at a
+        time; stops at, and raises, the first error.
+        """
+        pending = iter(calls)
+        in_flight: Set["asyncio.Task[Any]"] = set()
+        try:
+            while True:
+                for kwargs in islice(pending, self._max_concurrency - len(in_flight)):
+                    in_flight.add(asyncio.create_task(self._run(fn, **kwargs)))
+                if not in_flight:
+                    return
+                done, in_flight = await asyncio.wait(
+                    in_flight, return_when=asyncio.FIRST_COMPLETED
+                )
+                for error in [task.exception() for task in done]:
+                    if error is not None:
+                        raise error
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+    async def get_relevant_chunks(
+        self, query: str, top_k: int = 5, *, vector: Optional[List[float]] = None
+    ) -> List[str]:
         """Retrieve the most relevant chunks for the given query.
 
         Embeds the query, performs a vector similarity search, and returns
@@ -38,6 +142,8 @@ class PineconeVectorStore(VectorStore):
         Args:
             query (str): Natural-language query to embed and search.
             top_k (int): Number of results to return (must be > 0).
+            vector (list[float] | None): Precomputed embedding of `query`;
+                embedded here when None.
 
         Returns:
             list[str]: Ordered chunk texts from most to least relevant.
@@ -45,23 +151,27 @@ class PineconeVectorStore(VectorStore):
         Raises:
             ValueError: If `top_k` is non-positive.
             RuntimeError: If Pinecone returns an error or malformed response.
+            asyncio.TimeoutError: If Pinecone does not answer within the timeout.
         """
         try:
             if not (query or "").strip():
                 logger.warning("[PineconeVectorStore] Empty query provided")
                 return []
 
-            vector = await self._embedder.embed(query)
+            if vector is None:
+                vector = await self._embedder.embed(query)
             if not vector:
                 logger.warning("[PineconeVectorStore] Empty embedding; skipping query.")
                 return []
 
-            query_result = self._index.query(
-                vector=vector,
-                top_k=top_k,
-                namespace=self._namespace,
-                include_metadata=True,
-            )
+            with span("pinecone.query"):
+                query_result = await self._run(
+                    self._index.query,
+                    vector=vector,
+                    top_k=top_k,
+                    namespace=self._namespace,
+                    include_metadata=True,
+                )
 
             matches = getattr(query_result, "matches", None)
             if matches is None and isinstance(query_result, dict):
@@ -85,7 +195,9 @@ class PineconeVectorStore(VectorStore):
                     chunks.append(text)
 
             logger.info(
-                f"[PineconeVectorStore] Retrieved {len(chunks)} chunk(s) for query."
+                "[PineconeVectorStore] Retrieved %d chunk(s) for query.",
+                len(chunks),
+                sample=config.LOG_SAMPLE_RATE,
             )
             return chunks
         except Exception as e:
@@ -103,7 +215,7 @@ class PineconeVectorStore(VectorStore):
         :return: True if describe_index_stats succeeds; False otherwise.
         """
         try:
-            stats = self._index.describe_index_stats()
+            stats = await self._run(self._index.describe_index_stats)
             logger.info(f"[PineconeVectorStore] Health stats: {stats}")
             return True
         except Exception as e:
@@ -111,3 +223,46 @@ class PineconeVectorStore(VectorStore):
                 "[PineconeVectorStore] Health check failed:", exc=e, once=config.DEBUG
             )
             return False
+
+    async def upsert(self, records: Sequence[VectorRecord]) -> None:
+        """
+        Upsert records in request-sized batches, in parallel up to the
+        executor's concurrency.
+        """
+        batches = (
+            {
+                "vectors": [
+                    {
+                        "id": r.id,
+                        "values": r.values,
+                        "metadata": {**r.metadata, "text": r.text},
+                    }
+                    for r in records[i : i + UPSERT_BATCH_SIZE]
+                ],
+                "namespace": self._namespace,
+            }
+            for i in range(0, len(records), UPSERT_BATCH_SIZE)
+        )
+        try:
+            await self._run_all(self._index.upsert, batches)
+            logger.info(f"[PineconeVectorStore] Upserted {len(records)} record(s)")
+        except Exception as e:
+            logger.error("[PineconeVectorStore] Upsert failed:", exc=e)
+            raise
+
+    async def delete(self, ids: Sequence[str]) -> None:
+        ids = list(ids)
+        batches = (
+            {"ids": ids[i : i + DELETE_BATCH_SIZE], "namespace": self._namespace}
+            for i in range(0, len(ids), DELETE_BATCH_SIZE)
+        )
+        try:
+            await self._run_all(self._index.delete, batches)
+            logger.info(f"[PineconeVectorStore] Deleted {len(ids)} record(s)")
+        except Exception as e:
+            logger.error("[PineconeVectorStore] Delete failed:", exc=e)
+            raise
+
+    def close(self) -> None:
+        """Release the dedicated executor threads."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,23 +1,83 @@
-from typing import AsyncIterator, Callable, Awaitable, List
+import time
+from contextlib import aclosing
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, Optional
+from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 from schemas.message import MessageCreate
-from services.chat import add_message, get_messages
+from services.chat import add_message, get_recent_messages, history_cache_key
 from services.rag_pipeline import RAGPipeline
+from services.message_writer import MessageWriter
+from services.shared_cache import SharedCache, pack_json, unpack_json
 from models import Message as MessageModel
+from config import config
 from local_logs.logger import logger
-
-DisconnectProbe = Callable[[], Awaitable[bool]]
+from telemetry import span, observe_stage
 
 
 class RAGService:
     """
     Orchestrates the RAG flow: persist user msg, fetch history, stream LLM,
     and persist assistant reply. Keeps routers thin.
+
+    :param pipeline: RAG pipeline used for retrieval + generation.
+    :param writer: Optional write-behind persister; when set, messages are
+        queued instead of committed inline on the streaming path.
+    :param cache: Optional shared cache holding each session's recent
+        history, refreshed at the end of every turn.
     """
 
-    def __init__(self, pipeline: RAGPipeline):
+    def __init__(
+        self,
+        pipeline: RAGPipeline,
+        writer: Optional[MessageWriter] = None,
+        cache: Optional[SharedCache] = None,
+    ):
         self._pipeline = pipeline
+        self._writer = writer
+        self._cache = cache
+
+    async def _persist(
+        self, db: AsyncSession, session_id, role: str, content: str
+    ) -> MessageModel:
+        msg = MessageCreate(role=role, content=content)  # type: ignore[arg-type]
+        if self._writer is not None:
+            return await self._writer.enqueue(session_id, msg)
+        return await add_message(db, session_id, msg)
+
+    async def _load_history(
+        self, db: AsyncSession, session_id, exclude: Optional[MessageModel]
+    ) -> List[MessageModel]:
+        """Last HISTORY_LIMIT pairs, including turns still queued for writing."""
+        limit = config.HISTORY_LIMIT * 2
+        if self._cache is not None:
+            blob = await self._cache.get(history_cache_key(session_id))
+            if blob is not None:
+                return _unpack_history(session_id, blob)[-limit:]
+        history = await get_recent_messages(db, session_id, limit=limit + 1)
+        if self._writer is not None:
+            seen = {m.id for m in history}
+            history += [m for m in self._writer.pending(session_id) if m.id not in seen]
+        if exclude is not None:
+            history = [m for m in history if m.id != exclude.id]
+        return history[-limit:]
+
+    async def _remember_history(
+        self, session_id, history: List[MessageModel], turn: List[MessageModel]
+    ) -> None:
+        """Cache history as of the end of this turn; drop it if the turn is partial."""
+        if self._cache is None:
+            return
+        key = history_cache_key(session_id)
+        if len(turn) < 2:
+            # A message failed to persist: let the next turn reload from the DB
+            await self._cache.delete(key)
+            return
+        recent = (history + turn)[-config.HISTORY_LIMIT * 2 :]
+        await self._cache.set(
+            key, _pack_history(recent), config.HISTORY_CACHE_TTL_SECONDS
+        )
 
     async def stream(
         self,
@@ -25,20 +85,20 @@ class RAGService:
         *,
         session_id,
         user_text: str,
-        is_disconnected: DisconnectProbe | None = None,
     ) -> AsyncIterator[str]:
         """Stream an assistant response for the given user input.
 
-        Persists the user message, obtains recent history, then streams the
-        response from the underlying RAG pipeline. On completion or early
-        termination, the concatenated assistant content is persisted.
+        Starts retrieval for the query, persists the user message and obtains
+        recent history while it runs, then streams the response from the
+        underlying RAG pipeline. On completion or early termination (the
+        caller closing or cancelling the generator, e.g. on client
+        disconnect), the pipeline stream is closed and the concatenated
+        assistant content is persisted.
 
         Args:
             db (AsyncSession): Active database session.
             session_id (UUID): Identifier of the chat session.
             user_text (str): The raw user query text.
-            is_disconnected (Callable[[], Awaitable[bool]] | None): Probe that
-                returns True if the client has disconnected during streaming.
 
         Yields:
             str: Assistant response chunks as they are generated.
@@ -46,46 +106,85 @@ class RAGService:
         Raises:
             RuntimeError: If pipeline or persistence fails unexpectedly.
         """
-        # Persist user message (best effort)
-        try:
-            await add_message(
-                db, session_id, MessageCreate(role="user", content=user_text)
-            )
-        except Exception as e:
-            logger.error("[RAGService] Failed to persist user message", exc=e)
-
-        buffer = ""
-        try:
-            # History excluding the just‑persisted user message
-            history: List[MessageModel] = list(await get_messages(db, session_id))[:-1]
-
-            async for chunk in self._pipeline.stream(user_text, history):
-                if is_disconnected:
-                    try:
-                        if await is_disconnected():
-                            logger.warning(
-                                "[RAGService] Client disconnected; stopping stream"
-                            )
-                            break
-                    except Exception:
-                        pass
-                buffer += chunk
-                yield chunk
-        except Exception as e:
-            logger.error("[RAGService] Stream failed", exc=e)
-            from services.rag_pipeline import RAGPipeline as _RP
-
-            # Surface a single fallback chunk
-            fallback = _RP.FALLBACK_MESSAGE
-            buffer = buffer or fallback
-            yield fallback
-        finally:
-            if buffer:
+        started = time.perf_counter()
+        # One span per turn, so the stage spans below share a trace
+        with span("rag.turn"):
+            # Embedding + retrieval depend only on the query: start them now so
+            # they overlap the DB round-trips below instead of following them.
+            prefetch = self._pipeline.prefetch(user_text)
+
+            buffer = ""
+            history: Optional[List[MessageModel]] = None
+            turn: List[MessageModel] = []
+            try:
+                # Persist user message (best effort)
+                user_message: Optional[MessageModel] = None
                 try:
-                    await add_message(
-                        db, session_id, MessageCreate(role="finbot", content=buffer)
-                    )
+                    with span("rag.persist_user"):
+                        user_message = await self._persist(
+                            db, session_id, "user", user_text
+                        )
+                    turn.append(user_message)
                 except Exception as e:
-                    logger.error(
-                        "[RAGService] Failed to persist assistant message", exc=e
-                    )
+                    logger.error("[RAGService] Failed to persist user message", exc=e)
+
+                # History excluding the just‑persisted user message
+                with span("rag.history"):
+                    history = await self._load_history(db, session_id, user_message)
+
+                async with aclosing(
+                    self._pipeline.stream(user_text, history, prefetch=prefetch)
+                ) as chunks:
+                    async for chunk in chunks:
+                        if not buffer:
+                            observe_stage("rag.ttft", time.perf_counter() - started)
+                        buffer += chunk
+                        yield chunk
+            except Exception as e:
+                logger.error("[RAGService] Stream failed", exc=e)
+                from services.rag_pipeline import RAGPipeline as _RP
+
+                # Surface a single fallback chunk
+                fallback = _RP.FALLBACK_MESSAGE
+                buffer = buffer or fallback
+                yield fallback
+            finally:
+                if prefetch is not None:
+                    prefetch.cancel()
+                if buffer:
+                    try:
+                        with span("rag.persist_assistant"):
+                            turn.append(
+                                await self._persist(db, session_id, "finbot", buffer)
+                            )
+                    except Exception as e:
+                        logger.error(
+                            "[RAGService] Failed to persist assistant message", exc=e
+                        )
+                if history is not None:
+                    try:
+                        await self._remember_history(session_id, history, turn)
+                    except Exception as e:
+                        logger.error("[RAGService] Failed to cache history", exc=e)
+
+
+def _pack_history(messages: List[MessageModel]) -> bytes:
+    return pack_json(
+        [
+            [m.id.hex, m.role, m.content, m.created_at.timestamp()]  # type: ignore[union-attr]
+            for m in messages
+        ]
+    )
+
+
+def _unpack_history(session_id, blob: bytes) -> List[MessageModel]:
+    return [
+        MessageModel(
+            id=UUID(hex=id_),
+            session_id=session_id,
+            role=role,
+            content=content,
+            created_at=datetime.fromtimestamp(ts, timezone.utc),
+        )
+        for id_, role, content, ts in unpack_json(blob)
+    ]
@@ -1,9 +1,43 @@
-from typing import List, AsyncIterator
-from interfaces.vector_store import VectorStore
+import asyncio
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import List, AsyncIterator, Optional
+from interfaces.embedder import Embedder
+from interfaces.vector_store import RetrievalUnavailable, VectorStore
 from interfaces.llm_generator import LLMGenerator
 from models import Message
+from services.admission import AdmissionRejected
+from services.semantic_cache import SemanticCache, split_for_replay
+from services.tenancy import current_tenant
 
 from local_logs.logger import logger
+from telemetry import span
+
+
+@dataclass
+class Prefetch:
+    """
+    Query-only work started ahead of `RAGPipeline.stream`.
+
+    :param retrieval: Task resolving to the retrieved chunks, or None when
+        retrieval was skipped because the answer cache holds the query.
+    :param embedding: Task resolving to the query embedding, shared by the
+        answer cache and retrieval; None without an answer cache, in which
+        case the vector store decides whether to embed.
+    """
+
+    retrieval: "asyncio.Task[Optional[List[str]]]"
+    embedding: "Optional[asyncio.Task[Optional[List[float]]]]" = None
+
+    def cancel(self) -> None:
+        """Cancel unfinished tasks; errors of finished ones were logged already."""
+        for task in (self.retrieval, self.embedding):
+            if task is None:
+                continue
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                task.exception()  # mark as retrieved
 
 
 class RAGPipeline:
@@ -14,11 +48,21 @@ class RAGPipeline:
     :param llm_generator: LLMGenerator implementation for text generation.
     :param top_k: Max number of chunks to retrieve.
     :param min_query_len: Minimum length for a valid query.
+    :param embedder: Embedder for the query when an answer cache is used;
+        its vector keys the cache and is handed to the vector store, so a
+        query is embedded once. Without a cache the store embeds on its own
+        and may skip it (e.g. on a conclusive lexical hit).
+    :param answer_cache: Optional semantic cache of full answers for
+        standalone (history-free) questions.
     """
 
     FALLBACK_MESSAGE: str = (
         "I'm not sure based on the available information. Please contact our support team."
     )
+    # Sent when OpenAI admission control turns the turn away
+    BUSY_MESSAGE: str = (
+        "We're receiving a lot of questions right now. Please try again in a moment."
+    )
 
     def __init__(
         self,
@@ -27,11 +71,15 @@ class RAGPipeline:
         *,
         top_k: int = 5,
         min_query_len: int = 1,
+        embedder: Optional[Embedder] = None,
+        answer_cache: Optional[SemanticCache] = None,
     ):
         self._vector_store = vector_store
         self._llm_generator = llm_generator
         self._top_k = top_k
         self._min_query_len = min_query_len
+        self._embedder = embedder
+        self._answer_cache = answer_cache if embedder is not None else None
 
     @staticmethod
     def _is_query_weak(query: str, min_len: int) -> bool:
@@ -46,28 +94,114 @@ class RAGPipeline:
         condition = len(q) < min_len and q not in ("no", "yes") and not q.isdigit()
         return condition
 
-    async def _retrieve(self, query: str) -> List[str]:
+    @staticmethod
+    def _is_standalone(history: List[Message]) -> bool:
+        """
+        True if the answer cannot depend on earlier turns (no prior user messages).
+
+        :param history: Conversation so far, excluding the current query.
+        """
+        return not any(m.role == "user" for m in history or [])
+
+    async def _embed(self, query: str) -> Optional[List[float]]:
+        """
+        Embed the query once for the answer cache and retrieval; None on
+        failure (retrieval then embeds on its own). Admission rejections
+        propagate: retrying would only be rejected again.
+        """
+        try:
+            return await self._embedder.embed(query)  # type: ignore[union-attr]
+        except AdmissionRejected:
+            raise
+        except Exception as e:
+            logger.error("[RAG] Query embedding failed:", exc=e)
+            return None
+
+    async def _cached_answer_key(
+        self, query: str, history: List[Message], prefetch: Optional[Prefetch]
+    ) -> Optional[List[float]]:
+        """
+        Embed the query for the answer cache, or None if caching doesn't apply.
+        """
+        if self._answer_cache is None or not self._is_standalone(history):
+            return None
+        if prefetch is not None and prefetch.embedding is not None:
+            return await prefetch.embedding
+        return await self._embed(query)
+
+    def prefetch(self, query: str) -> Optional[Prefetch]:
+        """
+        Start embedding and retrieval for `query` in the background.
+
+        Both depend on the query alone, so callers can overlap them with DB
+        work (persisting the turn, loading history) and pass the result to
+        `stream`. With an answer cache the query is embedded once up front;
+        retrieval waits for that embedding and is skipped when the cache
+        already holds the query. Returns None for weak queries, which never
+        retrieve.
+
+        :param query: Raw user query.
+        """
+        if self._is_query_weak(query, self._min_query_len):
+            return None
+        embedding = None
+        if self._answer_cache is not None:
+            embedding = asyncio.create_task(self._embed(query))
+        return Prefetch(
+            asyncio.create_task(self._prefetch_retrieval(query, embedding)), embedding
+        )
+
+    async def _prefetch_retrieval(
+        self,
+        query: str,
+        embedding: "Optional[asyncio.Task[Optional[List[float]]]]",
+    ) -> Optional[List[str]]:
+        vector = await embedding if embedding is not None else None
+        if (
+            vector is not None
+            and self._answer_cache is not None
+            and self._answer_cache.contains(vector, scope=current_tenant())
+        ):
+            # Likely a cache hit; `stream` retrieves after all if it is not
+            return None
+        return await self._retrieve(query, vector)
+
+    async def _retrieve(
+        self, query: str, vector: Optional[List[float]] = None
+    ) -> List[str]:
         """
         Retrieve relevant context snippets for the query.
 
         :param query: Raw user query.
-        :return: List of context chunk strings.
+        :param vector: Embedding of `query` if already computed (answer-cache
+            key), so the store does not embed the same text again.
+        :return: List of context chunk strings; empty if the store is
+            temporarily unavailable (breaker open, deadline missed), so the
+            answer is generated without context. Other errors are raised.
         """
         try:
             chunks = await self._vector_store.get_relevant_chunks(
-                query, top_k=self._top_k
+                query, top_k=self._top_k, vector=vector
             )
             chunks = [c for c in (chunks or []) if isinstance(c, str) and c.strip()]
             return chunks
-        except Exception as e:
-            logger.error("[RAG] Retrieval failed:", exc=e)
-            raise
+        except RetrievalUnavailable as e:
+            logger.warning(f"[RAG] {e}; answering without context")
+            return []
 
-    async def stream(self, query: str, history: List[Message]) -> AsyncIterator[str]:
+    async def stream(
+        self,
+        query: str,
+        history: List[Message],
+        *,
+        prefetch: Optional[Prefetch] = None,
+    ) -> AsyncIterator[str]:
         """
         Stream the model answer token-by-token.
 
         :param query: User query string.
+        :param history: Conversation so far, excluding the current query.
+        :param prefetch: Result of `prefetch(query)`, if already started.
         :yield: Model token fragments as strings.
         """
         try:
@@ -76,12 +210,49 @@ class RAGPipeline:
                 yield self.FALLBACK_MESSAGE
                 return
 
-            chunks = await self._retrieve(query)
+            cached = None
+            with span("pipeline.answer_cache"):
+                cache_key = await self._cached_answer_key(query, history, prefetch)
+                if cache_key is not None:
+                    cached = self._answer_cache.lookup(  # type: ignore[union-attr]
+                        cache_key, scope=current_tenant()
+                    )
+            if cached is not None:
+                logger.info("[RAG] Answer cache hit")
+                for piece in split_for_replay(cached):
+                    yield piece
+                return
+
+            with span("pipeline.retrieve"):
+                chunks = await prefetch.retrieval if prefetch is not None else None
+                if chunks is None:
+                    vector = cache_key
+                    if prefetch is not None and prefetch.embedding is not None:
+                        vector = await prefetch.embedding
+                    chunks = await self._retrieve(query, vector)
             if not chunks:
                 logger.warning("[RAG] No context found")
+                # Don't pin an ungrounded answer in the cache
+                cache_key = None
+
+            answer: List[str] = []
+            async with aclosing(
+                self._llm_generator.stream(chunks, query, history)
+            ) as tokens:
+                async for token in tokens:
+                    answer.append(token)
+                    yield token
 
-            async for token in self._llm_generator.stream(chunks, query, history):
-                yield token
+            if cache_key is not None and answer:
+                self._answer_cache.store(  # type: ignore[union-attr]
+                    cache_key, "".join(answer), scope=current_tenant()
+                )
+        except AdmissionRejected as e:
+            logger.warning(f"[RAG] Turn not admitted: {e}")
+            yield self.BUSY_MESSAGE
         except Exception as e:
             logger.error("[RAG] Pipeline streaming error:", exc=e)
             yield self.FALLBACK_MESSAGE
+        finally:
+            if prefetch is not None:
+                prefetch.cancel()
@@ -0,0 +1,292 @@
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence, Set, Tuple
+
+from config import config
+from local_logs.logger import logger
+from interfaces.embedder import Embedder
+from interfaces.vector_store import RetrievalUnavailable, VectorStore, VectorRecord
+from services.ttl_cache import TTLCache
+from telemetry import registry
+
+HEDGED = registry.counter(
+    "ragbot_retrieval_hedged_total",
+    "Retrievals that sent a second, hedged request",
+)
+DEGRADED = registry.counter(
+    "ragbot_retrieval_degraded_total",
+    "Retrievals answered in degraded mode, by cause",
+    label_names=("reason",),
+)
+
+# Latency samples needed before the hedge delay tracks the observed p95
+_MIN_SAMPLES = 20
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    Opens after `failure_threshold` failures in a row. Once `reset_after`
+    seconds have passed, a single trial call is let through (half-open); its
+    outcome closes the breaker or opens it again.
+
+    Not thread-safe; intended for use from the event loop only.
+
+    :param failure_threshold: Consecutive failures that open the breaker.
+    :param reset_after: Seconds to stay open before a trial call.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_after: float = 30.0):
+        self._threshold = max(1, failure_threshold)
+        self._reset_after = reset_after
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+        self.trips = 0
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self._reset_after:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a call may proceed now; claims the trial when half-open."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial:
+            self._trial = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._trial = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._trial or self._failures >= self._threshold:
+            if self._opened_at is None:
+                self.trips += 1
+                logger.warning(
+                    f"[CircuitBreaker] Open after {self._failures} failure(s); "
+                    f"retrying in {self._reset_after:.0f}s"
+                )
+            self._opened_at = time.monotonic()
+        self._trial = False
+
+    def release(self) -> None:
+        """Give up a claimed trial without an outcome (e.g. cancellation)."""
+        self._trial = False
+
+
+class ResilientVectorStore(VectorStore):
+    """
+    Bounds the latency of a remote VectorStore.
+
+    The query is embedded first, with `embedder`, so the deadline and the
+    hedge cover only the remote vector query. That query runs against a
+    deadline. If the first request has not answered after the observed p95
+    latency, a second, hedged request is sent and whichever answers first
+    wins. A request that fails before the hedge fires is retried the same
+    way. Deadline misses and errors count towards a circuit breaker; while
+    it is open the remote store is not called at all.
+
+    A deadline miss or an open breaker returns the last good result for the
+    same query (kept `cache_ttl` seconds), or raises `RetrievalUnavailable`
+    if there is none; HybridVectorStore then answers from BM25 alone and the
+    pipeline generates without context. Other errors are raised.
+
+    :param inner: Remote store to protect.
+    :param embedder: Embeds queries that arrive without a vector; None
+        leaves that to `inner`, inside the deadline.
+    :param deadline: Seconds a query may take, hedge included.
+    :param hedge: Send a hedged request after the p95 delay.
+    :param hedge_delay: Hedge delay (seconds) until enough latencies are seen.
+    :param min_hedge_delay: Lower bound of the hedge delay (seconds).
+    :param failure_threshold: Consecutive failures that open the breaker.
+    :param reset_after: Seconds the breaker stays open before a trial call.
+    :param cache_size: Queries whose last good result is kept.
+    :param cache_ttl: Lifetime of kept results in seconds.
+    """
+
+    def __init__(
+        self,
+        inner: VectorStore,
+        *,
+        embedder: Optional[Embedder] = None,
+        deadline: float = 1.5,
+        hedge: bool = True,
+        hedge_delay: float = 0.3,
+        min_hedge_delay: float = 0.05,
+        failure_threshold: int = 5,
+        reset_after: float = 30.0,
+        cache_size: int = 2048,
+        cache_ttl: float = 3600.0,
+    ):
+        self._inner = inner
+        self._embedder = embedder
+        self._deadline = deadline
+        self._hedge = hedge
+        self._default_hedge_delay = hedge_delay
+        self._min_hedge_delay = min_hedge_delay
+        self._latencies: Deque[float] = deque(maxlen=512)
+        self._samples = 0
+        self._p95: Optional[float] = None
+        self._samples_at_p95 = 0
+        self.breaker = CircuitBreaker(failure_threshold, reset_after)
+        self._last_good: TTLCache[Tuple[str, int], List[str]] = TTLCache(
+            maxsize=cache_size, ttl=cache_ttl
+        )
+        self.hedged = 0
+        self.degraded = 0
+
+    def _hedge_delay(self) -> float:
+        n = len(self._latencies)
+        if n < _MIN_SAMPLES:
+            return self._default_hedge_delay
+        # Re-sort only every few samples; the window moves slowly
+        if self._p95 is None or self._samples - self._samples_at_p95 >= 16:
+            ordered = sorted(self._latencies)
+            self._p95 = ordered[min(n - 1, int(n * 0.95))]
+            self._samples_at_p95 = self._samples
+        return max(self._min_hedge_delay, self._p95)
+
+    async def _attempt(
+        self, query: str, top_k: int, vector: Optional[List[float]]
+    ) -> List[str]:
+        started = time.perf_counter()
+        chunks = await self._inner.get_relevant_chunks(
+            query, top_k=top_k, vector=vector
+        )
+        self._latencies.append(time.perf_counter() - started)
+        self._samples += 1
+        return chunks
+
+    async def _query(
+        self, query: str, top_k: int, vector: Optional[List[float]]
+    ) -> List[str]:
+        """First successful answer of up to two requests, within the deadline."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._deadline
+        pending: Set[asyncio.Task] = {
+            asyncio.create_task(self._attempt(query, top_k, vector))
+        }
+        can_hedge = self._hedge and self.breaker.state == "closed"
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                timeout = (
+                    min(remaining, self._hedge_delay()) if can_hedge else remaining
+                )
+                done, pending = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+                if can_hedge and deadline - loop.time() > self._min_hedge_delay:
+                    # Slow (past p95) or failed: one more request races it
+                    can_hedge = False
+                    self.hedged += 1
+                    HEDGED.inc()
+                    pending.add(
+                        asyncio.create_task(self._attempt(query, top_k, vector))
+                    )
+            raise error  # type: ignore[misc]
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _degrade(self, reason: str, query: str, top_k: int) -> List[str]:
+        self.degraded += 1
+        DEGRADED.inc(reason)
+        chunks = self._last_good.get((query, top_k))
+        if chunks is None:
+            raise RetrievalUnavailable(reason)
+        return chunks
+
+    async def get_relevant_chunks(
+        self, query: str, top_k: int = 5, *, vector: Optional[List[float]] = None
+    ) -> List[str]:
+        """Retrieve chunks from the wrapped store, degrading instead of waiting.
+
+        Args:
+            query (str): Natural-language query.
+            top_k (int): Number of results to return.
+            vector (list[float] | None): Precomputed embedding of `query`;
+                embedded here when None.
+
+        Returns:
+            list[str]: Ordered chunk texts; the last good result when the
+            store is slow or its breaker is open.
+
+        Raises:
+            RetrievalUnavailable: Slow or breaker open, and no last good result.
+        """
+        key = (" ".join(query.split()).casefold(), top_k)
+        if not self.breaker.allow():
+            return self._degrade("breaker_open", *key)
+
+        settled = False
+        try:
+            if vector is None and self._embedder is not None and query.strip():
+                vector = await self._embedder.embed(query)
+            try:
+                chunks = await self._query(query, top_k, vector)
+            except asyncio.TimeoutError:
+                self.breaker.record_failure()
+                settled = True
+                logger.error("[ResilientVectorStore] Retrieval timed out; degrading")
+                return self._degrade("deadline", *key)
+            except Exception as e:
+                self.breaker.record_failure()
+                settled = True
+                logger.error(
+                    "[ResilientVectorStore] Retrieval failed:", exc=e, once=config.DEBUG
+                )
+                raise
+            self.breaker.record_success()
+            settled = True
+        finally:
+            if not settled:
+                # Embedding failed or cancelled: no verdict on the remote store
+                self.breaker.release()
+
+        self._last_good.set(key, chunks)
+        return chunks
+
+    async def health_check(self) -> bool:
+        return await self._inner.health_check()
+
+    def memory_bytes(self) -> int:
+        return self._inner.memory_bytes()
+
+    async def upsert(self, records: Sequence[VectorRecord]) -> None:
+        await self._inner.upsert(records)
+
+    async def delete(self, ids: Sequence[str]) -> None:
+        await self._inner.delete(ids)
+
+    async def flush(self) -> None:
+        await self._inner.flush()
+
+    def stats(self) -> Dict[str, float]:
+        """Snapshot of hedging, degradation and breaker counters."""
+        return {
+            "hedged": self.hedged,
+            "degraded": self.degraded,
+            "breaker_open": 0.0 if self.breaker.state == "closed" else 1.0,
+            "breaker_trips": self.breaker.trips,
+            "hedge_delay_seconds": self._hedge_delay(),
+        }
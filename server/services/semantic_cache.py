@@ -0,0 +1,136 @@
+import re
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+BUBBLE_DELIMITER = "[[NEW_BUBBLE]]"
+_BUBBLE_SPLIT = re.compile(f"({re.escape(BUBBLE_DELIMITER)})")
+
+
+def split_for_replay(answer: str) -> List[str]:
+    """Split a cached answer into stream pieces, keeping bubble delimiters."""
+    return [part for part in _BUBBLE_SPLIT.split(answer) if part]
+
+
+class SemanticCache:
+    """
+    Answer cache keyed by query embedding similarity.
+
+    Query vectors are L2-normalized and stored in a fixed-size float32 matrix,
+    so a lookup is one matrix-vector product. Entries expire after `ttl`
+    seconds; when full, the least recently used slot is overwritten.
+    Entries are matched only within their `scope` (e.g. a tenant), so one
+    bounded matrix serves many tenants without leaking answers across them.
+
+    :param dimension: Embedding dimensionality.
+    :param maxsize: Max number of cached answers.
+    :param ttl: Entry lifetime in seconds.
+    :param threshold: Min cosine similarity for a hit.
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        *,
+        maxsize: int = 2048,
+        ttl: float = 3600.0,
+        threshold: float = 0.95,
+    ):
+        self._maxsize = max(1, maxsize)
+        self._ttl = ttl
+        self._threshold = threshold
+        self._vectors = np.zeros((self._maxsize, dimension), dtype=np.float32)
+        self._answers: List[Optional[str]] = [None] * self._maxsize
+        self._expires_at = np.zeros(self._maxsize, dtype=np.float64)
+        self._last_used = np.zeros(self._maxsize, dtype=np.float64)
+        self._scopes = np.zeros(self._maxsize, dtype=np.int32)
+        self._scope_ids: Dict[str, int] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> Optional[np.ndarray]:
+        v = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(v))
+        return v / norm if norm > 0 else None
+
+    def _scope_id(self, scope: str) -> int:
+        return self._scope_ids.setdefault(scope, len(self._scope_ids))
+
+    def _best_match(self, q: np.ndarray, now: float, scope: str) -> Optional[int]:
+        live = (self._expires_at > now) & (self._scopes == self._scope_id(scope))
+        if not live.any():
+            return None
+        scores = self._vectors @ q
+        scores[~live] = -np.inf
+        i = int(np.argmax(scores))
+        return i if scores[i] >= self._threshold else None
+
+    def lookup(self, vector: Sequence[float], *, scope: str = "") -> Optional[str]:
+        """
+        Return the cached answer for the closest live query, if similar enough.
+
+        :param vector: Query embedding.
+        :param scope: Only entries stored under this scope can match.
+        :return: Cached answer text or None on a miss.
+        """
+        q = self._normalize(vector)
+        now = time.monotonic()
+        i = self._best_match(q, now, scope) if q is not None else None
+        if i is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._last_used[i] = now
+        return self._answers[i]
+
+    def contains(self, vector: Sequence[float], *, scope: str = "") -> bool:
+        """
+        Whether `lookup` would hit now, without counting it or refreshing LRU.
+
+        :param vector: Query embedding.
+        :param scope: Only entries stored under this scope can match.
+        """
+        q = self._normalize(vector)
+        return (
+            q is not None and self._best_match(q, time.monotonic(), scope) is not None
+        )
+
+    def store(self, vector: Sequence[float], answer: str, *, scope: str = "") -> None:
+        """
+        Cache `answer` for the query embedding `vector`.
+
+        A near-duplicate entry is refreshed in place; otherwise an empty or
+        expired slot is used, falling back to the least recently used one.
+        """
+        q = self._normalize(vector)
+        if q is None or not answer:
+            return
+        now = time.monotonic()
+
+        i = self._best_match(q, now, scope)
+        if i is None:
+            i = int(np.argmin(self._expires_at))
+            if self._expires_at[i] > now:
+                i = int(np.argmin(self._last_used))
+                self.evictions += 1
+
+        self._vectors[i] = q
+        self._answers[i] = answer
+        self._scopes[i] = self._scope_id(scope)
+        self._expires_at[i] = now + self._ttl
+        self._last_used[i] = now
+
+    def stats(self) -> Dict[str, float]:
+        """Snapshot of cache counters and hit rate."""
+        lookups = self.hits + self.misses
+        return {
+            "size": int((self._expires_at > time.monotonic()).sum()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -1,22 +1,105 @@
+from datetime import datetime, timezone
 from typing import Optional, Tuple
 from uuid import uuid4, UUID
-from sqlalchemy import desc, select
+from sqlalchemy import desc, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, Response
 from models import Session
 from schemas.message import IntroMessage, MessageCreate
 from services.chat import add_message
-from services.user import get_or_create_user
+from services.user import ensure_user
 from services.auth import Auth
+from services.ttl_cache import TTLCache
+from services.shared_cache import pack_session, unpack_session
+from services.container import get_shared_cache
+from services.tenancy import company_name
+from db_manager import db_manager
 from config import config
 from local_logs.logger import logger
 
 
-INTRO_MESSAGE = (
-    f"Hi! I'm your assistant for {config.COMPANY_NAME}. "
-    "What can I help you with today?"
+INTRO_MESSAGE = "Hi! I'm your assistant for {company}. What can I help you with today?"
+
+# Short-lived snapshots so resuming a session rarely hits the DB: a
+# per-process tier, backed by the shared (Redis) cache when configured.
+# session id -> (owner user id or None, created_at)
+_sessions: TTLCache[UUID, Tuple[Optional[UUID], datetime]] = TTLCache(
+    maxsize=config.SESSION_CACHE_SIZE, ttl=config.SESSION_CACHE_TTL_SECONDS
+)
+# user id -> id of their latest session
+_latest_session: TTLCache[UUID, UUID] = TTLCache(
+    maxsize=config.SESSION_CACHE_SIZE, ttl=config.SESSION_CACHE_TTL_SECONDS
 )
 
+# Reads select plain columns: no identity map, no relationship loaders
+_COLUMNS = (Session.id, Session.user_id, Session.created_at)
+
+
+def _from_row(row) -> Session:
+    """Detached Session built from a (id, user_id, created_at) row."""
+    return Session(id=row.id, user_id=row.user_id, created_at=row.created_at)
+
+
+async def _remember(session: Session) -> Session:
+    _sessions.set(session.id, (session.user_id, session.created_at))  # type: ignore[arg-type]
+    shared = get_shared_cache()
+    if shared is not None:
+        await shared.set(
+            f"sess:{session.id}",
+            pack_session(session.id, session.user_id, session.created_at),  # type: ignore[arg-type]
+            config.SESSION_CACHE_TTL_SECONDS,
+        )
+    return session
+
+
+async def _forget(session_id: UUID) -> None:
+    _sessions.pop(session_id)
+    shared = get_shared_cache()
+    if shared is not None:
+        await shared.delete(f"sess:{session_id}")
+
+
+async def _cached_session(session_id: UUID) -> Optional[Session]:
+    """Detached Session built from the cache, or None on a miss."""
+    hit = _sessions.get(session_id)
+    if hit is None:
+        shared = get_shared_cache()
+        blob = await shared.get(f"sess:{session_id}") if shared is not None else None
+        if blob is None:
+            return None
+        _, user_id, created_at = unpack_session(blob)
+        hit = (user_id, created_at)
+        _sessions.set(session_id, hit)
+    user_id, created_at = hit
+    return Session(id=session_id, user_id=user_id, created_at=created_at)
+
+
+async def _get_latest(user_id: UUID) -> Optional[UUID]:
+    latest = _latest_session.get(user_id)
+    if latest is None:
+        shared = get_shared_cache()
+        blob = await shared.get(f"latest:{user_id}") if shared is not None else None
+        if blob is None:
+            return None
+        latest = UUID(bytes=blob)
+        _latest_session.set(user_id, latest)
+    return latest
+
+
+async def _set_latest(user_id: UUID, session_id: Optional[UUID]) -> None:
+    """Record the user's latest session; None forgets it."""
+    shared = get_shared_cache()
+    if session_id is None:
+        _latest_session.pop(user_id)
+        if shared is not None:
+            await shared.delete(f"latest:{user_id}")
+        return
+    _latest_session.set(user_id, session_id)
+    if shared is not None:
+        await shared.set(
+            f"latest:{user_id}", session_id.bytes, config.SESSION_CACHE_TTL_SECONDS
+        )
+
 
 async def create_session(db: AsyncSession, user_id: Optional[UUID] = None) -> Session:
     """
@@ -30,12 +113,16 @@ async def create_session(db: AsyncSession, user_id: Optional[UUID] = None) -> Se
         HTTPException: 500 on failure.
     """
     try:
-        session = Session(id=uuid4(), user_id=user_id)
+        # Client-side id and timestamp: no refresh round-trip after commit
+        session = Session(
+            id=uuid4(), user_id=user_id, created_at=datetime.now(timezone.utc)
+        )
         db.add(session)
         await db.commit()
-        await db.refresh(session)
         logger.info(f"[service:session] Created new session {session.id}")
-        return session
+        if user_id is not None:
+            await _set_latest(user_id, session.id)  # type: ignore[arg-type]
+        return await _remember(session)
     except Exception as e:
         logger.error(
             "[service:session] Failed to create session", exc=e, once=config.DEBUG
@@ -47,22 +134,81 @@ async def create_session(db: AsyncSession, user_id: Optional[UUID] = None) -> Se
 async def get_latest_session_for_user(
     db: AsyncSession, user_id: UUID
 ) -> Optional[Session]:
+    latest = await _get_latest(user_id)
+    if latest is not None:
+        cached = await _cached_session(latest)
+        if cached is not None:
+            return cached
     q = (
-        select(Session)
+        select(*_COLUMNS)
         .where(Session.user_id == user_id)
         .order_by(desc(Session.created_at))
         .limit(1)
     )
-    r = await db.execute(q)
-    return r.scalar_one_or_none()
+    row = None
+    if db_manager.has_replica:
+        async with db_manager.read_session() as rdb:
+            row = (await rdb.execute(q)).first()
+    if row is None:
+        # No replica, or it hasn't caught up with a just-created session
+        row = (await db.execute(q)).first()
+    if row is None:
+        return None
+    await _set_latest(user_id, row.id)
+    return await _remember(_from_row(row))
+
 
+async def get_session(
+    db: AsyncSession, session_id: UUID, *, prefer_replica: bool = False
+) -> Session:
+    """
+    Session by id, from the cache or the DB; 404 if it does not exist.
 
-async def get_session(db: AsyncSession, session_id: UUID) -> Session:
-    session = await db.get(Session, session_id)
-    if not session:
+    With `prefer_replica`, the replica is asked first and `db` (the primary)
+    only on a miss, so a session created moments ago is still found.
+    """
+    cached = await _cached_session(session_id)
+    if cached is not None:
+        return cached
+    q = select(*_COLUMNS).where(Session.id == session_id)
+    row = None
+    if prefer_replica and db_manager.has_replica:
+        async with db_manager.read_session() as rdb:
+            row = (await rdb.execute(q)).first()
+    if row is None:
+        # No replica, or it hasn't caught up with a just-created session
+        row = (await db.execute(q)).first()
+    if row is None:
         logger.warning(f"[service:session] Session {session_id} not found in DB")
         raise HTTPException(status_code=404, detail="Session not found")
-    return session
+    return await _remember(_from_row(row))
+
+
+async def claim_session(
+    db: AsyncSession, session: Session, user_id: UUID
+) -> Optional[Session]:
+    """
+    Attach an anonymous session to `user_id` in one conditional UPDATE.
+
+    Returns None if the session was claimed by someone else meanwhile.
+    """
+    result = await db.execute(
+        update(Session)
+        .where(Session.id == session.id, Session.user_id.is_(None))
+        .values(user_id=user_id)
+        .returning(Session.id)
+    )
+    claimed = result.scalar_one_or_none()
+    await db.commit()
+    if claimed is None:
+        await _forget(session.id)  # type: ignore[arg-type]
+        return None
+    claimed_session = Session(
+        id=session.id, user_id=user_id, created_at=session.created_at
+    )
+    # The user may own newer sessions; look it up next time
+    await _set_latest(user_id, None)
+    return await _remember(claimed_session)
 
 
 async def create_intro_message(session: AsyncSession, session_id: UUID) -> IntroMessage:
@@ -80,9 +226,10 @@ async def create_intro_message(session: AsyncSession, session_id: UUID) -> Intro
     TODO: Replace with actual intro creation
     """
     try:
-        message = MessageCreate(role="finbot", content=INTRO_MESSAGE)
+        content = INTRO_MESSAGE.format(company=company_name())
+        message = MessageCreate(role="finbot", content=content)
         await add_message(session, session_id, message)
-        return IntroMessage(content=INTRO_MESSAGE)
+        return IntroMessage(content=content)
     except Exception as e:
         logger.error(
             f"[service:intro_message] Failed to generate Intro message for session {session_id}",
@@ -119,31 +266,36 @@ async def create_or_resolve_session(
     - Else, if cookie is present, and cookie session id exists -> return that session
     - Else, create new anonymous session
 
+    Known users and session owners are cached for SESSION_CACHE_TTL_SECONDS,
+    so resuming a session usually costs zero or one queries.
+
     Returns:
         (session, should_set_cookie)
         - should_set_cookie = True when we created a new session or when no valid cookie existed
     """
 
     if auth is not None and getattr(auth, "user_id", None):
-        user = await get_or_create_user(db, auth.user_id)
+        user_id = await ensure_user(db, auth.user_id)
         if cookie_session_id:
             try:
                 cookie_sess = await get_session(db, UUID(cookie_session_id))
                 if cookie_sess.user_id is None:
-                    cookie_sess.user_id = user.id
-                    await db.commit()
-                    await db.refresh(cookie_sess)
-                    return cookie_sess, False
+                    claimed = await claim_session(db, cookie_sess, user_id)
+                    if claimed is not None:
+                        return claimed, False
             except Exception:
                 logger.warning("Could not set user id")
-                pass
-        existing = await get_latest_session_for_user(db, user.id)  # type: ignore
+                await db.rollback()
+        existing = await get_latest_session_for_user(db, user_id)
         if existing:
             logger.info(
-                f"[service:session] Resumed session {existing.id} for user {user.id}"
+                "[service:session] Resumed session %s for user %s",
+                existing.id,
+                user_id,
+                sample=config.LOG_SAMPLE_RATE,
             )
             return existing, False
-        session = await create_session(db, user.id)  # type: ignore
+        session = await create_session(db, user_id)
         return session, True
 
     if cookie_session_id:
@@ -0,0 +1,181 @@
+import json
+import struct
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from services.ttl_cache import TTLCache
+from local_logs.logger import logger
+
+try:  # optional: without redis-py the cache is process-local
+    from redis import asyncio as aioredis
+    from redis.exceptions import RedisError
+except ImportError:  # pragma: no cover
+    aioredis = None
+    RedisError = OSError  # type: ignore[assignment,misc]
+
+
+class SharedCache:
+    """
+    Byte-valued cache shared by all workers through Redis.
+
+    Falls back to an in-process TTL store when `url` is unset, redis-py is
+    missing, or Redis errors; after an error Redis is retried every
+    `retry_after` seconds. Batch reads use one `MGET`, batch writes one
+    non-transactional pipeline, so a lookup of many keys costs a single
+    round-trip.
+
+    Values are opaque bytes; see the `pack_*` / `unpack_*` helpers below.
+
+    :param url: Redis URL, e.g. "redis://localhost:6379/0"; None = local only.
+    :param prefix: Namespace prepended to every key.
+    :param local_maxsize: Entries kept by the in-process fallback.
+    :param timeout: Socket timeout (seconds) for Redis calls.
+    :param retry_after: Seconds to stay on the fallback after a Redis error.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        *,
+        prefix: str = "ragbot:",
+        local_maxsize: int = 10_000,
+        timeout: float = 0.25,
+        retry_after: float = 30.0,
+    ):
+        self._prefix = prefix
+        self._local: TTLCache[str, bytes] = TTLCache(
+            maxsize=local_maxsize, ttl=24 * 3600
+        )
+        self._retry_after = retry_after
+        self._down_until = 0.0
+        self._redis = None
+        if url and aioredis is not None:
+            self._redis = aioredis.Redis.from_url(
+                url, socket_timeout=timeout, socket_connect_timeout=timeout
+            )
+        elif url:
+            logger.warning("[SharedCache] redis-py not installed; using local cache")
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @property
+    def backend(self) -> str:
+        return "redis" if self._use_redis() else "local"
+
+    def _use_redis(self) -> bool:
+        return self._redis is not None and time.monotonic() >= self._down_until
+
+    def _failed(self, e: Exception) -> None:
+        self.errors += 1
+        self._down_until = time.monotonic() + self._retry_after
+        logger.error(
+            f"[SharedCache] Redis unavailable; using local cache for {self._retry_after:.0f}s",
+            exc=e,
+        )
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return (await self.get_many([key]))[0]
+
+    async def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        """Values for `keys` (None on miss), in order, in one round-trip."""
+        if not keys:
+            return []
+        values: List[Optional[bytes]]
+        if self._use_redis():
+            try:
+                values = await self._redis.mget([self._prefix + k for k in keys])  # type: ignore[union-attr]
+            except (RedisError, OSError) as e:
+                self._failed(e)
+                values = [self._local.get(k) for k in keys]
+        else:
+            values = [self._local.get(k) for k in keys]
+        found = sum(v is not None for v in values)
+        self.hits += found
+        self.misses += len(values) - found
+        return values
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.set_many({key: value}, ttl)
+
+    async def set_many(self, items: Mapping[str, bytes], ttl: float) -> None:
+        """Store all `items` with the same TTL (seconds) in one pipeline."""
+        if not items or ttl <= 0:
+            return
+        if self._use_redis():
+            try:
+                async with self._redis.pipeline(transaction=False) as pipe:  # type: ignore[union-attr]
+                    for key, value in items.items():
+                        pipe.set(self._prefix + key, value, px=max(1, int(ttl * 1000)))
+                    await pipe.execute()
+                return
+            except (RedisError, OSError) as e:
+                self._failed(e)
+        for key, value in items.items():
+            self._local.set(key, value, ttl=ttl)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._local.pop(key)
+        if keys and self._use_redis():
+            try:
+                await self._redis.delete(*(self._prefix + k for k in keys))  # type: ignore[union-attr]
+            except (RedisError, OSError) as e:
+                self._failed(e)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "redis": 1.0 if self.backend == "redis" else 0.0,
+        }
+
+    async def close(self) -> None:
+        if self._redis is not None:
+            await self._redis.aclose()
+
+
+# ---- Compact value encodings ----
+
+_DTYPES = {b"e": np.float16, b"f": np.float32}
+_SESSION = struct.Struct("<16s16sd")  # session owner (or zeros), created_at epoch
+
+
+def pack_vector(vector: np.ndarray) -> bytes:
+    """1-byte dtype tag + raw little-endian array bytes."""
+    tag = b"e" if vector.dtype == np.float16 else b"f"
+    return tag + np.ascontiguousarray(vector, dtype=_DTYPES[tag]).tobytes()
+
+
+def unpack_vector(data: bytes) -> np.ndarray:
+    return np.frombuffer(data[1:], dtype=_DTYPES[data[:1]])
+
+
+def pack_json(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def unpack_json(data: bytes) -> Any:
+    return json.loads(data)
+
+
+def pack_session(
+    session_id: UUID, user_id: Optional[UUID], created_at: datetime
+) -> bytes:
+    """Fixed 40-byte record: session id, owner id (zeros if anonymous), timestamp."""
+    owner = user_id.bytes if user_id is not None else bytes(16)
+    return _SESSION.pack(session_id.bytes, owner, created_at.timestamp())
+
+
+def unpack_session(data: bytes) -> Tuple[UUID, Optional[UUID], datetime]:
+    sid, owner, ts = _SESSION.unpack(data)
+    return (
+        UUID(bytes=sid),
+        UUID(bytes=owner) if any(owner) else None,
+        datetime.fromtimestamp(ts, timezone.utc),
+    )
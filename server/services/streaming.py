@@ -0,0 +1,238 @@
+import asyncio
+import json
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Set, Tuple
+
+from services.semantic_cache import BUBBLE_DELIMITER, split_for_replay
+from local_logs.logger import logger
+
+DisconnectProbe = Callable[[], Awaitable[bool]]
+
+# Cleanup of a cancelled response can outlive it; keep the tasks referenced
+_cleanup_tasks: Set["asyncio.Task[None]"] = set()
+
+
+@dataclass(frozen=True)
+class StreamFormat:
+    """
+    Wire format for streamed answers.
+
+    :param media_type: Response Content-Type.
+    :param encode: Renders one frame (text, or a bare bubble delimiter).
+    :param done: Trailer sent after the last frame.
+    :param split_bubbles: Emit `[[NEW_BUBBLE]]` as a frame of its own.
+    """
+
+    media_type: str
+    encode: Callable[[str], str]
+    done: str = ""
+    split_bubbles: bool = False
+
+
+def _sse(frame: str) -> str:
+    if frame == BUBBLE_DELIMITER:
+        return "event: bubble\ndata: {}\n\n"
+    return f"event: delta\ndata: {json.dumps({'text': frame}, ensure_ascii=False)}\n\n"
+
+
+def _ndjson(frame: str) -> str:
+    if frame == BUBBLE_DELIMITER:
+        return '{"type": "bubble"}\n'
+    return json.dumps({"type": "delta", "text": frame}, ensure_ascii=False) + "\n"
+
+
+TEXT = StreamFormat("text/plain; charset=utf-8", encode=lambda frame: frame)
+SSE = StreamFormat(
+    "text/event-stream",
+    encode=_sse,
+    done="event: done\ndata: {}\n\n",
+    split_bubbles=True,
+)
+NDJSON = StreamFormat(
+    "application/x-ndjson",
+    encode=_ndjson,
+    done='{"type": "done"}\n',
+    split_bubbles=True,
+)
+
+
+def negotiate(accept: Optional[str]) -> StreamFormat:
+    """
+    Pick the stream format from an Accept header; plain text by default.
+
+    :param accept: Raw Accept header value.
+    """
+    accept = (accept or "").lower()
+    if SSE.media_type in accept:
+        return SSE
+    if NDJSON.media_type in accept:
+        return NDJSON
+    return TEXT
+
+
+def _partial_delimiter(text: str) -> int:
+    """Length of the longest suffix of `text` that could start a bubble delimiter."""
+    tail = text[-(len(BUBBLE_DELIMITER) - 1) :]
+    if "[" not in tail:
+        return 0
+    for n in range(len(tail), 0, -1):
+        if BUBBLE_DELIMITER.startswith(tail[-n:]):
+            return n
+    return 0
+
+
+def _cut(buffer: str, *, split_bubbles: bool, final: bool) -> Tuple[List[str], str]:
+    """Split `buffer` into sendable frames and a held-back partial delimiter."""
+    keep = 0 if final else _partial_delimiter(buffer)
+    ready, rest = buffer[: len(buffer) - keep], buffer[len(buffer) - keep :]
+    if not ready:
+        return [], rest
+    return (split_for_replay(ready) if split_bubbles else [ready]), rest
+
+
+async def _watch(is_disconnected: DisconnectProbe, interval: float) -> None:
+    """Return once the client has gone away."""
+    while True:
+        try:
+            if await is_disconnected():
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(interval)
+
+
+# Put by `_pump` once the source is exhausted
+_END = object()
+
+
+async def _pump(source: AsyncIterator[str], queue: "asyncio.Queue[object]") -> None:
+    """
+    Read `source` into `queue` from this one task, ending with `_END` or the
+    exception it raised.
+
+    Every step of the source - and its cleanup, via `aclose` - thus runs in
+    the same context, so context variables set by one step (e.g. the open
+    `span`) are seen by the next.
+    """
+    try:
+        async for delta in source:
+            await queue.put(delta)
+    except Exception as e:
+        await queue.put(e)
+    else:
+        await queue.put(_END)
+    finally:
+        aclose = getattr(source, "aclose", None)
+        if aclose is not None:
+            with suppress(Exception):
+                await aclose()
+
+
+async def _close(
+    pump: "asyncio.Task[None]", pending: "Optional[asyncio.Future[object]]"
+) -> None:
+    """Stop an in-flight read and the pump, which closes the source generator chain."""
+    if pending is not None:
+        pending.cancel()
+    pump.cancel()
+    with suppress(asyncio.CancelledError, Exception):
+        await pump
+
+
+async def coalesce(
+    source: AsyncIterator[str],
+    *,
+    max_chars: int = 512,
+    max_delay_ms: float = 40.0,
+    split_bubbles: bool = False,
+    is_disconnected: Optional[DisconnectProbe] = None,
+    poll_interval_ms: float = 250.0,
+) -> AsyncIterator[str]:
+    """
+    Merge small deltas from `source` into time/size-bounded frames.
+
+    The first delta is sent immediately (time-to-first-token is unchanged);
+    later ones are buffered until `max_chars` is reached or `max_delay_ms`
+    has passed since the oldest buffered delta. Bubble delimiters are never
+    split across frames, and with `split_bubbles` each one is flushed as a
+    frame of its own.
+
+    `source` is read by a single task, so all its steps share one context.
+    A single watcher task polls `is_disconnected`; on disconnect (or when
+    this generator is closed or cancelled) that reader is cancelled and
+    `source` is `aclose()`d, which closes the upstream LLM stream.
+
+    :param source: Delta stream, e.g. `RAGService.stream(...)`.
+    :param max_chars: Flush once the buffer reaches this size.
+    :param max_delay_ms: Max time a delta waits in the buffer.
+    :param split_bubbles: Emit bubble delimiters as separate frames.
+    :param is_disconnected: Client disconnect probe.
+    :param poll_interval_ms: Disconnect polling interval.
+    :yield: Frames (text, or exactly `BUBBLE_DELIMITER`).
+    """
+    loop = asyncio.get_running_loop()
+    queue: "asyncio.Queue[object]" = asyncio.Queue(maxsize=1)
+    pump = asyncio.create_task(_pump(source, queue))
+    delay = max_delay_ms / 1000.0
+    watcher = (
+        asyncio.create_task(_watch(is_disconnected, poll_interval_ms / 1000.0))
+        if is_disconnected is not None
+        else None
+    )
+    pending: "Optional[asyncio.Future[object]]" = None
+    buffer = ""
+    deadline: Optional[float] = None
+    first = True
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(queue.get())
+            waiters = {pending} if watcher is None else {pending, watcher}
+            timeout = None if deadline is None else max(0.0, deadline - loop.time())
+            done, _ = await asyncio.wait(
+                waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+
+            if watcher is not None and watcher in done:
+                logger.warning("[stream] Client disconnected; closing upstream stream")
+                return
+
+            if pending not in done:
+                # Deadline hit while the next delta is still in flight
+                frames, buffer = _cut(buffer, split_bubbles=split_bubbles, final=False)
+                deadline = None
+                for frame in frames:
+                    yield frame
+                continue
+
+            item, pending = pending.result(), None
+            if isinstance(item, Exception):
+                raise item
+            if item is _END:
+                frames, buffer = _cut(buffer, split_bubbles=split_bubbles, final=True)
+                for frame in frames:
+                    yield frame
+                return
+            buffer += item  # type: ignore[operator]
+
+            if deadline is None:
+                deadline = loop.time() + delay
+            if (
+                first
+                or len(buffer) >= max_chars
+                or (split_bubbles and BUBBLE_DELIMITER in buffer)
+            ):
+                frames, buffer = _cut(buffer, split_bubbles=split_bubbles, final=False)
+                deadline = None
+                for frame in frames:
+                    first = False
+                    yield frame
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+        cleanup = asyncio.create_task(_close(pump, pending))
+        _cleanup_tasks.add(cleanup)
+        cleanup.add_done_callback(_cleanup_tasks.discard)
+        # Wait when we can; if we were cancelled, the task finishes on its own
+        await asyncio.shield(cleanup)
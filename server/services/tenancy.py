@@ -0,0 +1,70 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Iterator, Optional
+
+from fastapi import HTTPException, Request
+
+from config import config
+
+# The default tenant ("") is the original single-company deployment:
+# Pinecone namespace "", the configured snapshot/index dirs, COMPANY_NAME.
+DEFAULT_TENANT = ""
+
+_current_tenant: ContextVar[str] = ContextVar("tenant", default=DEFAULT_TENANT)
+
+
+def current_tenant() -> str:
+    """Tenant of the request (or CLI run) being served."""
+    return _current_tenant.get()
+
+
+def company_name(tenant: Optional[str] = None) -> str:
+    """Brand name shown to users of `tenant` (default: the current one)."""
+    tenant = current_tenant() if tenant is None else tenant
+    return config.TENANTS.get(tenant) or config.COMPANY_NAME
+
+
+def tenant_path(base: str, tenant: str) -> str:
+    """Per-tenant subdirectory of `base`; `base` itself for the default tenant."""
+    return base if tenant == DEFAULT_TENANT else str(Path(base) / tenant)
+
+
+def resolve_tenant(request: Request) -> str:
+    """
+    Tenant for a request: the tenant header, else the Host mapping, else the
+    default tenant.
+
+    :raises HTTPException: 404 for a tenant that is not configured.
+    """
+    tenant = request.headers.get(config.TENANT_HEADER)
+    if tenant is None:
+        host = (request.headers.get("host") or "").split(":", 1)[0].lower()
+        tenant = config.TENANT_HOSTS.get(host, DEFAULT_TENANT)
+    tenant = tenant.strip()
+    if tenant != DEFAULT_TENANT and tenant not in config.TENANTS:
+        raise HTTPException(status_code=404, detail="Unknown tenant")
+    return tenant
+
+
+async def bind_tenant(request: Request) -> str:
+    """
+    App-wide dependency: makes the request's tenant visible to services.
+
+    The value lives in a context variable, so it follows the request into
+    background tasks it starts (e.g. retrieval prefetch) and into the body
+    of streaming responses.
+    """
+    tenant = resolve_tenant(request)
+    _current_tenant.set(tenant)
+    return tenant
+
+
+@contextmanager
+def use_tenant(tenant: str) -> Iterator[None]:
+    """Run a block (e.g. an ingestion job) as `tenant`."""
+    token = _current_tenant.set(tenant)
+    try:
+        yield
+    finally:
+        _current_tenant.reset(token)
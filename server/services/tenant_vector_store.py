@@ -0,0 +1,119 @@
+import asyncio
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence
+
+from local_logs.logger import logger
+from interfaces.vector_store import VectorStore, VectorRecord
+from services.tenancy import current_tenant
+
+
+class TenantVectorStore(VectorStore):
+    """
+    Routes every call to the current tenant's own VectorStore.
+
+    Tenant stores are built on first use by `factory` (off the event loop,
+    since building one may load an index from disk) and kept in LRU order.
+    Once more than `max_tenants` are loaded, or their combined
+    `memory_bytes()` exceeds `memory_budget`, the least recently used ones
+    are dropped, so cold tenants cost no memory. The store serving the
+    current call is never evicted.
+
+    :param factory: Builds the store for a tenant id.
+    :param max_tenants: Max tenant stores kept loaded.
+    :param memory_budget: Max combined footprint of loaded stores, in bytes.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[str], VectorStore],
+        *,
+        max_tenants: int = 32,
+        memory_budget: int = 512 * 1024 * 1024,
+    ):
+        self._factory = factory
+        self._max_tenants = max(1, max_tenants)
+        self._memory_budget = memory_budget
+        self._stores: "OrderedDict[str, VectorStore]" = OrderedDict()
+        # In-flight loads; an entry lives exactly until its store is in _stores
+        self._loading: Dict[str, "asyncio.Future[VectorStore]"] = {}
+        self.loads = 0
+        self.evictions = 0
+
+    async def _store(self) -> VectorStore:
+        tenant = current_tenant()
+        store = self._stores.get(tenant)
+        if store is None:
+            loading = self._loading.get(tenant)
+            if loading is None:
+                loading = asyncio.ensure_future(self._load(tenant))
+                self._loading[tenant] = loading
+            # A cancelled request must not cancel the load others wait on
+            store = await asyncio.shield(loading)
+            # Another tenant's load may have evicted it while this call waited
+            self._stores[tenant] = store
+        self._stores.move_to_end(tenant)
+        self._evict(keep=tenant)
+        return store
+
+    async def _load(self, tenant: str) -> VectorStore:
+        try:
+            store = await asyncio.to_thread(self._factory, tenant)
+            self._stores[tenant] = store
+            self.loads += 1
+            return store
+        finally:
+            # Same step as the insert above, so no caller sees neither
+            self._loading.pop(tenant, None)
+
+    def _evict(self, keep: str) -> None:
+        while len(self._stores) > 1 and (
+            len(self._stores) > self._max_tenants
+            or self.memory_bytes() > self._memory_budget
+        ):
+            tenant = next(iter(self._stores))
+            if tenant == keep:
+                break
+            del self._stores[tenant]
+            self.evictions += 1
+            logger.info(f"[TenantVectorStore] Evicted tenant '{tenant}'")
+
+    def memory_bytes(self) -> int:
+        return sum(store.memory_bytes() for store in self._stores.values())
+
+    async def get_relevant_chunks(
+        self, query: str, top_k: int = 5, *, vector: Optional[List[float]] = None
+    ) -> List[str]:
+        """Retrieve chunks from the current tenant's corpus only.
+
+        Args:
+            query (str): Natural-language query.
+            top_k (int): Number of results to return.
+            vector (list[float] | None): Precomputed embedding of `query`;
+                embedded here when None.
+
+        Returns:
+            list[str]: Ordered chunk texts from most to least relevant.
+        """
+        store = await self._store()
+        return await store.get_relevant_chunks(query, top_k=top_k, vector=vector)
+
+    async def health_check(self) -> bool:
+        return await (await self._store()).health_check()
+
+    async def upsert(self, records: Sequence[VectorRecord]) -> None:
+        await (await self._store()).upsert(records)
+
+    async def delete(self, ids: Sequence[str]) -> None:
+        await (await self._store()).delete(ids)
+
+    async def flush(self) -> None:
+        await (await self._store()).flush()
+
+    def stats(self) -> Dict[str, float]:
+        """Snapshot of loaded tenants, their footprint and churn."""
+        return {
+            "loaded": len(self._stores),
+            "memory_bytes": self.memory_bytes(),
+            "loads": self.loads,
+            "evictions": self.evictions,
+        }
@@ -1,10 +1,50 @@
-from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 from uuid import UUID
 from models import User
+from services.ttl_cache import TTLCache
+from config import config
 from local_logs.logger import logger
 
+# Ids known to exist in `users`; rows are never deleted by the app
+_known_users: TTLCache[UUID, bool] = TTLCache(
+    maxsize=config.SESSION_CACHE_SIZE, ttl=config.SESSION_CACHE_TTL_SECONDS
+)
+
+
+async def ensure_user(db: AsyncSession, user_id: UUID) -> UUID:
+    """
+    Ensure a User row exists with this id, in at most one statement.
+
+    Uses `INSERT ... ON CONFLICT DO NOTHING RETURNING id` (a row comes back
+    only if it was created) and remembers known ids for a short TTL, so
+    repeat requests skip the database entirely.
+
+    :param db: DB session
+    :param user_id: External/user auth id (UUID)
+    :return: The user id
+    """
+    if _known_users.get(user_id):
+        return user_id
+    try:
+        stmt = (
+            insert(User)
+            .values(id=user_id)
+            .on_conflict_do_nothing(index_elements=[User.id])
+            .returning(User.id)
+        )
+        created = (await db.execute(stmt)).scalar_one_or_none()
+        await db.commit()
+        if created is not None:
+            logger.info(f"[user] created {user_id}")
+        _known_users.set(user_id, True)
+        return user_id
+    except Exception as e:
+        logger.error("[user] ensure failed", exc=e, basic=True)
+        await db.rollback()
+        raise HTTPException(status_code=500, detail="Unable to resolve user")
+
 
 async def get_or_create_user(db: AsyncSession, user_id: UUID) -> User:
     """
@@ -13,17 +53,15 @@ async def get_or_create_user(db: AsyncSession, user_id: UUID) -> User:
     :param user_id: External/user auth id (UUID)
     :return: User row
     """
+    await ensure_user(db, user_id)
     try:
-        result = await db.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
-        if user:
-            return user
-        user = User(id=user_id)
-        db.add(user)
-        await db.commit()
-        await db.refresh(user)
-        logger.info(f"[user] created {user.id}")
-        return user
+        user = await db.get(User, user_id)
+        if user is None:
+            # Deleted out from under the cache
+            _known_users.pop(user_id)
+            await ensure_user(db, user_id)
+            user = await db.get(User, user_id)
+        return user  # type: ignore[return-value]
     except Exception as e:
         logger.error("[user] get_or_create failed", exc=e, basic=True)
         await db.rollback()
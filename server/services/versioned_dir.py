@@ -0,0 +1,71 @@
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import List, Optional
+
+CURRENT_FILE = "CURRENT"
+# Dot-prefixed so versions never clash with per-tenant subdirectories
+VERSION_PREFIX = ".v"
+
+
+def resolve(directory: str) -> Optional[Path]:
+    """
+    Directory holding the published files of `directory`; None if nothing
+    has been published yet.
+
+    Read the pointer once and open every file from the returned path, so all
+    of them come from the same version.
+    """
+    path = Path(directory)
+    try:
+        name = (path / CURRENT_FILE).read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return None
+    return path / name
+
+
+def new_version(directory: str) -> Path:
+    """Create an empty version directory under `directory` to write into."""
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    while True:
+        version = path / f"{VERSION_PREFIX}{time.time_ns()}"
+        try:
+            version.mkdir()
+            return version
+        except FileExistsError:
+            continue
+
+
+def _versions(directory: Path) -> List[Path]:
+    return sorted(
+        (
+            p
+            for p in directory.iterdir()
+            if p.is_dir()
+            and p.name.startswith(VERSION_PREFIX)
+            and p.name[len(VERSION_PREFIX) :].isdigit()
+        ),
+        key=lambda p: int(p.name[len(VERSION_PREFIX) :]),
+    )
+
+
+def publish(version: Path, *, keep: int = 2) -> None:
+    """
+    Make `version` the current one with a single `os.replace` of the pointer.
+
+    Older versions beyond the newest `keep` are removed. The previous one is
+    kept by default, for readers that resolved the pointer just before the
+    swap; removal errors (e.g. files still mapped on Windows) are ignored and
+    retried on the next publish.
+    """
+    path = version.parent
+    tmp = path / f".{CURRENT_FILE}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(version.name)
+    os.replace(tmp, path / CURRENT_FILE)
+
+    for stale in _versions(path)[:-keep]:
+        if stale != version:
+            shutil.rmtree(stale, ignore_errors=True)
@@ -0,0 +1,4 @@
+from .metrics import registry, span, observe_stage
+from .tracing import setup_tracing
+
+__all__ = ["registry", "span", "observe_stage", "setup_tracing"]
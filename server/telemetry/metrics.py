@@ -0,0 +1,245 @@
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+from telemetry.tracing import get_tracer, parent_context
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+LabelValues = Tuple[str, ...]
+GaugeValue = Union[float, Mapping[LabelValues, float]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    """Cumulative-bucket histogram, rendered in Prometheus text format."""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self._label_names = tuple(label_names)
+        self._buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # bucket counts..., +Inf count, sum
+                series = self._series[label_values] = [0.0] * (len(self._buckets) + 2)
+            for i, bound in enumerate(self._buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for values, series in sorted(self._series.items()):
+                for bound, count in zip(self._buckets, series):
+                    le = _labels(self._label_names, values, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{le} {int(count)}")
+                inf = _labels(self._label_names, values, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{inf} {int(series[-2])}")
+                lbl = _labels(self._label_names, values)
+                lines.append(f"{self.name}_count{lbl} {int(series[-2])}")
+                lines.append(f"{self.name}_sum{lbl} {series[-1]}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter, rendered in Prometheus text format."""
+
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self._label_names = tuple(label_names)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self._label_names, values)} {value}")
+        return lines
+
+
+class CallbackGauge:
+    """Gauge whose value is read from a callback at scrape time."""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        fn: Callable[[], GaugeValue],
+        label_names: Sequence[str] = (),
+    ):
+        self.name = name
+        self.help = help
+        self._fn = fn
+        self._label_names = tuple(label_names)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        try:
+            value = self._fn()
+        except Exception:
+            return lines
+        if isinstance(value, Mapping):
+            for values, v in sorted(value.items()):
+                lines.append(f"{self.name}{_labels(self._label_names, values)} {v}")
+        else:
+            lines.append(f"{self.name} {value}")
+        return lines
+
+
+class MetricsRegistry:
+    """Process-local registry; `render()` produces the /metrics payload."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Union[Histogram, Counter, CallbackGauge]] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help, label_names, buckets))
+
+    def counter(self, name: str, help: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, label_names))
+
+    def gauge(
+        self,
+        name: str,
+        help: str,
+        fn: Callable[[], GaugeValue],
+        label_names: Sequence[str] = (),
+    ) -> None:
+        """Register (or replace) a callback gauge."""
+        with self._lock:
+            self._metrics[name] = CallbackGauge(name, help, fn, label_names)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.histogram(
+    "ragbot_stage_duration_seconds",
+    "Latency of chat turn stages",
+    label_names=("stage",),
+)
+STAGE_ERRORS = registry.counter(
+    "ragbot_stage_errors_total",
+    "Stages that ended with an exception",
+    label_names=("stage",),
+)
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    """Record a stage duration measured by the caller (e.g. time-to-first-token)."""
+    STAGE_SECONDS.observe(seconds, stage)
+
+
+# Innermost open OpenTelemetry span of the current task
+_current_span: ContextVar[Optional[Any]] = ContextVar("ragbot_span", default=None)
+
+
+class span:
+    """
+    Time a block as a named stage; usable with `with` and `async with`.
+
+    Records into `ragbot_stage_duration_seconds{stage=...}` and, when tracing
+    is enabled, emits an OpenTelemetry span of the same name, parented to the
+    enclosing `span` (or to the ambient OpenTelemetry context at the top).
+    """
+
+    __slots__ = ("_stage", "_start", "_otel", "_parent")
+
+    def __init__(self, stage: str):
+        self._stage = stage
+        self._start = 0.0
+        self._otel = None
+        self._parent = None
+
+    def __enter__(self) -> "span":
+        tracer = get_tracer()
+        if tracer is not None:
+            # Parent passed explicitly rather than start_as_current_span:
+            # spans may straddle `yield`s in async generators, where context
+            # attach/detach tokens would not match.
+            self._parent = _current_span.get()
+            context = parent_context(self._parent) if self._parent is not None else None
+            self._otel = tracer.start_span(self._stage, context=context)
+            _current_span.set(self._otel)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        STAGE_SECONDS.observe(time.perf_counter() - self._start, self._stage)
+        if exc_type is not None and not issubclass(exc_type, GeneratorExit):
+            STAGE_ERRORS.inc(self._stage)
+            if self._otel is not None:
+                self._otel.record_exception(exc)
+        if self._otel is not None:
+            _current_span.set(self._parent)
+            self._otel.end()
+
+    async def __aenter__(self) -> "span":
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.__exit__(exc_type, exc, tb)
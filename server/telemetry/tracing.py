@@ -0,0 +1,52 @@
+from typing import Any, Optional
+
+from config import config
+from local_logs.logger import logger
+
+_tracer: Optional[Any] = None
+
+
+def setup_tracing() -> None:
+    """
+    Enable OpenTelemetry span export when `OTEL_ENABLED` is set.
+
+    OpenTelemetry is optional: if the SDK or OTLP exporter is not installed
+    this logs a warning and tracing stays off. The exporter reads the standard
+    `OTEL_EXPORTER_OTLP_*` environment variables.
+    """
+    global _tracer
+    if not config.OTEL_ENABLED or _tracer is not None:
+        return
+    try:
+        from opentelemetry import trace
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+            OTLPSpanExporter,
+        )
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        logger.warning(
+            "[telemetry] OTEL_ENABLED but opentelemetry-sdk/exporter is not installed"
+        )
+        return
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": config.APP_NAME})
+    )
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    trace.set_tracer_provider(provider)
+    _tracer = trace.get_tracer("ragbot")
+    logger.info("[telemetry] OpenTelemetry tracing enabled")
+
+
+def get_tracer() -> Optional[Any]:
+    """The configured tracer, or None when tracing is off."""
+    return _tracer
+
+
+def parent_context(parent: Any) -> Any:
+    """OpenTelemetry context whose active span is `parent`."""
+    from opentelemetry import trace
+
+    return trace.set_span_in_context(parent)
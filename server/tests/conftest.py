@@ -0,0 +1,23 @@
+import os
+import sys
+from pathlib import Path
+
+# Run from anywhere: the server modules import each other as top-level packages
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+# `config` requires these at import time; the tests never reach the services
+for name, value in {
+    "REACT_APP_URL": "http://localhost:3000",
+    "POSTGRES_DSN": "sqlite+aiosqlite:///test.db",
+    "SUPABASE_URL": "http://localhost:54321",
+    "SUPABASE_ANON_KEY": "test",
+    "SUPABASE_SERVICE_KEY": "test",
+    "PINECONE_API_KEY": "test",
+    "PINECONE_ENV": "test",
+    "PINECONE_INDEX_HOST": "http://localhost",
+    "OPEN_AI_API_KEY": "test",
+    "EMBED_MODEL": "text-embedding-3-small",
+    "CHAT_MODEL": "gpt-4o-mini",
+    "HISTORY_LIMIT": "5",
+}.items():
+    os.environ.setdefault(name, value)
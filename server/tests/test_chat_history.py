@@ -0,0 +1,106 @@
+import asyncio
+import uuid
+from typing import AsyncIterator, List
+
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.pool import StaticPool
+
+from benchmarks.fakes import FakeEmbedder, FakeVectorStore
+from interfaces.llm_generator import LLMGenerator
+from models import Base, Message, Session
+from schemas.message import MessageCreate
+from services.chat import clear_session, get_messages
+from services.message_writer import MessageWriter
+from services.rag import RAGService
+from services.rag_pipeline import RAGPipeline
+from services.shared_cache import SharedCache
+
+
+@compiles(UUID, "sqlite")
+def _uuid_as_text(type_, compiler, **kw) -> str:
+    # Same as benchmarks/run.py: keep hex ids from getting NUMERIC affinity
+    return "CHAR(32)"
+
+
+class RecordingLLM(LLMGenerator):
+    """Answers with a fixed text and records the history of every call."""
+
+    def __init__(self) -> None:
+        self.histories: List[List[Message]] = []
+
+    async def stream(
+        self, context_chunks: List[str], query: str, history: List[Message]
+    ) -> AsyncIterator[str]:
+        self.histories.append(list(history))
+        yield f"answer to {query}"
+
+
+async def make_db() -> "tuple[AsyncEngine, async_sessionmaker, uuid.UUID]":
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    session_id = uuid.uuid4()
+    async with factory() as db:
+        db.add(Session(id=session_id))
+        await db.commit()
+    return engine, factory, session_id
+
+
+async def turn(service: RAGService, db, session_id: uuid.UUID, text: str) -> str:
+    return "".join(
+        [
+            chunk
+            async for chunk in service.stream(db, session_id=session_id, user_text=text)
+        ]
+    )
+
+
+def test_cleared_session_has_no_cached_history():
+    async def main():
+        engine, factory, session_id = await make_db()
+        llm = RecordingLLM()
+        pipeline = RAGPipeline(FakeVectorStore(FakeEmbedder(8), ["chunk"]), llm)
+        cache = SharedCache(None)
+        service = RAGService(pipeline, cache=cache)
+        try:
+            async with factory() as db:
+                await turn(service, db, session_id, "first question")
+                await turn(service, db, session_id, "second question")
+                assert [m.content for m in llm.histories[-1]] == [
+                    "first question",
+                    "answer to first question",
+                ]
+
+                await clear_session(db, session_id, cache=cache)
+                await turn(service, db, session_id, "after clearing")
+                assert llm.histories[-1] == []
+        finally:
+            await engine.dispose()
+
+    asyncio.run(main())
+
+
+def test_clear_drops_messages_queued_for_writing():
+    async def main():
+        engine, factory, session_id = await make_db()
+        writer = MessageWriter(factory, flush_interval_ms=50)
+        try:
+            await writer.enqueue(session_id, MessageCreate(role="user", content="hi"))
+            assert len(writer.pending(session_id)) == 1
+            async with factory() as db:
+                await clear_session(db, session_id, writer=writer)
+            await writer.close()
+            assert writer.pending(session_id) == []
+            async with factory() as db:
+                assert list(await get_messages(db, session_id)) == []
+        finally:
+            await engine.dispose()
+
+    asyncio.run(main())
@@ -0,0 +1,28 @@
+import asyncio
+from typing import List
+
+import numpy as np
+
+from benchmarks.fakes import FakeEmbedder
+from services.numpy_vector_store import NumpyVectorStore, save_snapshot
+
+
+async def snapshot(directory: str, texts: List[str], embedder: FakeEmbedder) -> None:
+    vectors = np.array(await embedder.embed_many(texts))
+    save_snapshot(directory, [f"c{i}" for i in range(len(texts))], texts, vectors)
+
+
+def test_reloads_snapshot_published_by_another_writer(tmp_path):
+    async def main():
+        embedder = FakeEmbedder(dimension=8)
+        await snapshot(str(tmp_path), ["old chunk"], embedder)
+        store = NumpyVectorStore(
+            embedder, snapshot_dir=str(tmp_path), reload_interval=0
+        )
+        assert await store.get_relevant_chunks("new chunk", top_k=5) == ["old chunk"]
+
+        await snapshot(str(tmp_path), ["old chunk", "new chunk"], embedder)
+        chunks = await store.get_relevant_chunks("new chunk", top_k=5)
+        assert sorted(chunks) == ["new chunk", "old chunk"]
+
+    asyncio.run(main())
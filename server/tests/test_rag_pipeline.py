@@ -0,0 +1,47 @@
+import asyncio
+from typing import List
+
+from benchmarks.fakes import FakeEmbedder, FakeLLMGenerator, FakeVectorStore
+from services.bm25_index import BM25Index
+from services.hybrid_vector_store import HybridVectorStore
+from services.rag_pipeline import RAGPipeline
+
+DOCS = {
+    "kyc": "KYC verification requires a passport and a proof of address.",
+    "sepa": "SEPA transfers usually settle within one business day.",
+    "card": "Freeze a lost card from the Cards tab in the app.",
+}
+
+
+def make_pipeline(index_dir: str, embedder: FakeEmbedder) -> RAGPipeline:
+    BM25Index.build(list(DOCS), list(DOCS.values())).save(index_dir)
+    store = HybridVectorStore(
+        FakeVectorStore(embedder, list(DOCS.values())), index_dir=index_dir
+    )
+    return RAGPipeline(store, FakeLLMGenerator(tokens=3), embedder=embedder)
+
+
+async def run_turn(pipeline: RAGPipeline, query: str) -> List[str]:
+    prefetch = pipeline.prefetch(query)
+    return [token async for token in pipeline.stream(query, [], prefetch=prefetch)]
+
+
+def test_conclusive_lexical_hit_skips_embedding(tmp_path):
+    async def main():
+        embedder = FakeEmbedder(dimension=8)
+        pipeline = make_pipeline(str(tmp_path), embedder)
+        answer = await run_turn(pipeline, "KYC passport proof of address")
+        assert answer and answer != [RAGPipeline.FALLBACK_MESSAGE]
+        assert embedder.calls == 0
+
+    asyncio.run(main())
+
+
+def test_inconclusive_query_embeds_once(tmp_path):
+    async def main():
+        embedder = FakeEmbedder(dimension=8)
+        pipeline = make_pipeline(str(tmp_path), embedder)
+        await run_turn(pipeline, "how long does it take")
+        assert embedder.calls == 1
+
+    asyncio.run(main())
@@ -0,0 +1,241 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+import numpy as np
+
+from services.shared_cache import (
+    SharedCache,
+    pack_json,
+    pack_session,
+    pack_vector,
+    unpack_json,
+    unpack_session,
+    unpack_vector,
+)
+
+
+class RedisStandIn:
+    """
+    Minimal in-process Redis speaking RESP2 on a local port.
+
+    Implements what SharedCache uses (GET, MGET, SET with PX, DEL) and
+    records every command it receives.
+    """
+
+    def __init__(self) -> None:
+        self.data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self.commands: List[List[bytes]] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._clients: List[asyncio.StreamWriter] = []
+
+    @property
+    def url(self) -> str:
+        port = self._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+        return f"redis://127.0.0.1:{port}/0"
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+
+    async def stop(self) -> None:
+        for writer in self._clients:
+            writer.close()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        item = self.data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    def _execute(self, cmd: List[bytes]) -> bytes:
+        name = cmd[0].upper()
+        if name == b"GET":
+            return _bulk(self._get(cmd[1]))
+        if name == b"MGET":
+            values = [self._get(k) for k in cmd[1:]]
+            return b"*%d\r\n" % len(values) + b"".join(_bulk(v) for v in values)
+        if name == b"SET":
+            expires_at = None
+            if len(cmd) >= 5 and cmd[3].upper() == b"PX":
+                expires_at = time.monotonic() + int(cmd[4]) / 1000
+            self.data[cmd[1]] = (cmd[2], expires_at)
+            return b"+OK\r\n"
+        if name == b"DEL":
+            removed = sum(self.data.pop(k, None) is not None for k in cmd[1:])
+            return b":%d\r\n" % removed
+        return b"+OK\r\n"  # PING, CLIENT SETINFO, ...
+
+    async def _serve(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self._clients.append(writer)
+        try:
+            while True:
+                cmd = await _read_command(reader)
+                if cmd is None:
+                    return
+                self.commands.append(cmd)
+                writer.write(self._execute(cmd))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            return
+        finally:
+            writer.close()
+
+
+def _bulk(value: Optional[bytes]) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+async def _read_command(reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+    header = await reader.readline()
+    if not header:
+        return None
+    args = []
+    for _ in range(int(header[1:])):
+        size = int((await reader.readline())[1:])
+        args.append((await reader.readexactly(size + 2))[:-2])
+    return args
+
+
+@asynccontextmanager
+async def redis_stand_in() -> AsyncIterator[RedisStandIn]:
+    server = RedisStandIn()
+    await server.start()
+    try:
+        yield server
+    finally:
+        await server.stop()
+
+
+def test_local_only_round_trip():
+    async def main():
+        cache = SharedCache(None)
+        assert cache.backend == "local"
+        await cache.set_many({"a": b"1", "b": b"2"}, ttl=60)
+        assert await cache.get_many(["a", "missing", "b"]) == [b"1", None, b"2"]
+        await cache.delete("a")
+        assert await cache.get("a") is None
+        assert cache.stats()["hits"] == 2
+        assert cache.stats()["misses"] == 2
+
+    asyncio.run(main())
+
+
+def test_local_entries_expire():
+    async def main():
+        cache = SharedCache(None)
+        await cache.set("k", b"v", ttl=0.05)
+        assert await cache.get("k") == b"v"
+        await asyncio.sleep(0.1)
+        assert await cache.get("k") is None
+
+    asyncio.run(main())
+
+
+def test_redis_batches_reads_and_writes():
+    async def main():
+        async with redis_stand_in() as server:
+            cache = SharedCache(server.url, prefix="t:")
+            assert cache.backend == "redis"
+
+            await cache.set_many({"a": b"1", "b": b"2", "c": b"3"}, ttl=60)
+            assert sorted(server.data) == [b"t:a", b"t:b", b"t:c"]
+            sets = [c for c in server.commands if c[0].upper() == b"SET"]
+            assert len(sets) == 3
+            assert all(c[3].upper() == b"PX" and c[4] == b"60000" for c in sets)
+
+            server.commands.clear()
+            values = await cache.get_many(["a", "b", "x", "c"])
+            assert values == [b"1", b"2", None, b"3"]
+            # One MGET, not one GET per key
+            assert server.commands == [[b"MGET", b"t:a", b"t:b", b"t:x", b"t:c"]]
+
+            await cache.delete("a", "b")
+            assert sorted(server.data) == [b"t:c"]
+            await cache.close()
+
+    asyncio.run(main())
+
+
+def test_redis_is_shared_between_instances():
+    async def main():
+        async with redis_stand_in() as server:
+            writer = SharedCache(server.url)
+            reader = SharedCache(server.url)
+            await writer.set("shared", b"value", ttl=60)
+            assert await reader.get("shared") == b"value"
+            await writer.close()
+            await reader.close()
+
+    asyncio.run(main())
+
+
+def test_falls_back_to_local_when_redis_is_down():
+    async def main():
+        async with redis_stand_in() as server:
+            url = server.url
+        # Server gone: calls fail fast and land in the local store
+        cache = SharedCache(url, timeout=0.2, retry_after=60)
+        await cache.set("k", b"v", ttl=60)
+        assert cache.errors == 1
+        assert cache.backend == "local"
+        assert await cache.get("k") == b"v"
+        # Still inside `retry_after`: Redis is not tried again
+        assert cache.errors == 1
+        await cache.close()
+
+    asyncio.run(main())
+
+
+def test_retries_redis_after_retry_window():
+    async def main():
+        async with redis_stand_in() as server:
+            cache = SharedCache(server.url, retry_after=0.05)
+            cache._failed(ConnectionError("simulated"))
+            assert cache.backend == "local"
+            await asyncio.sleep(0.1)
+            assert cache.backend == "redis"
+            await cache.set("k", b"v", ttl=60)
+            assert server.data[b"ragbot:k"][0] == b"v"
+            await cache.close()
+
+    asyncio.run(main())
+
+
+def test_vector_encoding_keeps_dtype():
+    for dtype in (np.float16, np.float32):
+        vector = np.arange(8, dtype=dtype) / 3
+        data = pack_vector(vector)
+        assert len(data) == 1 + vector.nbytes
+        decoded = unpack_vector(data)
+        assert decoded.dtype == dtype
+        assert np.array_equal(decoded, vector)
+
+
+def test_session_encoding():
+    created = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+    session_id, owner = uuid4(), uuid4()
+    data = pack_session(session_id, owner, created)
+    assert len(data) == 40
+    assert unpack_session(data) == (session_id, owner, created)
+    assert unpack_session(pack_session(session_id, None, created))[1] is None
+
+
+def test_json_encoding_is_compact():
+    value = {"role": "user", "content": "hi", "n": [1, 2]}
+    data = pack_json(value)
+    assert b" " not in data
+    assert unpack_json(data) == value
@@ -0,0 +1,75 @@
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional
+
+import telemetry.metrics
+from services.streaming import coalesce
+from telemetry import span
+
+
+class FakeSpan:
+    def __init__(self, name: str, parent: Optional["FakeSpan"]):
+        self.name = name
+        self.parent = parent
+        self.ended = False
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        self.ended = True
+
+
+class FakeTracer:
+    """Stands in for an OpenTelemetry tracer; the context is the parent span."""
+
+    def __init__(self) -> None:
+        self.spans: Dict[str, FakeSpan] = {}
+
+    def start_span(self, name: str, context: Optional[FakeSpan] = None) -> FakeSpan:
+        self.spans[name] = FakeSpan(name, context)
+        return self.spans[name]
+
+
+def trace_with(monkeypatch) -> FakeTracer:
+    tracer = FakeTracer()
+    monkeypatch.setattr(telemetry.metrics, "get_tracer", lambda: tracer)
+    monkeypatch.setattr(telemetry.metrics, "parent_context", lambda parent: parent)
+    return tracer
+
+
+async def turn(tokens: int) -> AsyncIterator[str]:
+    """Shaped like RAGService.stream: one turn span around the whole stream."""
+    with span("rag.turn"):
+        try:
+            for i in range(tokens):
+                await asyncio.sleep(0)
+                yield f"t{i} "
+        finally:
+            with span("rag.persist_assistant"):
+                await asyncio.sleep(0)
+
+
+def test_spans_after_first_token_keep_the_turn_as_parent(monkeypatch):
+    tracer = trace_with(monkeypatch)
+
+    async def main() -> List[str]:
+        return [f async for f in coalesce(turn(5), max_delay_ms=0)]
+
+    assert "".join(asyncio.run(main())) == "t0 t1 t2 t3 t4 "
+    persist = tracer.spans["rag.persist_assistant"]
+    assert persist.parent is tracer.spans["rag.turn"]
+    assert persist.ended and tracer.spans["rag.turn"].ended
+
+
+def test_spans_keep_the_turn_as_parent_when_closed_early(monkeypatch):
+    tracer = trace_with(monkeypatch)
+
+    async def main() -> None:
+        frames = coalesce(turn(100))
+        assert await anext(frames) == "t0 "
+        await frames.aclose()
+
+    asyncio.run(main())
+    persist = tracer.spans["rag.persist_assistant"]
+    assert persist.parent is tracer.spans["rag.turn"]
+    assert tracer.spans["rag.turn"].ended